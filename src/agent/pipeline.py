@@ -0,0 +1,219 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from tools.tools import Tools
+from prompts.prompts import dag_clarifications_questions
+from utils.token_counter import TokenCounter
+
+class PipelineStage:
+    """Étape du pipeline déterministe : un outil et les étapes dont il dépend"""
+
+    def __init__(
+        self,
+        name: str,
+        depends_on: List[str],
+        run: Callable[[Dict[str, str]], str],
+        token_step: str,
+        arun: Optional[Callable[[Dict[str, str]], Awaitable[str]]] = None,
+    ):
+        """
+        Initialise l'étape
+
+        Args:
+            name: Nom de l'étape (clé dans les résultats sauvegardés)
+            depends_on: Noms des étapes devant être terminées avant celle-ci
+            run: Fonction exécutant l'étape à partir des résultats précédents
+            token_step: Nom de l'étape pour le suivi des tokens
+            arun: Version asynchrone de l'étape (optionnel, sinon run est exécuté dans un thread)
+        """
+        self.name = name
+        self.depends_on = depends_on
+        self.run = run
+        self.token_step = token_step
+        self.arun = arun
+
+class DAGPipeline:
+    """
+    Exécute les outils d'analyse selon un graphe de dépendances fixe,
+    sans passer par la boucle Thought/Action de l'agent ReAct.
+
+    Ordre : extraction du texte brut -> analyse visuelle -> cohérence / dates /
+    législation -> clarifications -> conformité.
+    """
+
+    def __init__(self, tools: Tools, token_counter: Optional[TokenCounter] = None):
+        """
+        Initialise le pipeline
+
+        Args:
+            tools: Outils d'analyse (état propre au document en cours)
+            token_counter: Compteur de tokens pour attribuer la consommation par étape (optionnel)
+        """
+        self.tools = tools
+        self.token_counter = token_counter
+        self.stages = self._build_stages()
+        self.levels = self._compute_levels()
+
+    def _build_stages(self) -> List[PipelineStage]:
+        """Déclare les étapes du pipeline et leurs dépendances"""
+        return [
+            PipelineStage(
+                "raw_text", [],
+                lambda results: self.tools.extract_raw_text_for_agent(results["image_path"]),
+                "raw_text_extraction",
+            ),
+            PipelineStage(
+                "vision_analysis", ["raw_text"],
+                lambda results: self.tools.analyze_vision(results["image_path"]),
+                "vision_analysis",
+            ),
+            PipelineStage(
+                "consistency_check", ["vision_analysis"],
+                lambda results: self.tools.verify_consistency(results["vision_analysis"]),
+                "consistency_check",
+                arun=lambda results: self.tools.averify_consistency(results["vision_analysis"]),
+            ),
+            PipelineStage(
+                "dates_verification", ["vision_analysis"],
+                lambda results: self.tools.verify_dates(results["vision_analysis"]),
+                "dates_verification",
+                arun=lambda results: self.tools.averify_dates(results["vision_analysis"]),
+            ),
+            PipelineStage(
+                "legislation", ["vision_analysis"],
+                lambda results: self.tools.search_legislation(results["vision_analysis"]),
+                "legislation_search",
+                arun=lambda results: self.tools.asearch_legislation(results["vision_analysis"]),
+            ),
+            PipelineStage(
+                "clarifications", ["consistency_check", "dates_verification", "legislation"],
+                lambda results: self.tools.get_clarifications(self._build_clarification_questions(results)),
+                "clarifications",
+            ),
+            PipelineStage(
+                "compliance_analysis", ["clarifications"],
+                lambda results: self.tools.analyze_compliance(),
+                "compliance_analysis",
+            ),
+        ]
+
+    def _compute_levels(self) -> List[List[PipelineStage]]:
+        """
+        Regroupe les étapes par niveaux : toutes les étapes d'un niveau ne dépendent
+        que d'étapes des niveaux précédents
+
+        Returns:
+            List[List[PipelineStage]]: Étapes ordonnées par niveau
+        """
+        remaining = {stage.name: stage for stage in self.stages}
+        done = set()
+        levels = []
+
+        while remaining:
+            ready = [stage for stage in remaining.values() if all(dep in done for dep in stage.depends_on)]
+            if not ready:
+                raise ValueError(f"Dépendances circulaires ou inconnues dans le pipeline : {list(remaining)}")
+            levels.append(ready)
+            for stage in ready:
+                done.add(stage.name)
+                del remaining[stage.name]
+
+        return levels
+
+    def _build_clarification_questions(self, results: Dict[str, str]) -> str:
+        """Construit les questions de clarification à partir des vérifications précédentes"""
+        return dag_clarifications_questions.format(
+            consistency_check=results.get("consistency_check", ""),
+            dates_verification=results.get("dates_verification", ""),
+            legislation=results.get("legislation", ""),
+        )
+
+    def _run_stage(self, stage: PipelineStage, results: Dict[str, str]) -> str:
+        """
+        Exécute une étape en capturant ses erreurs pour ne pas interrompre l'analyse
+
+        Args:
+            stage: Étape à exécuter
+            results: Résultats des étapes précédentes
+
+        Returns:
+            str: Résultat de l'étape ou message d'erreur
+        """
+        print(f"\n⚙️ Étape du pipeline : {stage.name}")
+        if self.token_counter:
+            self.token_counter.set_current_step(stage.token_step)
+        try:
+            return stage.run(results)
+        except Exception as e:
+            print(f"❌ Erreur lors de l'étape {stage.name}: {str(e)}")
+            return f"Erreur lors de l'étape {stage.name}: {str(e)}"
+
+    async def _arun_stage(self, stage: PipelineStage, results: Dict[str, str]) -> str:
+        """
+        Exécute une étape de façon asynchrone en capturant ses erreurs
+
+        Args:
+            stage: Étape à exécuter
+            results: Résultats des étapes précédentes
+
+        Returns:
+            str: Résultat de l'étape ou message d'erreur
+        """
+        print(f"\n⚙️ Étape du pipeline (async) : {stage.name}")
+        try:
+            if stage.arun is not None:
+                return await stage.arun(results)
+            # Les étapes sans version asynchrone ne bloquent pas la boucle d'événements
+            return await asyncio.to_thread(stage.run, results)
+        except Exception as e:
+            print(f"❌ Erreur lors de l'étape {stage.name}: {str(e)}")
+            return f"Erreur lors de l'étape {stage.name}: {str(e)}"
+
+    async def arun(self, image_path: str) -> Dict[str, object]:
+        """
+        Exécute le pipeline en lançant simultanément les étapes d'un même niveau
+        (cohérence, dates et législation après l'analyse visuelle) : la latence
+        d'un niveau devient celle de sa branche la plus lente
+
+        Args:
+            image_path: Chemin vers l'image à analyser
+
+        Returns:
+            Dict: Résultats au format attendu par save_output ("steps" et "final_response")
+        """
+        results: Dict[str, str] = {"image_path": image_path}
+
+        for level in self.levels:
+            if self.token_counter:
+                # Un seul compteur d'étape courante : les branches parallèles partagent une étape commune
+                self.token_counter.set_current_step("+".join(stage.token_step for stage in level))
+            outputs = await asyncio.gather(*(self._arun_stage(stage, results) for stage in level))
+            for stage, output in zip(level, outputs):
+                results[stage.name] = output
+
+        return self._format_results(results)
+
+    def run(self, image_path: str) -> Dict[str, object]:
+        """
+        Exécute toutes les étapes dans l'ordre des dépendances
+
+        Args:
+            image_path: Chemin vers l'image à analyser
+
+        Returns:
+            Dict: Résultats au format attendu par save_output ("steps" et "final_response")
+        """
+        results: Dict[str, str] = {"image_path": image_path}
+
+        for level in self.levels:
+            for stage in level:
+                results[stage.name] = self._run_stage(stage, results)
+
+        return self._format_results(results)
+
+    def _format_results(self, results: Dict[str, str]) -> Dict[str, object]:
+        """Met en forme les résultats comme les étapes enregistrées par le callback de l'agent"""
+        steps = {stage.name: results.get(stage.name, "") for stage in self.stages}
+        return {
+            "steps": steps,
+            "final_response": steps["compliance_analysis"],
+        }
@@ -11,6 +11,12 @@ class AzureConfig:
     ENDPOINT: Optional[str] = os.getenv("AZURE_ENDPOINT")
     API_VERSION: Optional[str] = os.getenv("AZURE_API_VERSION")
 
+    # Quotas des déploiements (requêtes et tokens par minute) appliqués par le limiteur de débit
+    CHAT_REQUESTS_PER_MINUTE: int = int(os.getenv("AZURE_CHAT_RPM", "60"))
+    CHAT_TOKENS_PER_MINUTE: int = int(os.getenv("AZURE_CHAT_TPM", "80000"))
+    EMBEDDING_REQUESTS_PER_MINUTE: int = int(os.getenv("AZURE_EMBEDDING_RPM", "300"))
+    EMBEDDING_TOKENS_PER_MINUTE: int = int(os.getenv("AZURE_EMBEDDING_TPM", "350000"))
+
     def __init__(self):
         """Vérifie que les variables d'environnement nécessaires sont définies."""
         if not self.API_KEY:
@@ -1,24 +1,33 @@
 import asyncio
 import argparse
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from config.azure_config import AzureConfig
 from models.ai_models import AIModels
 from tools.tools import Tools
 from raptor.raptor_setup import RaptorSetup
 from agent.react_agent import create_react_agent
+from agent.pipeline import DAGPipeline
 from llama_index.core.callbacks import CBEventType, CallbackManager
 from llama_index.core.callbacks.base_handler import BaseCallbackHandler
 from utils.token_counter import TokenCounter, create_token_counter
+from utils.llm_cache import LLMResponseCache
+from utils.ocr_cache import OCRResultCache
 from PIL import Image
 import io
 import os
 import sys
-from utils.pdf_converter import convert_pdf_to_image
+from utils.pdf_converter import (
+    extract_text_layer, get_page_count, get_page_size, is_text_layer_usable, parse_page_range,
+    render_pdf_pages, render_pdf_to_bytes, save_converted_image,
+)
 from utils.output_saver import save_output
 import json
+import time
 from datetime import datetime
 from utils.raw_text_extractor import RawTextExtractor
+from utils.image_budget import vision_render_dpi
 
 class CustomCallbackHandler(BaseCallbackHandler):
     """Handler personnalisé pour logger les événements de l'agent"""
@@ -26,6 +35,12 @@ class CustomCallbackHandler(BaseCallbackHandler):
     def __init__(self) -> None:
         super().__init__([], [])
         print("\n🔄 Initialisation du CustomCallbackHandler")
+        self.reset_steps()
+        print("✅ Steps initialisés :", self.steps.keys())
+        self.token_counter = None  # Sera défini plus tard
+        
+    def reset_steps(self) -> None:
+        """Réinitialise les étapes enregistrées avant l'analyse d'un nouveau document."""
         self.steps = {
             "vision_analysis": "",
             "consistency_check": "",
@@ -35,9 +50,7 @@ class CustomCallbackHandler(BaseCallbackHandler):
             "compliance_analysis": "",
             "raw_text": ""
         }
-        print("✅ Steps initialisés :", self.steps.keys())
         self.current_action = None
-        self.token_counter = None  # Sera défini plus tard
         
     def set_token_counter(self, token_counter: TokenCounter) -> None:
         """Définir le compteur de tokens pour ce handler."""
@@ -139,12 +152,22 @@ class CustomCallbackHandler(BaseCallbackHandler):
             self.token_counter.print_step_stats()
             self.token_counter.save_stats()
 
-def initialize_system(callback_handler):
+def initialize_system(
+    callback_handler,
+    use_llm_cache: bool = True,
+    retrieval_backend: str = "chroma",
+    use_ocr_cache: bool = True,
+    hybrid_retrieval: bool = True,
+):
     """
     Initialise les composants du système d'analyse
     
     Args:
         callback_handler: Gestionnaire d'événements
+        use_llm_cache: Réutilise les réponses LLM déjà obtenues pour une requête identique
+        retrieval_backend: Backend de recherche de la législation ("chroma", "numpy" ou "hnsw")
+        use_ocr_cache: Réutilise les résultats OCR des images déjà traitées
+        hybrid_retrieval: Fusionne la recherche vectorielle avec l'index BM25 de la législation
         
     Returns:
         tuple: (azure_config, ai_models, tools, raptor_setup)
@@ -158,97 +181,241 @@ def initialize_system(callback_handler):
     ai_models = AIModels(azure_config)
     
     # Base de connaissances Raptor
-    raptor_setup = RaptorSetup(ai_models=ai_models)
+    raptor_setup = RaptorSetup(ai_models=ai_models, backend=retrieval_backend, hybrid=hybrid_retrieval)
+    
+    # Cache des réponses LLM (clé : empreinte des images, prompt, modèle)
+    llm_cache = LLMResponseCache() if use_llm_cache else None
+    
+    # Cache des résultats OCR (clé : empreinte des pixels, moteur et configuration)
+    ocr_cache = OCRResultCache() if use_ocr_cache else None
     
     # Outils d'analyse
-    tools = Tools(llm=ai_models.llm, raptor=raptor_setup)
+    tools = Tools(llm=ai_models.llm, raptor=raptor_setup, llm_cache=llm_cache, ocr_cache=ocr_cache)
     
     print("✅ Système initialisé avec succès\n")
     
     return azure_config, ai_models, tools, raptor_setup
 
-async def analyze_image(image_path: str, agent = None) -> None:
+class AnalysisSession:
     """
-    Analyse une image ou un PDF avec l'agent React
-    
-    Args:
-        image_path: Chemin vers l'image ou le PDF à analyser
-        agent: Agent React préconfigurer (optionnel)
+    Session d'analyse par lot : les composants coûteux (ChromaDB, modèles Azure,
+    outils, agent) sont créés une seule fois et réutilisés pour chaque fichier.
+    Seul l'état propre à un document est réinitialisé entre deux analyses.
     """
-    # Valider et préparer le chemin du fichier
-    path = validate_image_path(image_path)
-    if not path:
-        print(f"❌ Fichier invalide : {image_path}")
-        return
-
-    # Convertir le PDF en image si nécessaire
-    if Path(path).suffix.lower() == '.pdf':
-        try:
-            print(f"🔄 Conversion du PDF en image...")
-            path = convert_pdf_to_image(path)
-            print(f"✅ PDF converti en image : {path}")
-        except Exception as e:
-            print(f"❌ Erreur lors de la conversion du PDF : {e}")
-            return
     
-    # Si aucun agent n'est fourni, en créer un nouveau
-    if agent is None:
-        # Initialiser le système
-        callback_handler = CustomCallbackHandler()
-        azure_config, ai_models, tools, raptor_setup = initialize_system(callback_handler)
+    def __init__(
+        self,
+        ai_models: Optional[AIModels] = None,
+        raptor_setup: Optional[RaptorSetup] = None,
+        token_counter: Optional[TokenCounter] = None,
+        pipeline: str = "react",
+        verbose: bool = True,
+        llm_cache: Optional[LLMResponseCache] = None,
+        use_llm_cache: bool = True,
+        retrieval_backend: str = "chroma",
+        save_converted_images: bool = False,
+        hybrid_retrieval: bool = True,
+        ocr_cache: Optional[OCRResultCache] = None,
+        use_ocr_cache: bool = True,
+    ):
+        """
+        Initialise la session
+        
+        Args:
+            ai_models: Modèles déjà initialisés à partager (optionnel)
+            raptor_setup: Base Raptor déjà initialisée à partager (optionnel)
+            token_counter: Compteur de tokens à partager (optionnel)
+            pipeline: Mode d'exécution ("react" : agent ReAct, "dag" : pipeline déterministe)
+            verbose: Active le mode verbeux de l'agent
+            llm_cache: Cache des réponses LLM à partager (optionnel)
+            use_llm_cache: Active le cache des réponses LLM lorsque le système est initialisé par la session
+            retrieval_backend: Backend de recherche de la législation lorsque le système est initialisé par la session
+            save_converted_images: Écrit aussi les pages PDF rastérisées dans converted_images/
+            hybrid_retrieval: Recherche hybride BM25 + vectorielle lorsque le système est initialisé par la session
+            ocr_cache: Cache des résultats OCR à partager (optionnel)
+            use_ocr_cache: Active le cache des résultats OCR lorsque le système est initialisé par la session
+        """
+        self.save_converted_images = save_converted_images
+        self.callback_handler = CustomCallbackHandler()
+        if ai_models is None or raptor_setup is None:
+            self.azure_config, self.ai_models, self.tools, self.raptor_setup = initialize_system(
+                self.callback_handler,
+                use_llm_cache=use_llm_cache,
+                retrieval_backend=retrieval_backend,
+                hybrid_retrieval=hybrid_retrieval,
+                use_ocr_cache=use_ocr_cache,
+            )
+        else:
+            # Composants partagés en lecture seule : seuls les outils (état par image) sont propres à la session
+            self.ai_models = ai_models
+            self.raptor_setup = raptor_setup
+            self.tools = Tools(llm=ai_models.llm, raptor=raptor_setup, llm_cache=llm_cache, ocr_cache=ocr_cache)
+        self.llm_cache = self.tools.llm_cache
+        self.ocr_cache = self.tools.ocr_cache
         
         # Créer un CallbackManager avec notre handler
-        callback_manager = CallbackManager([callback_handler])
+        self.callback_manager = CallbackManager([self.callback_handler])
         
         # Ajouter le compteur de tokens au gestionnaire de callbacks
-        token_counter = create_token_counter(verbose=True, save_dir="stats/tokens")
-        callback_manager.add_handler(token_counter)
-        
-        # Connecter le compteur de tokens au callback_handler
-        callback_handler.set_token_counter(token_counter)
-        
-        # Créer l'agent
-        agent = create_react_agent(
-            ai_models=ai_models, 
-            tools=tools, 
-            callback_manager=callback_manager,
-            verbose=True
-        )
+        self.token_counter = token_counter or create_token_counter(verbose=True, save_dir="stats/tokens")
+        self.callback_manager.add_handler(self.token_counter)
+        
+        # Connecter le compteur de tokens au callback_handler et au cache LLM
+        self.callback_handler.set_token_counter(self.token_counter)
+        if self.llm_cache is not None:
+            self.llm_cache.set_token_counter(self.token_counter)
+        
+        if pipeline == "dag":
+            # Pas d'agent : les appels LLM des outils sont suivis via le callback manager du modèle.
+            # Copie propre à la session (clients HTTP et limiteur partagés) : le modèle commun
+            # n'est pas modifié, chaque session ne reçoit que ses propres événements
+            self.agent = None
+            self.tools.llm = self.ai_models.llm.model_copy(update={"callback_manager": self.callback_manager})
+            self.pipeline = DAGPipeline(self.tools, token_counter=self.token_counter)
+        else:
+            # Créer l'agent
+            self.agent = create_react_agent(
+                ai_models=self.ai_models,
+                tools=self.tools,
+                callback_manager=self.callback_manager,
+                verbose=verbose
+            )
+            self.pipeline = None
+    
+    def reset(self) -> None:
+        """Réinitialise l'état propre au document (outils, mémoire de l'agent, étapes)"""
+        self.tools.reset_document_state()
+        self.callback_handler.reset_steps()
+        
+        # Vider la mémoire de l'agent pour ne pas mélanger deux publicités
+        if hasattr(self.agent, 'reset'):
+            self.agent.reset()
+        elif hasattr(self.agent, 'memory'):
+            self.agent.memory.reset()
+    
+    async def analyze(self, image_path: str) -> None:
+        """
+        Analyse un fichier avec les composants de la session
+        
+        Args:
+            image_path: Chemin vers l'image ou le PDF à analyser
+        """
+        self.reset()
+        await analyze_image(image_path, session=self)
+    
+    async def analyze_page(self, pdf_path: str, page_number: int, image_bytes: bytes) -> Dict[str, Any]:
+        """
+        Analyse une page d'un PDF multipage déjà rastérisée, sans sauvegarder le résultat
+        
+        Args:
+            pdf_path: Chemin vers le PDF
+            page_number: Numéro de la page (à partir de 0)
+            image_bytes: Rendu de la page
+            
+        Returns:
+            Dict[str, Any]: Résultat de la page {"page", "steps", "final_response", "converted_file"}
+        """
+        self.reset()
+        
+        # Chemin virtuel propre à la page : les outils trouvent son rendu dans le registre des images
+        page_path = str(Path(pdf_path).with_name(f"{Path(pdf_path).stem}_page_{page_number + 1}.png"))
+        self.tools.set_source_image(page_path, image_bytes)
+        self.tools.set_text_layer(read_usable_text_layer(pdf_path, page_number))
+        converted_file = save_converted_image(page_path, image_bytes) if self.save_converted_images else None
+        
+        print(f"📄 Analyse de la page {page_number + 1} de {Path(pdf_path).name}")
+        steps, response = await run_analysis(self, page_path)
+        return {
+            "page": page_number + 1,
+            "steps": steps,
+            "final_response": response,
+            "converted_file": converted_file,
+            "image_budget": report_image_budget(self),
+        }
+
+def read_usable_text_layer(pdf_path: str, page_number: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Lit la couche texte d'une page d'un PDF si elle est assez riche pour
+    remplacer l'OCR et l'extraction par vision
+    
+    Args:
+        pdf_path: Chemin vers le PDF
+        page_number: Numéro de la page (0 : première page)
+        
+    Returns:
+        Optional[Dict]: Couche texte (texte et blocs positionnés), ou None si absente ou trop pauvre
+    """
+    try:
+        layer = extract_text_layer(pdf_path, page_number)
+    except Exception as e:
+        print(f"⚠️ Lecture de la couche texte impossible : {e}")
+        return None
+    
+    if not is_text_layer_usable(layer):
+        print(f"🔎 Couche texte absente ou insuffisante ({layer['words']} mots) : extraction par OCR/vision")
+        return None
+    
+    print(f"📄 Couche texte exploitable : {layer['words']} mots, {len(layer['blocks'])} blocs")
+    return layer
+
+async def run_analysis(session: AnalysisSession, path: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Exécute l'agent ou le pipeline de la session sur une image
+    
+    Args:
+        session: Session d'analyse (état du document déjà préparé)
+        path: Chemin de l'image ou du PDF, tel que transmis aux outils
+        
+    Returns:
+        Tuple[Dict[str, Any], str]: Étapes de l'analyse et réponse finale
+    """
+    agent = session.agent
+    steps = session.callback_handler.steps
 
     start_time = datetime.now()
     print(f"⏱️  Début de l'analyse : {start_time.strftime('%H:%M:%S')}")
     
     # Exécuter l'analyse
     try:
-        # Essayer d'abord avec `aquery` qui est souvent utilisé dans les versions récentes
-        if hasattr(agent, 'aquery'):
-            raw_response = await asyncio.wait_for(agent.aquery(path), timeout=300)  # Timeout de 5 minutes
-        # Sinon essayer avec `achat` 
-        elif hasattr(agent, 'achat'):
-            raw_response = await asyncio.wait_for(agent.achat(path), timeout=300)  # Timeout de 5 minutes
-        # Ou essayer avec `run` en mode synchrone si nécessaire
-        elif hasattr(agent, 'run'):
-            raw_response = agent.run(path)  # Pas de timeout pour run synchrone
-        else:
-            raise AttributeError("L'agent ne possède aucune méthode appropriée pour l'exécution (aquery, achat, run)")
-        
-        # Convertir la réponse en chaîne de caractères
-        if hasattr(raw_response, 'response'):
-            response = raw_response.response
-        elif hasattr(raw_response, 'result'):
-            response = raw_response.result
-        elif hasattr(raw_response, 'output'):
-            response = raw_response.output
-        elif hasattr(raw_response, 'message'):
-            response = raw_response.message
-        elif isinstance(raw_response, dict) and 'response' in raw_response:
-            response = raw_response['response']
-        elif isinstance(raw_response, str):
-            response = raw_response
+        if session.pipeline is not None:
+            # Mode DAG : les outils sont appelés directement, sans boucle Thought/Action
+            results = await asyncio.wait_for(session.pipeline.arun(path), timeout=300)  # Timeout de 5 minutes
+            steps = results["steps"]
+            response = results["final_response"]
+            
+            # Sans agent, aucune trace n'est clôturée : afficher les statistiques ici
+            session.token_counter.print_step_stats()
+            session.token_counter.save_stats()
         else:
-            # En dernier recours, convertir en chaîne de caractères
-            response = str(raw_response)
-            print(f"⚠️ Conversion de l'objet Response en chaîne - type original: {type(raw_response)}")
+            # Essayer d'abord avec `aquery` qui est souvent utilisé dans les versions récentes
+            if hasattr(agent, 'aquery'):
+                raw_response = await asyncio.wait_for(agent.aquery(path), timeout=300)  # Timeout de 5 minutes
+            # Sinon essayer avec `achat` 
+            elif hasattr(agent, 'achat'):
+                raw_response = await asyncio.wait_for(agent.achat(path), timeout=300)  # Timeout de 5 minutes
+            # Ou essayer avec `run` en mode synchrone si nécessaire
+            elif hasattr(agent, 'run'):
+                raw_response = agent.run(path)  # Pas de timeout pour run synchrone
+            else:
+                raise AttributeError("L'agent ne possède aucune méthode appropriée pour l'exécution (aquery, achat, run)")
+        
+            # Convertir la réponse en chaîne de caractères
+            if hasattr(raw_response, 'response'):
+                response = raw_response.response
+            elif hasattr(raw_response, 'result'):
+                response = raw_response.result
+            elif hasattr(raw_response, 'output'):
+                response = raw_response.output
+            elif hasattr(raw_response, 'message'):
+                response = raw_response.message
+            elif isinstance(raw_response, dict) and 'response' in raw_response:
+                response = raw_response['response']
+            elif isinstance(raw_response, str):
+                response = raw_response
+            else:
+                # En dernier recours, convertir en chaîne de caractères
+                response = str(raw_response)
+                print(f"⚠️ Conversion de l'objet Response en chaîne - type original: {type(raw_response)}")
     except Exception as e:
         print(f"❌ Erreur lors de l'exécution de l'agent: {str(e)}")
         response = f"Erreur d'analyse: {str(e)}"
@@ -257,20 +424,84 @@ async def analyze_image(image_path: str, agent = None) -> None:
     duration = end_time - start_time
     print(f"⏱️  Fin de l'analyse : {end_time.strftime('%H:%M:%S')} (durée: {duration})")
     
+    # Copie : les étapes du callback handler sont réinitialisées au document suivant
+    return dict(steps), response
+
+def report_image_budget(session: AnalysisSession) -> Dict[str, int]:
+    """
+    Affiche et renvoie le bilan des images envoyées aux appels vision du document
+    
+    Args:
+        session: Session dont le document vient d'être analysé
+        
+    Returns:
+        Dict[str, int]: Bilan (voir Tools.image_budget_report)
+    """
+    report = session.tools.image_budget_report()
+    if report["calls"]:
+        print(f"🖼️ Budget image : {report['calls']} appel(s) vision, ~{report['tokens_sent']} tokens image "
+              f"au lieu de ~{report['tokens_full']} ({report['tokens_saved']} économisés), "
+              f"{report['bytes_sent'] / 1024:.0f} Ko envoyés au lieu de {report['bytes_full'] / 1024:.0f} Ko")
+    return report
+
+async def analyze_image(image_path: str, session: Optional[AnalysisSession] = None) -> None:
+    """
+    Analyse une image ou un PDF avec l'agent React
+    
+    Args:
+        image_path: Chemin vers l'image ou le PDF à analyser
+        session: Session d'analyse déjà initialisée (optionnel)
+    """
+    # Valider et préparer le chemin du fichier
+    path = validate_image_path(image_path)
+    if not path:
+        print(f"❌ Fichier invalide : {image_path}")
+        return
+
+    # Si aucune session n'est fournie, en créer une nouvelle
+    if session is None:
+        session = AnalysisSession()
+    
+    # Rastériser le PDF en mémoire si nécessaire : les outils reçoivent le chemin du PDF
+    # et utilisent son rendu, sans PNG intermédiaire (écriture sur disque optionnelle)
+    text_layer = None
+    converted_file = None
+    if Path(path).suffix.lower() == '.pdf':
+        # Couche texte exploitable : elle remplace l'extraction du texte brut par GPT Vision
+        text_layer = read_usable_text_layer(path)
+        try:
+            # Résolution juste suffisante pour les appels vision (les images sont réduites avant envoi)
+            dpi = vision_render_dpi(*get_page_size(path))
+            print(f"🔄 Rastérisation du PDF en mémoire ({dpi} dpi)...")
+            image_bytes = render_pdf_to_bytes(path, dpi)
+            session.tools.set_source_image(path, image_bytes)
+            print(f"✅ PDF rastérisé ({len(image_bytes) / 1024:.0f} Ko)")
+            if session.save_converted_images:
+                converted_file = save_converted_image(path, image_bytes)
+                print(f"💾 Image convertie sauvegardée : {converted_file}")
+        except Exception as e:
+            print(f"❌ Erreur lors de la conversion du PDF : {e}")
+            return
+    session.tools.set_text_layer(text_layer)
+    
+    steps, response = await run_analysis(session, path)
+    
     # Sauvegarder le résultat
     try:
         output_path = save_output(path, {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "converted_file": converted_file,
             "steps": {
-                "vision_analysis": callback_handler.steps["vision_analysis"],
-                "consistency_check": callback_handler.steps["consistency_check"],
-                "dates_verification": callback_handler.steps["dates_verification"],
-                "legislation": callback_handler.steps["legislation"],
-                "clarifications": callback_handler.steps["clarifications"],
-                "compliance_analysis": callback_handler.steps["compliance_analysis"],
-                "raw_text": callback_handler.steps["raw_text"]
+                "vision_analysis": steps["vision_analysis"],
+                "consistency_check": steps["consistency_check"],
+                "dates_verification": steps["dates_verification"],
+                "legislation": steps["legislation"],
+                "clarifications": steps["clarifications"],
+                "compliance_analysis": steps["compliance_analysis"],
+                "raw_text": steps["raw_text"]
             },
-            "final_response": response
+            "final_response": response,
+            "image_budget": report_image_budget(session),
         })
         print(f"💾 Résultat sauvegardé : {output_path}")
     except Exception as e:
@@ -278,6 +509,52 @@ async def analyze_image(image_path: str, agent = None) -> None:
     
     print("🏁 Analyse terminée")
 
+def select_pdf_pages(file_path: str, pages: Optional[str] = None) -> List[int]:
+    """
+    Pages d'un PDF à analyser
+    
+    Args:
+        file_path: Chemin du fichier
+        pages: Sélection de pages ("1-3,5" ; None : toutes les pages)
+        
+    Returns:
+        List[int]: Numéros de page (à partir de 0) ; [0] pour une image ou un PDF d'une page
+    """
+    if Path(file_path).suffix.lower() != '.pdf':
+        return [0]
+    return parse_page_range(pages, get_page_count(file_path))
+
+def merge_page_results(page_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Regroupe les résultats des pages d'un PDF en un seul enregistrement
+    
+    Args:
+        page_results: Résultats par page (voir AnalysisSession.analyze_page), dans l'ordre des pages
+        
+    Returns:
+        Dict[str, Any]: Données pour save_output : chaque étape et la réponse finale concatènent
+                        les pages (précédées de leur numéro), le détail par page est conservé dans "pages"
+    """
+    def merge(values: List[Tuple[int, Any]]) -> str:
+        return "\n\n".join(f"--- Page {page} ---\n{value}" for page, value in values if value)
+    
+    # Une page en échec n'a pas d'étapes : les noms sont pris sur l'ensemble des pages
+    step_names = list(dict.fromkeys(name for result in page_results for name in result["steps"]))
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "converted_file": None,
+        "steps": {
+            name: merge([(result["page"], result["steps"].get(name, "")) for result in page_results])
+            for name in step_names
+        },
+        "final_response": merge([(result["page"], result["final_response"]) for result in page_results]),
+        "image_budget": {
+            key: sum(result.get("image_budget", {}).get(key, 0) for result in page_results)
+            for key in ("calls", "tokens_full", "tokens_sent", "tokens_saved", "bytes_full", "bytes_sent")
+        },
+        "pages": page_results,
+    }
+
 def validate_image_path(path: str) -> str:
     """
     Valide le chemin de l'image ou du PDF
@@ -349,50 +626,210 @@ def get_files_to_analyze(path: str, recursive: bool = False) -> List[str]:
         print(f"❌ Chemin invalide: {path_obj}")
         return []
 
-async def analyze_files(files: List[str]) -> None:
+async def analyze_files(
+    files: List[str],
+    concurrency: int = 1,
+    pipeline: str = "react",
+    use_llm_cache: bool = True,
+    retrieval_backend: str = "chroma",
+    save_converted_images: bool = False,
+    pages: Optional[str] = None,
+    hybrid_retrieval: bool = True,
+    use_ocr_cache: bool = True,
+    render_workers: Optional[int] = None,
+) -> None:
     """
-    Analyse une liste de fichiers
+    Analyse une liste de fichiers avec un pool borné de sessions
+    
+    Chaque worker possède sa propre session (outils et agent isolés, car Tools
+    conserve l'état de l'image en cours), tandis que les modèles Azure et la base
+    Raptor sont partagés. Le temps d'analyse étant dominé par l'attente des appels
+    Azure OpenAI, plusieurs documents peuvent être traités simultanément.
+    
+    Les pages d'un PDF multipage sont rastérisées par lots (un pool de processus créé pour
+    toute l'analyse, dimensionné sur les cœurs et non sur `concurrency`, résolution adaptée
+    au format de chaque page), puis analysées comme des documents distincts par le même
+    pool de sessions ; leurs résultats sont regroupés en un seul enregistrement une fois la
+    dernière page terminée. La file étant bornée, seules quelques images de page sont en
+    mémoire à la fois, même pour un long PDF.
     
     Args:
         files: Liste des chemins de fichiers à analyser
+        concurrency: Nombre de documents analysés en parallèle
+        pipeline: Mode d'exécution ("react" ou "dag")
+        use_llm_cache: Réutilise les réponses LLM des requêtes déjà traitées
+        retrieval_backend: Backend de recherche de la législation ("chroma", "numpy" ou "hnsw")
+        save_converted_images: Écrit aussi les pages PDF rastérisées dans converted_images/
+        pages: Pages des PDF à analyser ("1-3,5" ; None : toutes les pages)
+        hybrid_retrieval: Fusionne la recherche vectorielle avec l'index BM25 de la législation
+        use_ocr_cache: Réutilise les résultats OCR des images déjà traitées
+        render_workers: Nombre de processus de rastérisation des PDF (défaut : nombre de cœurs)
     """
     if not files:
         print("⚠️ Aucun fichier à analyser")
         return
-        
-    print(f"🔍 Analyse de {len(files)} fichier(s)...")
     
-    # Initialiser le système
-    callback_handler = CustomCallbackHandler()
-    azure_config, ai_models, tools, raptor_setup = initialize_system(callback_handler)
+    start_time = datetime.now()
     
-    # Créer un CallbackManager avec notre handler
-    callback_manager = CallbackManager([callback_handler])
+    # Documents à analyser : un fichier, ou un PDF multipage et ses pages sélectionnées
+    documents: List[Any] = []
+    page_results: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    expected_pages: Dict[str, int] = {}
+    for file_path in files:
+        try:
+            page_numbers = select_pdf_pages(file_path, pages)
+        except Exception as e:
+            print(f"❌ Sélection des pages impossible pour {file_path}: {str(e)}")
+            continue
+        
+        if page_numbers == [0]:
+            documents.append(file_path)
+        else:
+            documents.append((file_path, page_numbers))
+            page_results[file_path] = {}
+            expected_pages[file_path] = len(page_numbers)
+    
+    job_count = sum(1 if isinstance(document, str) else len(document[1]) for document in documents)
+    if job_count == 0:
+        print("⚠️ Aucun document à analyser")
+        return
     
-    # Ajouter le compteur de tokens au gestionnaire de callbacks
-    token_counter = create_token_counter(verbose=True, save_dir="stats/tokens")
-    callback_manager.add_handler(token_counter)
+    concurrency = max(1, min(concurrency, job_count))
+    print(f"🔍 Analyse de {len(files)} fichier(s), {job_count} document(s) ou page(s) "
+          f"({concurrency} en parallèle)...")
     
-    # Connecter le compteur de tokens au callback_handler
-    callback_handler.set_token_counter(token_counter)
+    # File de travail bornée : un fichier, une page (pdf, numéro, rendu) ou None (fin de la file)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
     
-    # Créer l'agent
-    agent = create_react_agent(
-        ai_models=ai_models, 
-        tools=tools, 
-        callback_manager=callback_manager,
-        verbose=True
+    # Initialiser une seule fois le système, puis des sessions supplémentaires partageant ses composants.
+    # Le compteur de tokens est commun : les totaux restent exacts, mais la répartition
+    # par étape n'est qu'indicative lorsque plusieurs documents sont en cours.
+    first_session = AnalysisSession(
+        pipeline=pipeline,
+        use_llm_cache=use_llm_cache,
+        retrieval_backend=retrieval_backend,
+        save_converted_images=save_converted_images,
+        hybrid_retrieval=hybrid_retrieval,
+        use_ocr_cache=use_ocr_cache,
     )
+    sessions = [first_session]
+    for _ in range(concurrency - 1):
+        sessions.append(AnalysisSession(
+            ai_models=first_session.ai_models,
+            raptor_setup=first_session.raptor_setup,
+            token_counter=first_session.token_counter,
+            pipeline=pipeline,
+            llm_cache=first_session.llm_cache,
+            save_converted_images=save_converted_images,
+            ocr_cache=first_session.ocr_cache,
+        ))
     
-    # Analyser chaque fichier
-    for file_path in files:
+    def save_pdf_results(file_path: str) -> None:
+        """Sauvegarde l'enregistrement regroupé d'un PDF multipage"""
+        document_results = page_results.pop(file_path)
+        results = [document_results[page] for page in sorted(document_results)]
         try:
-            print(f"\n📄 Analyse du fichier: {file_path}")
-            await analyze_image(file_path)
+            merged = merge_page_results(results)
+            print(f"🖼️ Budget image du document : {merged['image_budget']['tokens_saved']} tokens vision économisés")
+            output_path = save_output(file_path, merged)
+            print(f"💾 Résultat sauvegardé ({len(results)} pages) : {output_path}")
         except Exception as e:
-            print(f"❌ Erreur lors de l'analyse de {file_path}: {str(e)}")
+            print(f"❌ Erreur lors de la sauvegarde du résultat : {e}")
+    
+    def record_page_result(file_path: str, page_number: int, result: Dict[str, Any]) -> None:
+        """Enregistre le résultat d'une page, et sauvegarde le PDF une fois sa dernière page terminée"""
+        page_results[file_path][page_number] = result
+        if len(page_results[file_path]) == expected_pages[file_path]:
+            save_pdf_results(file_path)
+    
+    # Pool de rastérisation unique, réutilisé d'un lot à l'autre et d'un PDF à l'autre
+    render_workers = max(1, render_workers or os.cpu_count() or 1)
+    has_pdf_pages = any(not isinstance(document, str) for document in documents)
+    render_pool = ProcessPoolExecutor(max_workers=render_workers) if render_workers > 1 and has_pdf_pages else None
+    # Un lot occupe tous les processus de rendu, et au moins toutes les sessions
+    render_batch_size = max(concurrency, render_workers)
+    
+    def render_batch(file_path: str, page_numbers: List[int]) -> Dict[int, bytes]:
+        """Rastérise un lot de pages, chacune à la résolution adaptée à son format"""
+        dpi = {page_number: vision_render_dpi(*get_page_size(file_path, page_number)) for page_number in page_numbers}
+        return render_pdf_pages(file_path, page_numbers, dpi, workers=render_workers, executor=render_pool)
+    
+    async def producer() -> None:
+        """Remplit la file au rythme des sessions, en rastérisant les PDF par lots"""
+        try:
+            for document in documents:
+                if isinstance(document, str):
+                    await queue.put(document)
+                    continue
+                
+                file_path, page_numbers = document
+                for start in range(0, len(page_numbers), render_batch_size):
+                    batch = page_numbers[start:start + render_batch_size]
+                    try:
+                        render_start = time.perf_counter()
+                        rendered = await asyncio.to_thread(render_batch, file_path, batch)
+                        print(f"🔄 {Path(file_path).name} : {len(rendered)} page(s) rastérisée(s) en "
+                              f"{time.perf_counter() - render_start:.2f}s")
+                    except Exception as e:
+                        print(f"❌ Erreur lors de la conversion du PDF {file_path}: {str(e)}")
+                        for page_number in batch:
+                            record_page_result(file_path, page_number, {
+                                "page": page_number + 1, "steps": {}, "final_response": f"Erreur de conversion: {str(e)}"
+                            })
+                        continue
+                    
+                    for page_number, image_bytes in rendered.items():
+                        await queue.put((file_path, page_number, image_bytes))
+        finally:
+            for _ in sessions:
+                await queue.put(None)
+    
+    async def worker(session: AnalysisSession) -> None:
+        """Traite les fichiers et les pages de la file jusqu'à épuisement"""
+        while True:
+            job = await queue.get()
+            if job is None:
+                queue.task_done()
+                return
             
-    print("\n✅ Analyse terminée")
+            if isinstance(job, str):
+                try:
+                    print(f"\n📄 Analyse du fichier: {job}")
+                    await session.analyze(job)
+                except Exception as e:
+                    print(f"❌ Erreur lors de l'analyse de {job}: {str(e)}")
+                finally:
+                    queue.task_done()
+                continue
+            
+            file_path, page_number, image_bytes = job
+            try:
+                result = await session.analyze_page(file_path, page_number, image_bytes)
+            except Exception as e:
+                print(f"❌ Erreur lors de l'analyse de la page {page_number + 1} de {file_path}: {str(e)}")
+                result = {"page": page_number + 1, "steps": {}, "final_response": f"Erreur d'analyse: {str(e)}"}
+            finally:
+                queue.task_done()
+            
+            record_page_result(file_path, page_number, result)
+    
+    try:
+        await asyncio.gather(producer(), *(worker(session) for session in sessions))
+    finally:
+        if render_pool is not None:
+            render_pool.shutdown(wait=True)
+            
+    print(f"\n✅ Analyse terminée (durée totale: {datetime.now() - start_time})")
+    
+    if first_session.llm_cache is not None:
+        cache_stats = first_session.llm_cache.stats()
+        print(f"♻️ Cache LLM : {cache_stats['hits']} succès, {cache_stats['misses']} échecs "
+              f"({cache_stats['hit_ratio']:.1%}), {cache_stats['entries']} entrées, {cache_stats['size_mb']:.1f} Mo")
+    
+    if getattr(first_session.raptor_setup, "embedding_cache", None) is not None:
+        cache_stats = first_session.raptor_setup.embedding_cache.stats()
+        print(f"♻️ Cache des embeddings de requêtes : {cache_stats['hits']} succès, {cache_stats['misses']} échecs "
+              f"({cache_stats['hit_ratio']:.1%}), {cache_stats['entries']} entrées, {cache_stats['size_mb']:.1f} Mo")
 
 def test_text_extraction(files: List[str], tools: Tools, mode: str = "docling", ocr_engine: str = "tesseract") -> None:
     """
@@ -418,17 +855,63 @@ def test_text_extraction(files: List[str], tools: Tools, mode: str = "docling",
         except Exception as e:
             print(f"❌ Erreur lors de l'extraction de texte: {str(e)}")
 
-def extract_raw_text(files: List[str], method: str = "auto") -> None:
+def save_raw_text(file_path: str, method_name: str, text: str) -> None:
+    """
+    Sauvegarde un texte brut extrait dans outputs/raw_text
+    
+    Args:
+        file_path: Fichier analysé
+        method_name: Méthode d'extraction (utilisée dans le nom du fichier de sortie)
+        text: Texte extrait
+    """
+    try:
+        # Créer le chemin de sortie
+        output_dir = Path("outputs") / "raw_text"
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Nom du fichier de sortie
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = output_dir / f"{Path(file_path).stem}_{method_name}_{timestamp}.txt"
+        
+        # Écrire le texte extrait
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(text)
+        
+        print(f"💾 Texte sauvegardé: {output_file}")
+        
+    except Exception as e:
+        print(f"❌ Erreur lors de la sauvegarde du texte: {str(e)}")
+
+def extract_raw_text(files: List[str], method: str = "auto", use_ocr_cache: bool = True, workers: int = 1) -> None:
     """
     Utilise le nouvel extracteur pour obtenir le texte brut des images sans corrections
     
     Args:
         files: Liste des fichiers à analyser
         method: Méthode d'extraction à utiliser ('tesseract', 'easyocr', 'auto', 'gpt_vision')
+        use_ocr_cache: Réutilise les résultats OCR des images déjà traitées
+        workers: Nombre de processus d'extraction OCR en parallèle (hors gpt_vision)
     """
     print(f"\n🔍 Extraction de texte BRUT sur {len(files)} fichier(s)...")
     print(f"📊 Méthode: {method}")
     
+    # PDF avec couche texte exploitable : texte lu directement, sans OCR ni appel vision
+    remaining_files = []
+    for file_path in files:
+        layer = read_usable_text_layer(file_path) if Path(file_path).suffix.lower() == '.pdf' else None
+        if layer is None:
+            remaining_files.append(file_path)
+            continue
+        print(f"\n📄 Fichier: {file_path}")
+        print("\n===== TEXTE EXTRAIT DE LA COUCHE TEXTE DU PDF =====")
+        print("-" * 50)
+        print(layer["text"])
+        print("-" * 50)
+        save_raw_text(file_path, "text_layer", layer["text"])
+    files = remaining_files
+    if not files:
+        return
+    
     # Si nous utilisons GPT Vision, utiliser les outils de l'application principale
     if method == "gpt_vision":
         # Initialiser le système
@@ -453,14 +936,21 @@ def extract_raw_text(files: List[str], method: str = "auto") -> None:
         return
     
     # Initialiser l'extracteur de texte brut traditionnel pour les autres méthodes
-    extractor = RawTextExtractor()
+    ocr_cache = OCRResultCache() if use_ocr_cache else None
+    extractor = RawTextExtractor(ocr_cache=ocr_cache)
+    if workers > 1:
+        print(f"⚙️ {workers} processus d'extraction en parallèle")
     
-    for file_path in files:
-        print(f"\n📄 Fichier: {file_path}")
+    # Résultats affichés et sauvegardés dès qu'un fichier est terminé (ordre de fin de traitement)
+    start_time = time.perf_counter()
+    for done, item in enumerate(extractor.iter_extract_raw_text(files, method, workers=workers), start=1):
+        file_path = item["item"]
+        print(f"\n📄 [{done}/{len(files)}] Fichier: {file_path} ({item['elapsed']:.2f}s)")
         
         try:
-            # Extraire le texte brut
-            results = extractor.extract_raw_text(file_path, method)
+            if item["error"]:
+                raise RuntimeError(item["error"])
+            results = item["result"]
             
             if not results:
                 print("❌ Aucun texte extrait")
@@ -474,26 +964,21 @@ def extract_raw_text(files: List[str], method: str = "auto") -> None:
                 print("-" * 50)
                 
                 # Sauvegarder le résultat
-                try:
-                    # Créer le chemin de sortie
-                    output_dir = Path("outputs") / "raw_text"
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    # Nom du fichier de sortie
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    output_file = output_dir / f"{Path(file_path).stem}_{method_name}_{timestamp}.txt"
-                    
-                    # Écrire le texte extrait
-                    with open(output_file, "w", encoding="utf-8") as f:
-                        f.write(text)
-                    
-                    print(f"💾 Texte sauvegardé: {output_file}")
-                    
-                except Exception as e:
-                    print(f"❌ Erreur lors de la sauvegarde du texte: {str(e)}")
+                save_raw_text(file_path, method_name, text)
             
         except Exception as e:
             print(f"❌ Erreur lors de l'extraction de texte: {str(e)}")
+    
+    print(f"\n⏱️ {len(files)} fichier(s) traité(s) en {time.perf_counter() - start_time:.2f}s")
+    
+    if ocr_cache is not None:
+        cache_stats = ocr_cache.stats()
+        if workers > 1:
+            # Les succès/échecs sont comptés dans les processus du pool
+            print(f"♻️ Cache OCR : {cache_stats['entries']} entrées, {cache_stats['size_mb']:.1f} Mo")
+        else:
+            print(f"♻️ Cache OCR : {cache_stats['hits']} succès, {cache_stats['misses']} échecs "
+                  f"({cache_stats['hit_ratio']:.1%}), {cache_stats['entries']} entrées, {cache_stats['size_mb']:.1f} Mo")
 
 def parse_args():
     """Parse les arguments de la ligne de commande"""
@@ -511,6 +996,24 @@ def parse_args():
                         default="tesseract", help="Moteur OCR à utiliser avec Docling")
     parser.add_argument("--method", choices=["tesseract", "easyocr", "auto", "gpt_vision"], default="auto",
                         help="Méthode d'extraction de texte brut")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Nombre de processus pour l'extraction OCR de texte brut (défaut: 1)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Nombre de documents analysés en parallèle (défaut: 1)")
+    parser.add_argument("--pipeline", choices=["react", "dag"], default="react",
+                        help="Mode d'analyse : agent ReAct ou pipeline déterministe (dag)")
+    parser.add_argument("--no_llm_cache", action="store_true",
+                        help="Désactive le cache des réponses LLM (force de nouveaux appels)")
+    parser.add_argument("--save_converted_images", action="store_true",
+                        help="Écrit aussi les pages PDF rastérisées dans converted_images/ (analyse en mémoire sinon)")
+    parser.add_argument("--pages", default=None,
+                        help="Pages des PDF à analyser, ex: 1-3,5 (défaut: toutes les pages)")
+    parser.add_argument("--no_ocr_cache", action="store_true",
+                        help="Désactive le cache des résultats OCR (force une nouvelle reconnaissance)")
+    parser.add_argument("--retrieval_backend", choices=list(RaptorSetup.BACKENDS), default="chroma",
+                        help="Recherche de la législation : ChromaDB, index NumPy en mémoire (numpy) ou HNSW (hnsw)")
+    parser.add_argument("--no_hybrid_retrieval", action="store_true",
+                        help="Recherche vectorielle seule, sans fusion avec l'index BM25 (numéros d'articles, mentions exactes)")
     
     return parser.parse_args()
 
@@ -519,17 +1022,30 @@ def main():
     args = parse_args()
     
     if args.files or args.dir:
-        callback_handler = CustomCallbackHandler()
-        azure_config, ai_models, tools, raptor_setup = initialize_system(callback_handler)
-        
         files_to_analyze = get_files_to_analyze(args.dir if args.dir else args.files[0])
         
         if args.test_text_extraction:
+            callback_handler = CustomCallbackHandler()
+            azure_config, ai_models, tools, raptor_setup = initialize_system(
+                callback_handler, use_ocr_cache=not args.no_ocr_cache
+            )
             test_text_extraction(files_to_analyze, tools, args.mode, args.ocr)
         elif args.extract_raw_text:
-            extract_raw_text(files_to_analyze, args.method)
+            extract_raw_text(
+                files_to_analyze, args.method, use_ocr_cache=not args.no_ocr_cache, workers=args.workers
+            )
         else:
-            asyncio.run(analyze_files(files_to_analyze))
+            asyncio.run(analyze_files(
+                files_to_analyze,
+                concurrency=args.concurrency,
+                pipeline=args.pipeline,
+                use_llm_cache=not args.no_llm_cache,
+                retrieval_backend=args.retrieval_backend,
+                save_converted_images=args.save_converted_images,
+                pages=args.pages,
+                hybrid_retrieval=not args.no_hybrid_retrieval,
+                use_ocr_cache=not args.no_ocr_cache,
+            ))
     else:
         print("❌ Aucun fichier ou répertoire spécifié. Utilisez --file ou --dir.")
 
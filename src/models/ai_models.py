@@ -1,16 +1,28 @@
 from llama_index.llms.azure_openai import AzureOpenAI
 from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
+import httpx
 from config.azure_config import AzureConfig
+from utils.rate_limiter import RateLimiter, RateLimitedTransport, AsyncRateLimitedTransport
 
 class AIModels:
     """Initialisation des modèles AI"""
     def __init__(self, config: AzureConfig):
+        # Limiteurs de débit partagés par tous les appels (sync et async) de chaque déploiement
+        self.chat_rate_limiter = RateLimiter(
+            config.CHAT_REQUESTS_PER_MINUTE, config.CHAT_TOKENS_PER_MINUTE, name="gpt4o"
+        )
+        self.embedding_rate_limiter = RateLimiter(
+            config.EMBEDDING_REQUESTS_PER_MINUTE, config.EMBEDDING_TOKENS_PER_MINUTE, name="text-embedding-3-large"
+        )
+        
         self.embedding_model = AzureOpenAIEmbedding(
             engine="text-embedding-3-large",
             model="text-embedding-3-large",
             api_key=config.API_KEY,
             azure_endpoint=config.ENDPOINT,
             api_version=config.API_VERSION,
+            http_client=httpx.Client(transport=RateLimitedTransport(self.embedding_rate_limiter)),
+            async_http_client=httpx.AsyncClient(transport=AsyncRateLimitedTransport(self.embedding_rate_limiter)),
         )
         
         self.llm = AzureOpenAI(
@@ -19,5 +31,7 @@ class AIModels:
             api_version=config.API_VERSION,
             model="gpt-4o",
             api_key=config.API_KEY,
-            supports_content_blocks=True
+            supports_content_blocks=True,
+            http_client=httpx.Client(transport=RateLimitedTransport(self.chat_rate_limiter)),
+            async_http_client=httpx.AsyncClient(transport=AsyncRateLimitedTransport(self.chat_rate_limiter)),
         ) 
\ No newline at end of file
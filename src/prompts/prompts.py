@@ -586,6 +586,24 @@ RECOMMANDATIONS LÉGALES :
 - [ADOPTER UN TON ALARMANT si mentions obligatoires absentes]
 - **IMPORTANT : NE JAMAIS RECOMMANDER D'AJOUTER UNE ADRESSE DE L'ÉTABLISSEMENT - L'ADRESSE N'EST PAS OBLIGATOIRE POUR LES PUBLICITÉS STANDARDS**"""
 
+dag_clarifications_questions = """En tenant compte des vérifications déjà réalisées sur cette publicité :
+
+VÉRIFICATION DE COHÉRENCE :
+{consistency_check}
+
+VÉRIFICATION DES DATES :
+{dates_verification}
+
+LÉGISLATION APPLICABLE :
+{legislation}
+
+QUESTIONS :
+1. Les mentions légales obligatoires pour le secteur identifié sont-elles présentes, lisibles et de taille suffisante ?
+2. Les incohérences signalées ci-dessus (coordonnées, orthographe, dates, prix) sont-elles confirmées par l'image ?
+3. Chaque astérisque (*) possède-t-il un renvoi correspondant ?
+4. Les logos et mentions d'origine sont-ils cohérents avec les produits présentés ?
+"""
+
 raw_text_extraction_prompt = """EXTRACTION DE TEXTE BRUT SANS AUCUNE CORRECTION
 =========
 
@@ -0,0 +1,61 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))  # Ajoute le dossier src au PYTHONPATH
+
+import argparse
+import json
+from typing import Dict, List
+from llama_index.core.schema import QueryBundle
+from config.azure_config import AzureConfig
+from models.ai_models import AIModels
+from prompts.prompts import search_query
+from raptor.hybrid_retrieval import tokenize
+from raptor.raptor_setup import RaptorSetup
+
+def normalize(text: str) -> str:
+    """Forme comparable d'un texte : mots de l'index BM25 (sans les paires de mots)"""
+    return " ".join(token for token in tokenize(text) if " " not in token)
+
+def recall(texts: List[str], expected: List[str]) -> float:
+    """Part des passages attendus présents dans les textes trouvés"""
+    found = " | ".join(normalize(text) for text in texts)
+    return sum(normalize(passage) in found for passage in expected) / len(expected)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare le recall@k des recherches dense, BM25 et hybride")
+    parser.add_argument("--queries", required=True,
+                        help='Fichier JSONL : {"query": "contexte de recherche", "expected": ["L. 3323-4", ...]} par ligne')
+    parser.add_argument("--top_k", type=int, default=RaptorSetup.TOP_K, help="Nombre de résultats (recall@k)")
+    args = parser.parse_args()
+
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [json.loads(line) for line in f if line.strip()]
+
+    setup = RaptorSetup(AIModels(AzureConfig()), hybrid=True)
+    if setup.bm25_index is None:
+        print("❌ La collection legislation_PUB est vide")
+        return
+
+    recalls: Dict[str, List[float]] = {"dense": [], "bm25": [], "hybride": []}
+    for item in queries:
+        formatted_query = search_query.format(query=item["query"])
+        # Les candidats denses sont déjà ordonnés : le top-k dense en est le début
+        dense = [result.node.get_content() for result in setup.dense_retriever.retrieve(formatted_query)][:args.top_k]
+        lexical_ids = [node_id for node_id, _ in setup.bm25_index.search(item["query"], args.top_k)]
+        lexical = setup.collection.get(ids=lexical_ids, include=["documents"])["documents"] if lexical_ids else []
+        setup.retriever.top_k = args.top_k
+        hybrid = [
+            result.node.get_content()
+            for result in setup.retriever.retrieve(QueryBundle(query_str=item["query"], custom_embedding_strs=[formatted_query]))
+        ]
+        recalls["dense"].append(recall(dense, item["expected"]))
+        recalls["bm25"].append(recall(lexical, item["expected"]))
+        recalls["hybride"].append(recall(hybrid, item["expected"]))
+
+    print(f"\n📊 {len(queries)} requêtes, recall@{args.top_k}")
+    print(f"{'Méthode':<10}{'Recall@' + str(args.top_k):>12}")
+    for name, values in recalls.items():
+        print(f"{name:<10}{sum(values) / len(values):>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))  # Ajoute le dossier src au PYTHONPATH
+
+import argparse
+import tempfile
+import time
+from typing import Dict, List, Tuple
+import chromadb
+import numpy as np
+from llama_index.core.schema import TextNode
+from llama_index.vector_stores.chroma import ChromaVectorStore
+from raptor.init_db import UniqueIDVectorStore, WRITE_BATCH_SIZE
+
+def make_synthetic_nodes(count: int, dim: int, seed: int = 0) -> Tuple[List[TextNode], np.ndarray]:
+    """
+    Crée des chunks aléatoires et leurs embeddings normalisés
+
+    Args:
+        count: Nombre de chunks
+        dim: Dimension des embeddings
+        seed: Graine aléatoire
+
+    Returns:
+        Tuple[List[TextNode], np.ndarray]: Chunks (sans embedding) et embeddings empilés
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((count, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    nodes = [
+        TextNode(text=f"Article {i} : texte du chunk synthétique {i}", metadata={"source_file": "synthetique.pdf"})
+        for i in range(count)
+    ]
+    return nodes, embeddings
+
+def benchmark(name: str, add_fn, client, count: int) -> Dict[str, float]:
+    """
+    Mesure le débit d'écriture d'un chemin d'ingestion dans une collection vide
+
+    Args:
+        name: Nom du chemin
+        add_fn: Fonction (collection) -> None qui écrit les nodes
+        client: Client ChromaDB
+        count: Nombre de nodes écrits
+
+    Returns:
+        Dict: Durée (s) et débit (nodes/s)
+    """
+    collection = client.create_collection(f"bench_{name}")
+    start = time.perf_counter()
+    add_fn(collection)
+    elapsed = time.perf_counter() - start
+    assert collection.count() == count
+    return {"path": name, "seconds": elapsed, "nodes_per_second": count / elapsed}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare les débits d'ingestion dans ChromaDB (nodes/s)")
+    parser.add_argument("--nodes", type=int, default=5000, help="Nombre de chunks synthétiques")
+    parser.add_argument("--dim", type=int, default=3072, help="Dimension des embeddings")
+    parser.add_argument("--write_batch_size", type=int, nargs="+", default=[WRITE_BATCH_SIZE],
+                        help=f"Taille(s) de lot d'écriture à comparer (défaut: {WRITE_BATCH_SIZE})")
+    args = parser.parse_args()
+
+    client = chromadb.PersistentClient(path=tempfile.mkdtemp(prefix="raptor_ingest_"))
+    nodes, embeddings = make_synthetic_nodes(args.nodes, args.dim)
+    print(f"📚 {args.nodes} chunks synthétiques de dimension {args.dim}")
+
+    def add_chroma(collection):
+        # Chemin actuel : embeddings portés par chaque node, listes construites node par node
+        for node, embedding in zip(nodes, embeddings):
+            node.embedding = embedding.tolist()
+        ChromaVectorStore(chroma_collection=collection).add(nodes)
+
+    def add_bulk(batch_size):
+        def add(collection):
+            UniqueIDVectorStore(chroma_collection=collection, write_batch_size=batch_size).add(nodes, embeddings=embeddings)
+        return add
+
+    results = [benchmark("chroma", add_chroma, client, args.nodes)]
+    for batch_size in args.write_batch_size:
+        results.append(benchmark(f"bulk_{batch_size}", add_bulk(batch_size), client, args.nodes))
+
+    print(f"\n📊 Ingestion de {args.nodes} nodes")
+    print(f"{'Chemin':<14}{'Durée (s)':>12}{'Nodes/s':>12}")
+    for result in results:
+        print(f"{result['path']:<14}{result['seconds']:>12.2f}{result['nodes_per_second']:>12.1f}")
+
+if __name__ == "__main__":
+    main()
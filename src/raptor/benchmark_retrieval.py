@@ -0,0 +1,133 @@
+import sys
+from pathlib import Path
+sys.path.append(str(Path(__file__).parent.parent))  # Ajoute le dossier src au PYTHONPATH
+
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+import chromadb
+import numpy as np
+from llama_index.core.vector_stores.types import VectorStoreQuery
+from llama_index.vector_stores.chroma import ChromaVectorStore
+from raptor.local_index import LocalVectorStore, hnswlib
+
+def build_synthetic_collection(client, size: int, dim: int, seed: int = 0):
+    """
+    Crée une collection aléatoire (embeddings normalisés) pour mesurer sans base réelle
+
+    Args:
+        client: Client ChromaDB
+        size: Nombre d'éléments
+        dim: Dimension des embeddings
+        seed: Graine aléatoire
+    """
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    collection = client.create_collection("legislation_PUB")
+    for start in range(0, size, 1000):
+        end = min(start + 1000, size)
+        collection.add(
+            ids=[f"chunk_{i}" for i in range(start, end)],
+            embeddings=embeddings[start:end].tolist(),
+            documents=[f"Texte {i}" for i in range(start, end)],
+            metadatas=[{"index": i} for i in range(start, end)],
+        )
+    return collection
+
+def make_queries(store: LocalVectorStore, count: int, noise: float, seed: int = 0) -> np.ndarray:
+    """Requêtes proches d'éléments existants (embedding stocké + bruit gaussien)"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(store), size=min(count, len(store)), replace=False)
+    base = store._matrix[rows]
+    return base + noise * rng.standard_normal(base.shape).astype(np.float32) / np.sqrt(base.shape[1])
+
+def benchmark(name: str, query_fn, queries: np.ndarray, ground_truth: List[set], top_k: int) -> Dict[str, float]:
+    """
+    Mesure la latence et le recall@k d'un backend
+
+    Args:
+        name: Nom du backend
+        query_fn: Fonction (embedding, top_k) -> liste d'identifiants
+        queries: Embeddings des requêtes
+        ground_truth: Identifiants attendus (recherche exacte) pour chaque requête
+        top_k: Nombre de résultats
+
+    Returns:
+        Dict: Latences moyenne/p95 (ms) et recall@k
+    """
+    latencies, recalls = [], []
+    for query, expected in zip(queries, ground_truth):
+        start = time.perf_counter()
+        ids = query_fn(query.tolist(), top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(len(expected & set(ids)) / len(expected))
+    return {
+        "backend": name,
+        "mean_ms": float(np.mean(latencies)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": float(np.mean(recalls)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ChromaDB et l'index local (latence, recall@k)")
+    parser.add_argument("--db_path", default="./RAPTOR_db", help="Base ChromaDB contenant legislation_PUB")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Utilise une collection aléatoire de N éléments au lieu de la base")
+    parser.add_argument("--dim", type=int, default=3072, help="Dimension des embeddings synthétiques")
+    parser.add_argument("--queries", type=int, default=200, help="Nombre de requêtes")
+    parser.add_argument("--top_k", type=int, default=5, help="Nombre de résultats (recall@k)")
+    parser.add_argument("--noise", type=float, default=0.5, help="Écart des requêtes par rapport aux éléments stockés")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        temp_dir = tempfile.mkdtemp(prefix="raptor_bench_")
+        client = chromadb.PersistentClient(path=temp_dir)
+        collection = build_synthetic_collection(client, args.synthetic, args.dim)
+    else:
+        client = chromadb.PersistentClient(path=args.db_path)
+        collection = client.get_collection("legislation_PUB")
+
+    if collection.count() == 0:
+        print("❌ La collection legislation_PUB est vide")
+        return
+
+    print(f"📚 {collection.count()} éléments dans legislation_PUB")
+
+    start = time.perf_counter()
+    exact = LocalVectorStore.from_chroma_collection(collection, mode="exact")
+    print(f"⏱️ Chargement en mémoire : {time.perf_counter() - start:.2f}s")
+
+    queries = make_queries(exact, args.queries, args.noise)
+    ground_truth = [
+        {exact._ids[i] for i in exact.search(query, args.top_k)[0]}
+        for query in queries
+    ]
+
+    chroma = ChromaVectorStore(chroma_collection=collection)
+
+    def query_store(store):
+        return lambda embedding, top_k: store.query(
+            VectorStoreQuery(query_embedding=embedding, similarity_top_k=top_k)
+        ).ids
+
+    results = [
+        benchmark("chroma", query_store(chroma), queries, ground_truth, args.top_k),
+        benchmark("numpy", query_store(exact), queries, ground_truth, args.top_k),
+    ]
+    if hnswlib is not None:
+        start = time.perf_counter()
+        hnsw = LocalVectorStore.from_chroma_collection(collection, mode="hnsw")
+        print(f"⏱️ Chargement + construction HNSW : {time.perf_counter() - start:.2f}s")
+        results.append(benchmark("hnsw", query_store(hnsw), queries, ground_truth, args.top_k))
+    else:
+        print("⚠️ hnswlib n'est pas installé : mode hnsw ignoré")
+
+    print(f"\n📊 {len(queries)} requêtes, top_k={args.top_k} (référence : recherche exacte)")
+    print(f"{'Backend':<10}{'Moyenne (ms)':>14}{'p95 (ms)':>12}{'Recall@' + str(args.top_k):>12}")
+    for result in results:
+        print(f"{result['backend']:<10}{result['mean_ms']:>14.3f}{result['p95_ms']:>12.3f}{result['recall']:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+import os
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+import numpy as np
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import BaseNode, NodeWithScore, QueryBundle
+from raptor.local_index import node_from_chroma
+
+# Numéros d'articles gardés entiers ("L. 3323-4" -> "l", "3323-4"), mots sans chiffres
+TOKEN_PATTERN = re.compile(r"\d+(?:[.\-/]\d+)*|[^\W\d_]+")
+
+# Mots vides (sans accents, comme les tokens)
+STOPWORDS = frozenset("""
+a au aux avec ce ces c d dans de des du elle en est et eux il ils j l la le les leur leurs lui m ma mais me
+meme mes moi mon n ne nos notre nous on ou par pas pour qu que qui s sa se ses son sont sur t ta te tes toi
+ton tu un une vos votre vous y cette cet sans etre ete avoir fait tout tous toute toutes
+""".split())
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte pour l'index BM25 : minuscules sans accents, mots vides retirés,
+    et paires de mots consécutifs pour favoriser les expressions figées ("jeux d'argent")
+
+    Args:
+        text: Texte à découper
+
+    Returns:
+        List[str]: Mots puis paires de mots
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    words = [word for word in TOKEN_PATTERN.findall(text) if word not in STOPWORDS]
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fusionne plusieurs classements par rang réciproque (score = somme des 1 / (k + rang))
+
+    Args:
+        rankings: Identifiants classés du plus au moins pertinent, un classement par méthode
+        k: Constante de lissage (60 dans la littérature)
+
+    Returns:
+        List[Tuple[str, float]]: (identifiant, score fusionné), du meilleur au moins bon
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, node_id in enumerate(ranking, 1):
+            scores[node_id] = scores.get(node_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+class BM25Index:
+    """
+    Index inversé BM25 en mémoire des nodes de la base de législation.
+
+    Les poids BM25 de chaque (terme, node) sont calculés à la construction et rangés par
+    terme dans des tableaux NumPy contigus (format CSR) : une recherche se résume à
+    additionner les listes de poids des termes de la requête, sans appel distant.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        vocabulary: Dict[str, int],
+        indptr: np.ndarray,
+        doc_indices: np.ndarray,
+        weights: np.ndarray,
+    ):
+        """
+        Args:
+            ids: Identifiants des nodes (ceux de ChromaDB)
+            vocabulary: {terme: numéro de sa liste de poids}
+            indptr: Début de la liste de chaque terme dans doc_indices/weights (+ fin de la dernière)
+            doc_indices: Numéros des nodes contenant chaque terme
+            weights: Poids BM25 (idf inclus) de chaque terme dans chaque node
+        """
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_indices = doc_indices
+        self.weights = weights
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, ids: List[str], texts: List[str], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """
+        Construit l'index à partir des textes
+
+        Args:
+            ids: Identifiants des nodes
+            texts: Textes des nodes
+            k1: Saturation de la fréquence des termes
+            b: Normalisation par la longueur des textes
+
+        Returns:
+            BM25Index: Index construit
+        """
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        lengths = np.zeros(len(texts), dtype=np.float32)
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text or ""))
+            lengths[doc] = sum(counts.values())
+            for term, count in counts.items():
+                postings.setdefault(term, []).append((doc, count))
+
+        average_length = float(lengths.mean()) if len(texts) and lengths.mean() > 0 else 1.0
+        vocabulary, indptr, doc_indices, weights = {}, [0], [], []
+        for term, term_postings in postings.items():
+            docs = np.fromiter((doc for doc, _ in term_postings), dtype=np.int32, count=len(term_postings))
+            tf = np.fromiter((count for _, count in term_postings), dtype=np.float32, count=len(term_postings))
+            idf = np.log(1.0 + (len(texts) - len(docs) + 0.5) / (len(docs) + 0.5))
+            vocabulary[term] = len(vocabulary)
+            doc_indices.append(docs)
+            weights.append(idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths[docs] / average_length)))
+            indptr.append(indptr[-1] + len(docs))
+
+        return cls(
+            list(ids),
+            vocabulary,
+            np.asarray(indptr, dtype=np.int64),
+            np.concatenate(doc_indices) if doc_indices else np.zeros(0, dtype=np.int32),
+            np.concatenate(weights).astype(np.float32) if weights else np.zeros(0, dtype=np.float32),
+        )
+
+    @classmethod
+    def from_chroma_collection(cls, collection: Any, batch_size: int = 1000) -> "BM25Index":
+        """
+        Construit l'index à partir de tous les éléments d'une collection ChromaDB
+
+        Args:
+            collection: Collection ChromaDB (ex: legislation_PUB)
+            batch_size: Nombre d'éléments lus par requête
+
+        Returns:
+            BM25Index: Index construit
+        """
+        ids, texts = [], []
+        for offset in range(0, collection.count(), batch_size):
+            batch = collection.get(include=["documents"], limit=batch_size, offset=offset)
+            ids.extend(batch["ids"])
+            texts.extend(batch["documents"])
+        return cls.build(ids, texts)
+
+    def save(self, path: Path) -> None:
+        """Enregistre l'index (écriture atomique)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                ids=np.asarray(self.ids, dtype=str),
+                terms=np.asarray(terms, dtype=str),
+                indptr=self.indptr,
+                doc_indices=self.doc_indices,
+                weights=self.weights,
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Charge un index enregistré par save"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["ids"].tolist(),
+                {term: i for i, term in enumerate(data["terms"].tolist())},
+                data["indptr"],
+                data["doc_indices"],
+                data["weights"],
+            )
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        """
+        Recherche les nodes les plus pertinents pour une requête
+
+        Args:
+            query: Texte de la requête
+            top_k: Nombre de résultats
+
+        Returns:
+            List[Tuple[str, float]]: (identifiant, score BM25), du meilleur au moins bon
+        """
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            row = self.vocabulary.get(term)
+            if row is not None:
+                start, end = self.indptr[row], self.indptr[row + 1]
+                scores[self.doc_indices[start:end]] += self.weights[start:end]
+
+        matches = np.flatnonzero(scores)
+        if len(matches) > top_k:
+            matches = matches[np.argpartition(-scores[matches], top_k - 1)[:top_k]]
+        matches = matches[np.argsort(-scores[matches], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in matches]
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever hybride : les candidats du retriever dense (RaptorRetriever) et ceux de
+    l'index BM25 sont fusionnés par rang réciproque. Les références exactes (numéros
+    d'articles, mentions obligatoires) remontent sans appel distant supplémentaire.
+
+    La requête lexicale est query_str ; la requête dense est le premier embedding_str
+    (QueryBundle.custom_embedding_strs), ce qui permet d'envoyer un prompt de recherche
+    complet à l'embedding et seulement le contexte à BM25.
+    """
+
+    def __init__(
+        self,
+        dense_retriever: BaseRetriever,
+        bm25_index: BM25Index,
+        collection: Any,
+        top_k: int = 5,
+        candidates: int = 20,
+        rrf_k: int = 60,
+    ):
+        """
+        Args:
+            dense_retriever: Retriever dense, réglé pour renvoyer `candidates` résultats
+            bm25_index: Index BM25 de la même collection
+            collection: Collection ChromaDB (lecture locale des nodes trouvés par BM25 seul)
+            top_k: Nombre de résultats après fusion
+            candidates: Nombre de candidats BM25 fusionnés
+            rrf_k: Constante de la fusion par rang réciproque
+        """
+        super().__init__()
+        self.dense_retriever = dense_retriever
+        self.bm25_index = bm25_index
+        self.collection = collection
+        self.top_k = top_k
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self._nodes: Dict[str, BaseNode] = {}
+
+    def _load_nodes(self, ids: List[str]) -> None:
+        """Charge en mémoire les nodes pas encore lus"""
+        missing = [node_id for node_id in ids if node_id not in self._nodes]
+        if missing:
+            batch = self.collection.get(ids=missing, include=["documents", "metadatas"])
+            for node_id, text, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"]):
+                self._nodes[node_id] = node_from_chroma(node_id, text, metadata)
+
+    def _fuse(self, query_str: str, dense_results: List[NodeWithScore]) -> List[NodeWithScore]:
+        """
+        Fusionne les résultats denses et BM25
+
+        Args:
+            query_str: Requête lexicale
+            dense_results: Résultats du retriever dense
+
+        Returns:
+            List[NodeWithScore]: top_k nodes, score = score de fusion
+        """
+        for result in dense_results:
+            self._nodes.setdefault(result.node.node_id, result.node)
+        lexical_ids = [node_id for node_id, _ in self.bm25_index.search(query_str, self.candidates)]
+        fused = reciprocal_rank_fusion(
+            [[result.node.node_id for result in dense_results], lexical_ids], k=self.rrf_k
+        )[:self.top_k]
+        self._load_nodes([node_id for node_id, _ in fused])
+        return [NodeWithScore(node=self._nodes[node_id], score=score) for node_id, score in fused if node_id in self._nodes]
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        dense_results = self.dense_retriever.retrieve(query_bundle.embedding_strs[0])
+        return self._fuse(query_bundle.query_str, dense_results)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        dense_results = await self.dense_retriever.aretrieve(query_bundle.embedding_strs[0])
+        return self._fuse(query_bundle.query_str, dense_results)
@@ -0,0 +1,104 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List
+from utils.cache import hash_bytes
+
+def hash_file(path: Path) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier source"""
+    return hash_bytes(Path(path).read_bytes())
+
+class IndexManifest:
+    """
+    Registre des documents sources indexés dans la base RAPTOR : empreinte du fichier,
+    nombre de nodes et date d'indexation. Il est réécrit après chaque document, ce qui
+    sert de point de reprise : un document absent du registre (ou dont l'empreinte
+    a changé) est réindexé, un document inchangé est ignoré.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path, settings: Dict[str, Any]):
+        """
+        Charge le registre s'il existe
+
+        Args:
+            path: Chemin du fichier JSON du registre
+            settings: Paramètres de construction (découpage, profondeur, modèles) : s'ils
+                      diffèrent de ceux du registre, tout l'index doit être reconstruit
+        """
+        self.path = Path(path)
+        self.settings = settings
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.exists = self.path.exists()
+        self.settings_changed = False
+
+        if self.exists:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != self.VERSION or data.get("settings") != settings:
+                self.settings_changed = True
+            else:
+                self.documents = data.get("documents", {})
+
+    def plan(self, file_hashes: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Compare les fichiers sources au registre
+
+        Args:
+            file_hashes: {source (chemin relatif): empreinte}
+
+        Returns:
+            Dict[str, List[str]]: Sources "new", "modified", "unchanged" et "removed"
+        """
+        plan = {"new": [], "modified": [], "unchanged": [], "removed": []}
+        for source, file_hash in sorted(file_hashes.items()):
+            entry = self.documents.get(source)
+            if entry is None:
+                plan["new"].append(source)
+            elif entry["hash"] != file_hash:
+                plan["modified"].append(source)
+            else:
+                plan["unchanged"].append(source)
+        plan["removed"] = sorted(set(self.documents) - set(file_hashes))
+        return plan
+
+    def record(self, source: str, file_hash: str, nodes: int) -> None:
+        """
+        Enregistre un document entièrement indexé (point de reprise)
+
+        Args:
+            source: Chemin relatif du document
+            file_hash: Empreinte du fichier indexé
+            nodes: Nombre de nodes (chunks et résumés) écrits pour ce document
+        """
+        self.documents[source] = {
+            "hash": file_hash,
+            "nodes": nodes,
+            "indexed_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.save()
+
+    def forget(self, source: str) -> None:
+        """Retire un document du registre (avant sa réindexation ou après sa suppression)"""
+        if self.documents.pop(source, None) is not None:
+            self.save()
+
+    def reset(self) -> None:
+        """Vide le registre (reconstruction complète)"""
+        self.documents = {}
+        self.settings_changed = False
+        self.save()
+
+    def save(self) -> None:
+        """Écrit le registre de façon atomique : un arrêt brutal ne laisse pas de fichier tronqué"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": self.VERSION, "settings": self.settings, "documents": self.documents},
+                f, ensure_ascii=False, indent=2,
+            )
+        os.replace(tmp_path, self.path)
+        self.exists = True
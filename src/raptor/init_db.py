@@ -2,64 +2,223 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))  # Ajoute le dossier src au PYTHONPATH
 
+import argparse
+import asyncio
 import chromadb
+import httpx
 import logging
+import time
+import numpy as np
+from pydantic import Field, PrivateAttr
 from llama_index.core import SimpleDirectoryReader
-from llama_index.core.schema import Document, BaseNode
+from llama_index.core.schema import Document, BaseNode, MetadataMode
+from llama_index.core.vector_stores.utils import node_to_metadata_dict
 from llama_index.vector_stores.chroma import ChromaVectorStore
-from llama_index.packs.raptor import RaptorPack
+from llama_index.packs.raptor import RaptorRetriever
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.embeddings.azure_openai import AzureOpenAIEmbedding
 from llama_index.llms.azure_openai import AzureOpenAI
-from typing import List, Any
+from typing import Dict, List, Any, Optional
 from config.azure_config import AzureConfig
-import uuid
+from raptor.hybrid_retrieval import BM25Index
+from raptor.index_manifest import IndexManifest, hash_file
+from raptor.summary_module import ParallelSummaryModule
+from utils.batched_embedding import BatchedEmbedding
+from utils.cache import make_cache_key
+from utils.rate_limiter import RateLimiter, RateLimitedTransport, AsyncRateLimitedTransport
+from utils.summary_cache import SummaryCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Nodes par écriture ChromaDB (borné par la taille de lot maximale du client) : au-delà de
+# ~1000 nodes de dimension 3072 le débit plafonne, l'insertion HNSW domine
+WRITE_BATCH_SIZE = 2000
+
 class UniqueIDVectorStore(ChromaVectorStore):
-    def __init__(self, *args, **kwargs):
+    """
+    ChromaVectorStore à écriture en masse et identifiants stables : l'identifiant d'un node
+    est une empreinte de son contenu, si bien qu'une nouvelle indexation du même document
+    remplace ses nodes (upsert) au lieu de les dupliquer ou d'entrer en collision.
+
+    Les résumés de l'arbre RAPTOR sont identifiés par l'empreinte de leurs enfants : les
+    enfants sont écrits avant leur parent, leur métadonnée parent_id est réécrite avec
+    l'identifiant stable du parent, qui est ensuite réutilisé à l'écriture du résumé.
+    """
+    write_batch_size: int = Field(default=WRITE_BATCH_SIZE, description="Nombre maximal de nodes par écriture ChromaDB")
+
+    _parent_ids: Dict[str, str] = PrivateAttr(default_factory=dict)
+    _stats: Dict[str, float] = PrivateAttr(default_factory=lambda: {"nodes": 0, "writes": 0, "seconds": 0.0})
+
+    def __init__(self, *args: Any, write_batch_size: int = WRITE_BATCH_SIZE, **kwargs: Any):
+        """
+        Args:
+            write_batch_size: Nombre maximal de nodes par écriture ChromaDB
+            args, kwargs: Paramètres de ChromaVectorStore (chroma_collection...)
+        """
         super().__init__(*args, **kwargs)
-        self._id_counter = 0
-    
-    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
-        """Add nodes with unique IDs."""
-        embeddings = []
-        metadatas = []
-        ids = []
-        documents = []
+        self.write_batch_size = write_batch_size
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistiques cumulées des écritures
+
+        Returns:
+            Dict: Nodes écrits, écritures ChromaDB, durée totale et débit (nodes/s)
+        """
+        stats = dict(self._stats)
+        stats["nodes_per_second"] = stats["nodes"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    @staticmethod
+    def content_id(node: BaseNode) -> str:
+        """Identifiant stable d'un node : document source, niveau dans l'arbre et texte"""
+        return make_cache_key(
+            node.metadata.get("source_file"),
+            node.ref_doc_id,
+            node.metadata.get("level"),
+            node.get_content(metadata_mode=MetadataMode.NONE),
+        )
+
+    def assign_ids(self, nodes: List[BaseNode]) -> List[str]:
+        """
+        Calcule l'identifiant stable de chaque node et celui des parents qu'ils référencent
+
+        Args:
+            nodes: Nodes à écrire
+
+        Returns:
+            List[str]: Identifiant de chaque node, dans l'ordre des nodes
+        """
+        ids = [self._parent_ids.get(node.node_id) or self.content_id(node) for node in nodes]
         
-        for node in nodes:
-            embeddings.append(node.get_embedding())
-            metadata = node_to_metadata_dict(node, remove_text=True)
-            metadatas.append(metadata)
-            
-            # Générer un ID unique avec un compteur
-            unique_id = f"node_{self._id_counter}"
-            self._id_counter += 1
-            ids.append(unique_id)
-            
-            documents.append(node.get_content())
+        # Parents encore inconnus : identifiés par l'ensemble de leurs enfants
+        children: Dict[str, set] = {}
+        for node, node_id in zip(nodes, ids):
+            parent_id = node.metadata.get("parent_id")
+            if parent_id and parent_id not in self._parent_ids:
+                children.setdefault(parent_id, set()).add(node_id)
+        for parent_id, child_ids in children.items():
+            self._parent_ids[parent_id] = make_cache_key("cluster", sorted(child_ids))
+        return ids
+
+    def add(self, nodes: List[BaseNode], embeddings: Optional[np.ndarray] = None, **add_kwargs: Any) -> List[str]:
+        """
+        Écrit les nodes par grands lots (upsert)
+
+        Args:
+            nodes: Nodes à écrire
+            embeddings: Embeddings déjà empilés (une ligne par node), sinon ceux des nodes
+
+        Returns:
+            List[str]: Identifiant stable de chaque node, dans l'ordre des nodes
+        """
+        if not nodes:
+            return []
+        start = time.perf_counter()
+        ids = self.assign_ids(nodes)
+        if embeddings is None:
+            embeddings = np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        else:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.shape[0] != len(nodes):
+            raise ValueError(f"{embeddings.shape[0]} embeddings pour {len(nodes)} nodes")
         
-        self._collection.add(
-            embeddings=embeddings,
-            ids=ids,
-            metadatas=metadatas,
-            documents=documents,
-        )
+        # Le clustering de RAPTOR est souple : un node membre de plusieurs clusters
+        # apparaît plusieurs fois dans le même lot, ChromaDB refuserait les doublons
+        rows = list({node_id: i for i, node_id in enumerate(ids)}.values())
+        unique_ids, metadatas, documents = [], [], []
+        for i in rows:
+            node = nodes[i]
+            metadata = dict(node.metadata)
+            if metadata.get("parent_id") in self._parent_ids:
+                metadata["parent_id"] = self._parent_ids[metadata["parent_id"]]
+            # L'identifiant est aussi celui du node reconstruit à la recherche (_node_content)
+            stored = node.model_copy(update={"id_": ids[i], "metadata": metadata, "embedding": None})
+            metadata_dict = node_to_metadata_dict(stored, remove_text=True, flat_metadata=self.flat_metadata)
+            metadatas.append({key: "" if value is None else value for key, value in metadata_dict.items()})
+            documents.append(node.get_content(metadata_mode=MetadataMode.NONE))
+            unique_ids.append(ids[i])
+        embeddings = embeddings[rows]
+        
+        batch_size = max(1, min(self.write_batch_size, self._collection._client.get_max_batch_size()))
+        writes = 0
+        for batch_start in range(0, len(unique_ids), batch_size):
+            batch_end = batch_start + batch_size
+            self._collection.upsert(
+                ids=unique_ids[batch_start:batch_end],
+                embeddings=embeddings[batch_start:batch_end],
+                metadatas=metadatas[batch_start:batch_end],
+                documents=documents[batch_start:batch_end],
+            )
+            writes += 1
+        
+        self._stats["nodes"] += len(unique_ids)
+        self._stats["writes"] += writes
+        self._stats["seconds"] += time.perf_counter() - start
         return ids
 
+# Paramètres de construction de l'arbre : toute modification impose une reconstruction complète
+INDEX_SETTINGS = {
+    "chunk_size": 256,
+    "chunk_overlap": 20,
+    "tree_depth": 3,
+    "embedding_model": "text-embedding-3-large",
+    "llm": "gpt-4o",
+}
+
+class SourceTaggedVectorStore(UniqueIDVectorStore):
+    """
+    Vector store de l'indexation qui rattache chaque node écrit (chunks et résumés de
+    l'arbre) au document source en cours d'indexation, pour pouvoir le supprimer ou le
+    remplacer sans toucher au reste de la collection
+    """
+    _source_metadata: Dict[str, Any] = PrivateAttr(default_factory=dict)
+    
+    def set_source(self, source: str, file_hash: str) -> None:
+        """Document source des prochains nodes ajoutés"""
+        self._source_metadata = {"source_file": source, "source_hash": file_hash}
+    
+    def add(self, nodes: List[BaseNode], embeddings: Optional[np.ndarray] = None, **add_kwargs: Any) -> List[str]:
+        """Ajoute les nodes avec leur document source (hors texte d'embedding et de prompt)"""
+        for node in nodes:
+            node.metadata.update(self._source_metadata)
+            for key in self._source_metadata:
+                if key not in node.excluded_embed_metadata_keys:
+                    node.excluded_embed_metadata_keys.append(key)
+                if key not in node.excluded_llm_metadata_keys:
+                    node.excluded_llm_metadata_keys.append(key)
+        return super().add(nodes, embeddings=embeddings, **add_kwargs)
+
 class RaptorDBInitializer:
-    """Initialise la base de données ChromaDB avec les textes de loi"""
+    """
+    Initialise la base de données ChromaDB avec les textes de loi
+    
+    L'indexation est incrémentale : chaque PDF a son propre arbre RAPTOR, rattaché à son
+    fichier source. Seuls les documents nouveaux ou modifiés sont (ré)indexés, et le
+    registre (index_manifest.json) est mis à jour après chaque document : une
+    construction interrompue reprend au premier document non terminé.
+    """
     
-    def __init__(self, db_path: str = "./RAPTOR_db", data_path: str = "./data/legislation"):
+    def __init__(
+        self,
+        db_path: str = "./RAPTOR_db",
+        data_path: str = "./data/legislation",
+        embed_batch_size: int = 256,
+        embed_concurrency: int = 4,
+        summary_concurrency: int = 8,
+        summary_cache: bool = True,
+    ):
         """
         Initialise l'objet
         
         Args:
             db_path: Chemin vers la base de données ChromaDB
             data_path: Chemin vers le dossier contenant les fichiers PDF de législation
+            embed_batch_size: Nombre maximal de chunks par requête d'embedding
+            embed_concurrency: Nombre maximal de requêtes d'embedding simultanées
+            summary_concurrency: Nombre maximal de clusters résumés simultanément
+            summary_cache: Réutilise les résumés de clusters déjà générés (cache/raptor_summaries.sqlite)
         """
         self.db_path = Path(db_path)
         self.data_path = Path(data_path)
@@ -71,67 +230,118 @@ class RaptorDBInitializer:
         self.client = chromadb.PersistentClient(path=str(self.db_path))
         self.collection = self.client.get_or_create_collection("legislation_PUB")
         
-        # Initialisation des modèles Azure
-        self.embedding_model = AzureOpenAIEmbedding(
-            engine="text-embedding-3-large",
-            model="text-embedding-3-large",
-            api_key=self.config.API_KEY,
-            azure_endpoint=self.config.ENDPOINT,
-            api_version=self.config.API_VERSION,
+        # Registre des documents indexés (point de reprise)
+        self.manifest = IndexManifest(self.db_path / "index_manifest.json", INDEX_SETTINGS)
+        
+        # Index BM25 de la recherche hybride, reconstruit après chaque mise à jour
+        self.bm25_path = self.db_path / "bm25_index.npz"
+        
+        # Initialisation des modèles Azure : embeddings en grands lots parallèles, dans la
+        # limite du quota de tokens/minute du déploiement (limiteur du client HTTP)
+        self.embedding_rate_limiter = RateLimiter(
+            self.config.EMBEDDING_REQUESTS_PER_MINUTE,
+            self.config.EMBEDDING_TOKENS_PER_MINUTE,
+            name="text-embedding-3-large",
+        )
+        self.embedding_model = BatchedEmbedding(
+            AzureOpenAIEmbedding(
+                engine="text-embedding-3-large",
+                model="text-embedding-3-large",
+                api_key=self.config.API_KEY,
+                azure_endpoint=self.config.ENDPOINT,
+                api_version=self.config.API_VERSION,
+                http_client=httpx.Client(transport=RateLimitedTransport(self.embedding_rate_limiter)),
+                async_http_client=httpx.AsyncClient(transport=AsyncRateLimitedTransport(self.embedding_rate_limiter)),
+            ),
+            max_batch_size=embed_batch_size,
+            max_concurrency=embed_concurrency,
         )
         
+        # Résumés des clusters : tous les clusters d'un niveau en parallèle, dans la limite
+        # du quota du déploiement gpt4o
+        self.chat_rate_limiter = RateLimiter(
+            self.config.CHAT_REQUESTS_PER_MINUTE,
+            self.config.CHAT_TOKENS_PER_MINUTE,
+            name="gpt4o",
+        )
         self.llm = AzureOpenAI(
             azure_endpoint=self.config.ENDPOINT,
             engine="gpt4o",
             api_version=self.config.API_VERSION,
             model="gpt-4o",
             api_key=self.config.API_KEY,
-            temperature=0.1
+            temperature=0.1,
+            http_client=httpx.Client(transport=RateLimitedTransport(self.chat_rate_limiter)),
+            async_http_client=httpx.AsyncClient(transport=AsyncRateLimitedTransport(self.chat_rate_limiter)),
+        )
+        self.summary_module = ParallelSummaryModule(
+            llm=self.llm,
+            num_workers=summary_concurrency,
+            cache=SummaryCache() if summary_cache else None,
         )
         
-    def initialize_raptor_pack(self, documents: List[Document]) -> RaptorPack:
+    def initialize_raptor_retriever(self, vector_store: ChromaVectorStore) -> RaptorRetriever:
         """
-        Initialise RaptorPack avec les documents et les modèles configurés
-        """
-        # Créer le vector store
-        vector_store = ChromaVectorStore(chroma_collection=self.collection)
+        Initialise le retriever RAPTOR qui construit l'arbre (chunks, clusters, résumés)
+        des documents insérés, avec les modèles configurés
         
-        # Créer RaptorPack avec des paramètres optimisés
-        raptor_pack = RaptorPack(
-            documents=documents,
+        Args:
+            vector_store: Vector store de destination
+            
+        Returns:
+            RaptorRetriever: Retriever vide, prêt pour l'insertion des documents
+        """
+        return RaptorRetriever(
+            [],
             embed_model=self.embedding_model,
             llm=self.llm,
+            summary_module=self.summary_module,
             vector_store=vector_store,
-            similarity_top_k=1,  # Réduit à 1 pour avoir le document le plus pertinent
-            mode="tree-traversal",  # Mode plus simple
+            tree_depth=INDEX_SETTINGS["tree_depth"],
+            similarity_top_k=1,
+            mode="tree_traversal",
             transformations=[
                 SentenceSplitter(
-                    chunk_size=256,  # Réduit la taille des chunks
-                    chunk_overlap=20  # Réduit le chevauchement
+                    chunk_size=INDEX_SETTINGS["chunk_size"],  # Réduit la taille des chunks
+                    chunk_overlap=INDEX_SETTINGS["chunk_overlap"]  # Réduit le chevauchement
                 )
             ]
         )
-        
-        return raptor_pack
     
-    def load_legislation_data(self) -> List[Document]:
+    def list_source_files(self) -> Dict[str, Path]:
         """
-        Charge les données de législation depuis les fichiers PDF
+        Liste les PDF de législation
         
         Returns:
-            List[Document]: Liste des documents chargés
+            Dict[str, Path]: {chemin relatif au dossier de données: chemin du fichier}
         """
         # Créer le dossier data s'il n'existe pas
         self.data_path.mkdir(parents=True, exist_ok=True)
         
         logger.info(f"🔍 Recherche de documents dans {self.data_path}")
+        return {
+            path.relative_to(self.data_path).as_posix(): path
+            for path in sorted(self.data_path.rglob("*"))
+            if path.is_file() and path.suffix.lower() == ".pdf"
+        }
+    
+    def load_legislation_data(self, files: Optional[List[Path]] = None) -> List[Document]:
+        """
+        Charge les données de législation depuis les fichiers PDF
+        
+        Args:
+            files: Fichiers à charger (défaut : tous les PDF du dossier de données)
+        
+        Returns:
+            List[Document]: Liste des documents chargés
+        """
+        if files is None:
+            files = list(self.list_source_files().values())
+        if not files:
+            return []
         
         # Utiliser SimpleDirectoryReader pour charger les documents
-        reader = SimpleDirectoryReader(
-            input_dir=str(self.data_path),
-            recursive=True,  # Lire les sous-dossiers
-            required_exts=[".pdf"]  # Ne lire que les PDFs
-        )
+        reader = SimpleDirectoryReader(input_files=[str(path) for path in files])
         
         # Charger les documents
         try:
@@ -143,41 +353,147 @@ class RaptorDBInitializer:
             logger.error(f"❌ Erreur lors du chargement des documents: {e}")
             raise
     
-    def initialize_db(self):
-        """Initialise la base de données avec les textes de loi"""
+    def reset_collection(self) -> None:
+        """Supprime et recrée la collection, et vide le registre (reconstruction complète)"""
+        collections = [c.name if hasattr(c, "name") else c for c in self.client.list_collections()]
+        if "legislation_PUB" in collections:
+            logger.info("Suppression de l'ancienne collection...")
+            self.client.delete_collection("legislation_PUB")
+        
+        self.collection = self.client.create_collection(
+            name="legislation_PUB",
+            metadata={"description": "Base de législation publicitaire"}
+        )
+        self.manifest.reset()
+        logger.info("✅ Collection recréée avec succès")
+    
+    def delete_source_nodes(self, source: str) -> None:
+        """Supprime les nodes d'un document (chunks et résumés), y compris ceux d'une indexation interrompue"""
+        self.collection.delete(where={"source_file": source})
+    
+    def build_bm25_index(self) -> None:
+        """Construit l'index BM25 de tous les nodes de la collection (chunks et résumés)"""
+        start = time.perf_counter()
+        bm25_index = BM25Index.from_chroma_collection(self.collection)
+        bm25_index.save(self.bm25_path)
+        logger.info(
+            f"🔎 Index BM25 : {len(bm25_index)} nodes, {len(bm25_index.vocabulary)} termes "
+            f"en {time.perf_counter() - start:.1f}s"
+        )
+    
+    async def index_document(self, retriever: RaptorRetriever, source: str, path: Path, file_hash: str) -> int:
+        """
+        Indexe un document : construction de son arbre RAPTOR et écriture de ses nodes
+        
+        Args:
+            retriever: Retriever RAPTOR de construction
+            source: Chemin relatif du document
+            path: Chemin du fichier
+            file_hash: Empreinte du fichier
+            
+        Returns:
+            int: Nombre de nodes écrits
+        """
+        documents = self.load_legislation_data([path])
+        if not documents:
+            return 0
+        
+        # Identifiants stables, propres au document
+        for i, doc in enumerate(documents):
+            doc.id_ = f"{source}#{i}"
+        
+        retriever.index.vector_store.set_source(source, file_hash)
+        await retriever.insert(documents)
+        return len(self.collection.get(where={"source_file": source}, include=[])["ids"])
+    
+    async def _index_all(
+        self, retriever: RaptorRetriever, to_index: List[str], files: Dict[str, Path], file_hashes: Dict[str, str]
+    ) -> None:
+        """
+        Indexe les documents nouveaux ou modifiés dans une seule boucle d'événements
+        (les clients asynchrones des modèles gardent des connexions liées à leur première boucle)
+        
+        Args:
+            retriever: Retriever RAPTOR de construction
+            to_index: Chemins relatifs des documents à indexer
+            files: {chemin relatif: fichier}
+            file_hashes: {chemin relatif: empreinte du fichier}
+        """
+        for i, source in enumerate(to_index, 1):
+            start = time.perf_counter()
+            logger.info(f"📄 [{i}/{len(to_index)}] Indexation de {source}...")
+            
+            # Retirer l'ancienne version, ou les nodes d'une indexation interrompue
+            self.manifest.forget(source)
+            self.delete_source_nodes(source)
+            
+            nodes = await self.index_document(retriever, source, files[source], file_hashes[source])
+            self.manifest.record(source, file_hashes[source], nodes)
+            logger.info(f"✅ [{i}/{len(to_index)}] {source} : {nodes} nodes en {time.perf_counter() - start:.1f}s")
+    
+    def initialize_db(self, rebuild: bool = False):
+        """
+        Initialise ou met à jour la base de données avec les textes de loi
+        
+        Args:
+            rebuild: Reconstruit toute la base au lieu de ne traiter que les documents modifiés
+        """
         try:
-            # Supprimer et recréer la collection
-            collections = self.client.list_collections()
-            if "legislation_PUB" in collections:
-                logger.info("Suppression de l'ancienne collection...")
-                self.client.delete_collection("legislation_PUB")
+            if rebuild:
+                logger.info("🔄 Reconstruction complète demandée")
+                self.reset_collection()
+            elif self.manifest.settings_changed:
+                logger.info("🔄 Paramètres de construction modifiés : reconstruction complète")
+                self.reset_collection()
+            elif not self.manifest.exists and self.collection.count() > 0:
+                # Base construite avant le registre : ses nodes ne sont pas rattachés à leur source
+                logger.info("🔄 Base existante sans registre : reconstruction complète")
+                self.reset_collection()
             
-            # Recréer la collection
-            self.collection = self.client.create_collection(
-                name="legislation_PUB",
-                metadata={"description": "Base de législation publicitaire"}
+            # Comparer les fichiers au registre
+            files = self.list_source_files()
+            if not files:
+                logger.warning("⚠️ Aucun document trouvé. Vérifiez vos fichiers PDF.")
+            file_hashes = {source: hash_file(path) for source, path in files.items()}
+            plan = self.manifest.plan(file_hashes)
+            logger.info(
+                f"📋 {len(plan['new'])} nouveau(x), {len(plan['modified'])} modifié(s), "
+                f"{len(plan['unchanged'])} inchangé(s), {len(plan['removed'])} supprimé(s)"
             )
-            logger.info("✅ Collection recréée avec succès")
             
-            # Charger les documents
-            documents = self.load_legislation_data()
+            for source in plan["removed"]:
+                logger.info(f"🗑️ Suppression de {source}")
+                self.delete_source_nodes(source)
+                self.manifest.forget(source)
             
-            if not documents:
-                logger.warning("⚠️ Aucun document trouvé. Vérifiez vos fichiers PDF.")
-                return
-                
-            # Assigner des IDs uniques aux documents
-            for i, doc in enumerate(documents):
-                doc.id_ = f"doc_{i}"
-                if hasattr(doc, 'node_id'):
-                    doc.node_id = f"node_{i}"
+            to_index = plan["new"] + plan["modified"]
+            if to_index:
+                retriever = self.initialize_raptor_retriever(SourceTaggedVectorStore(chroma_collection=self.collection))
+                asyncio.run(self._index_all(retriever, to_index, files, file_hashes))
             
-            logger.info(f"📄 Indexation de {len(documents)} documents...")
+            logger.info(f"✅ Base de données à jour avec {self.collection.count()} nodes")
             
-            # Initialiser et utiliser RaptorPack
-            raptor_pack = self.initialize_raptor_pack(documents)
+            if to_index or plan["removed"] or not self.bm25_path.exists():
+                self.build_bm25_index()
             
-            logger.info(f"✅ Base de données initialisée avec {self.collection.count()} nodes")
+            if to_index:
+                stats = self.embedding_model.stats()
+                limiter_stats = self.embedding_rate_limiter.stats()
+                logger.info(
+                    f"🧮 Embeddings : {stats['texts']} chunks et résumés en {stats['batches']} lots, "
+                    f"{stats['seconds']:.1f}s ({stats['chunks_per_second']:.1f} chunks/s), "
+                    f"{limiter_stats['waits']} attente(s) de quota, {limiter_stats['throttled']} réponse(s) 429"
+                )
+                summary_stats = self.summary_module.stats()
+                logger.info(
+                    f"📝 Résumés : {summary_stats['clusters']} clusters, {summary_stats['generated']} générés, "
+                    f"{summary_stats['cached']} repris du cache, {summary_stats['seconds']:.1f}s"
+                )
+                store_stats = retriever.index.vector_store.stats()
+                logger.info(
+                    f"🗄️ Écriture : {store_stats['nodes']} nodes en {store_stats['writes']} lots, "
+                    f"{store_stats['seconds']:.1f}s ({store_stats['nodes_per_second']:.1f} nodes/s)"
+                )
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'initialisation de la base de données: {e}")
@@ -185,9 +501,27 @@ class RaptorDBInitializer:
 
 def main():
     """Point d'entrée pour l'initialisation de la base de données"""
+    parser = argparse.ArgumentParser(description="Indexe les textes de loi dans la base RAPTOR")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Reconstruit toute la base au lieu de ne traiter que les documents nouveaux ou modifiés")
+    parser.add_argument("--embed_batch_size", type=int, default=256,
+                        help="Nombre maximal de chunks par requête d'embedding (défaut: 256)")
+    parser.add_argument("--embed_concurrency", type=int, default=4,
+                        help="Nombre maximal de requêtes d'embedding simultanées (défaut: 4)")
+    parser.add_argument("--summary_concurrency", type=int, default=8,
+                        help="Nombre maximal de clusters résumés simultanément (défaut: 8)")
+    parser.add_argument("--no_summary_cache", action="store_true",
+                        help="Régénère tous les résumés de clusters sans consulter le cache")
+    args = parser.parse_args()
+    
     try:
-        initializer = RaptorDBInitializer()
-        initializer.initialize_db()
+        initializer = RaptorDBInitializer(
+            embed_batch_size=args.embed_batch_size,
+            embed_concurrency=args.embed_concurrency,
+            summary_concurrency=args.summary_concurrency,
+            summary_cache=not args.no_summary_cache,
+        )
+        initializer.initialize_db(rebuild=args.rebuild)
         logger.info("✅ Initialisation terminée avec succès")
     except Exception as e:
         logger.error(f"❌ Erreur lors de l'initialisation: {e}")
@@ -0,0 +1,213 @@
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from pydantic import PrivateAttr
+from llama_index.core.schema import BaseNode, TextNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterOperator,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import metadata_dict_to_node
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+def node_from_chroma(node_id: str, text: Optional[str], metadata: Optional[dict]) -> BaseNode:
+    """
+    Reconstruit le node llama-index d'un élément de la collection ChromaDB
+
+    Args:
+        node_id: Identifiant ChromaDB
+        text: Texte (documents)
+        metadata: Métadonnées
+
+    Returns:
+        BaseNode: Node reconstruit
+    """
+    try:
+        node = metadata_dict_to_node(metadata or {})
+        node.set_content(text or "")
+    except Exception:
+        # Éléments ajoutés sans métadonnées llama-index (_node_content)
+        node = TextNode(text=text or "", id_=node_id, metadata=metadata or {})
+    return node
+
+class LocalVectorStore(BasePydanticVectorStore):
+    """
+    Index vectoriel en mémoire pour la base de législation.
+
+    Tous les embeddings sont chargés une fois dans une matrice NumPy contiguë (float32,
+    normalisée) : un top-k se résume à un produit matriciel, sans aller-retour client/SQLite.
+    Le mode "hnsw" (hnswlib) sert pour les corpus plus volumineux ; sans hnswlib,
+    l'index retombe sur la recherche exacte.
+    """
+
+    stores_text: bool = True
+    is_embedding_query: bool = True
+    mode: str = "exact"
+
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _nodes: List[BaseNode] = PrivateAttr(default_factory=list)
+    _matrix: Optional[np.ndarray] = PrivateAttr(default=None)
+    _hnsw: Any = PrivateAttr(default=None)
+
+    def __init__(self, mode: str = "exact", **kwargs: Any):
+        """
+        Args:
+            mode: "exact" (produit scalaire sur toute la matrice) ou "hnsw" (graphe approché)
+        """
+        if mode not in ("exact", "hnsw"):
+            raise ValueError(f"Mode d'index inconnu : {mode}")
+        if mode == "hnsw" and hnswlib is None:
+            print("⚠️ hnswlib n'est pas installé, utilisation de la recherche exacte")
+            mode = "exact"
+        super().__init__(mode=mode, **kwargs)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "LocalVectorStore"
+
+    @classmethod
+    def from_chroma_collection(cls, collection: Any, mode: str = "exact", batch_size: int = 1000) -> "LocalVectorStore":
+        """
+        Charge tous les éléments d'une collection ChromaDB en mémoire
+
+        Args:
+            collection: Collection ChromaDB (ex: legislation_PUB)
+            mode: Mode de recherche ("exact" ou "hnsw")
+            batch_size: Nombre d'éléments lus par requête
+
+        Returns:
+            LocalVectorStore: Index chargé
+        """
+        store = cls(mode=mode)
+        total = collection.count()
+        ids, nodes, embeddings = [], [], []
+
+        for offset in range(0, total, batch_size):
+            batch = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset,
+            )
+            for node_id, text, metadata, embedding in zip(
+                batch["ids"], batch["documents"], batch["metadatas"], batch["embeddings"]
+            ):
+                ids.append(node_id)
+                nodes.append(node_from_chroma(node_id, text, metadata))
+                embeddings.append(embedding)
+
+        store._set_data(ids, nodes, np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1))
+        print(f"✅ Index local ({store.mode}) chargé : {len(ids)} éléments")
+        return store
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """Normalise les lignes (similarité cosinus = produit scalaire)"""
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def _set_data(self, ids: List[str], nodes: List[BaseNode], matrix: np.ndarray) -> None:
+        """Remplace le contenu de l'index et reconstruit le graphe HNSW si nécessaire"""
+        self._ids = list(ids)
+        self._nodes = list(nodes)
+        self._matrix = np.ascontiguousarray(self._normalize(matrix), dtype=np.float32) if len(ids) else None
+        self._hnsw = None
+        if self.mode == "hnsw" and self._matrix is not None:
+            self._build_hnsw()
+
+    def _build_hnsw(self) -> None:
+        """Construit le graphe HNSW (produit scalaire) sur la matrice courante"""
+        index = hnswlib.Index(space="ip", dim=self._matrix.shape[1])
+        index.init_index(max_elements=len(self._ids), ef_construction=200, M=16)
+        index.add_items(self._matrix, np.arange(len(self._ids)))
+        self._hnsw = index
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Ajoute des nœuds (avec embeddings) à l'index"""
+        if not nodes:
+            return []
+        embeddings = np.asarray([node.get_embedding() for node in nodes], dtype=np.float32)
+        ids = self._ids + [node.node_id for node in nodes]
+        all_nodes = self._nodes + list(nodes)
+        matrix = embeddings if self._matrix is None else np.vstack([self._matrix, embeddings])
+        self._set_data(ids, all_nodes, matrix)
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Supprime les nœuds issus d'un document"""
+        keep = [i for i, node in enumerate(self._nodes) if node.ref_doc_id != ref_doc_id]
+        if len(keep) == len(self._nodes):
+            return
+        matrix = self._matrix[keep] if self._matrix is not None else np.zeros((0, 0), dtype=np.float32)
+        self._set_data([self._ids[i] for i in keep], [self._nodes[i] for i in keep], matrix)
+
+    def _filter_mask(self, filters: Optional[MetadataFilters]) -> Optional[np.ndarray]:
+        """Masque des nœuds satisfaisant des filtres d'égalité sur les métadonnées (ex: level)"""
+        if not filters or not filters.filters:
+            return None
+        mask = np.ones(len(self._nodes), dtype=bool)
+        for metadata_filter in filters.filters:
+            if getattr(metadata_filter, "operator", FilterOperator.EQ) != FilterOperator.EQ:
+                raise ValueError(f"Filtre non supporté par l'index local : {metadata_filter}")
+            values = np.array([node.metadata.get(metadata_filter.key) == metadata_filter.value for node in self._nodes])
+            mask &= values
+        return mask
+
+    def search(self, embedding: List[float], top_k: int, mask: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Recherche les top_k éléments les plus proches
+
+        Args:
+            embedding: Embedding de la requête
+            top_k: Nombre de résultats
+            mask: Éléments autorisés (optionnel, force la recherche exacte)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Indices et similarités cosinus, par score décroissant
+        """
+        if self._matrix is None or top_k <= 0:
+            return np.array([], dtype=int), np.array([], dtype=np.float32)
+
+        query = self._normalize(np.asarray(embedding, dtype=np.float32))
+        top_k = min(top_k, len(self._ids))
+
+        if self._hnsw is not None and mask is None:
+            self._hnsw.set_ef(max(50, 2 * top_k))
+            labels, distances = self._hnsw.knn_query(query, k=top_k)
+            return labels[0].astype(int), 1.0 - distances[0]
+
+        scores = self._matrix @ query
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+            top_k = min(top_k, int(mask.sum()))
+            if top_k == 0:
+                return np.array([], dtype=int), np.array([], dtype=np.float32)
+        # Sélection partielle puis tri des seuls k meilleurs
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        order = candidates[np.argsort(-scores[candidates])]
+        return order, scores[order]
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Interroge l'index (interface VectorStore de llama-index)"""
+        indices, scores = self.search(
+            query.query_embedding,
+            query.similarity_top_k,
+            mask=self._filter_mask(query.filters),
+        )
+        return VectorStoreQueryResult(
+            nodes=[self._nodes[i] for i in indices],
+            similarities=[float(score) for score in scores],
+            ids=[self._ids[i] for i in indices],
+        )
@@ -2,16 +2,40 @@ import chromadb
 from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.packs.raptor import RaptorRetriever
 from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.schema import QueryBundle
 from models.ai_models import AIModels
 from prompts.prompts import search_query
-from time import sleep
 from tenacity import retry, stop_after_attempt, wait_exponential
+from utils.rate_limiter import wait_retry_after
+from utils.embedding_cache import CachedEmbedding, EmbeddingCache
+from raptor.local_index import LocalVectorStore
+from raptor.hybrid_retrieval import BM25Index, HybridRetriever
 import fitz  # PyMuPDF
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Optional, Union
 
 class RaptorSetup:
     """Configuration et initialisation de Raptor"""
-    def __init__(self, ai_models: AIModels):
+    # Backends de recherche vectorielle disponibles
+    BACKENDS = ("chroma", "numpy", "hnsw")
+    # Index BM25 construit par init_db à côté de la base
+    BM25_INDEX_PATH = Path("./RAPTOR_db/bm25_index.npz")
+    # Nombre de résultats renvoyés, et de candidats de chaque méthode fusionnés en mode hybride
+    TOP_K = 5
+    HYBRID_CANDIDATES = 20
+    
+    def __init__(self, ai_models: AIModels, use_embedding_cache: bool = True, backend: str = "chroma", hybrid: bool = True):
+        """
+        Args:
+            ai_models: Modèles Azure (LLM et embeddings)
+            use_embedding_cache: Réutilise les embeddings de requêtes déjà calculés (cache persistant)
+            backend: Recherche vectorielle : "chroma" (ChromaVectorStore), "numpy" (index local exact)
+                ou "hnsw" (index local approché)
+            hybrid: Fusionne la recherche vectorielle avec l'index BM25 (numéros d'articles, mentions exactes)
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Backend de recherche inconnu : {backend} (choix : {', '.join(self.BACKENDS)})")
+        
         print("\n🔧 Initialisation de ChromaDB...")
         try:
             # Initialisation de la base de données
@@ -32,21 +56,45 @@ class RaptorSetup:
             
             print(f"✅ Collection 'legislation_PUB' initialisée - Nombre d'éléments : {self.collection.count()}")
             
-            self.vector_store = ChromaVectorStore(chroma_collection=self.collection)
-            print("✅ Vector store initialisé")
+            if backend == "chroma":
+                self.vector_store = ChromaVectorStore(chroma_collection=self.collection)
+            else:
+                # Embeddings chargés une fois en mémoire : plus d'aller-retour ChromaDB par requête
+                self.vector_store = LocalVectorStore.from_chroma_collection(
+                    self.collection, mode="exact" if backend == "numpy" else "hnsw"
+                )
+            print(f"✅ Vector store initialisé (backend : {backend})")
+            
+            # Embeddings des requêtes servis depuis un cache disque (clé : modèle + texte normalisé)
+            embed_model = ai_models.embedding_model
+            self.embedding_cache = None
+            if use_embedding_cache:
+                self.embedding_cache = EmbeddingCache()
+                embed_model = CachedEmbedding(ai_models.embedding_model, self.embedding_cache)
+                print(f"✅ Cache des embeddings de requêtes : {self.embedding_cache.stats()['entries']} entrées")
             
             # Initialisation du retriever avec un cache
             print("\n🔄 Configuration du retriever Raptor...")
-            self.retriever = RaptorRetriever(
+            self.bm25_index = self.load_bm25_index() if hybrid else None
+            self.dense_retriever = RaptorRetriever(
                 [],
-                embed_model=ai_models.embedding_model,
+                embed_model=embed_model,
                 llm=ai_models.llm,
                 vector_store=self.vector_store,
-                similarity_top_k=5,
+                similarity_top_k=self.HYBRID_CANDIDATES if self.bm25_index is not None else self.TOP_K,
                 mode="collapsed",
                 verbose=True
             )
-            print("✅ Retriever configuré")
+            self.retriever = self.dense_retriever
+            if self.bm25_index is not None:
+                self.retriever = HybridRetriever(
+                    self.dense_retriever,
+                    self.bm25_index,
+                    self.collection,
+                    top_k=self.TOP_K,
+                    candidates=self.HYBRID_CANDIDATES,
+                )
+            print(f"✅ Retriever configuré ({'hybride BM25 + dense' if self.bm25_index is not None else 'dense'})")
             
             # Cache pour les résultats de recherche
             self._search_cache = {}
@@ -66,7 +114,49 @@ class RaptorSetup:
             print(traceback.format_exc())
             raise
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    def load_bm25_index(self) -> Optional[BM25Index]:
+        """
+        Charge l'index BM25 construit par init_db, ou le reconstruit en mémoire s'il est
+        absent ou ne correspond plus à la collection
+        
+        Returns:
+            Optional[BM25Index]: Index chargé (None si la collection est vide)
+        """
+        count = self.collection.count()
+        if count == 0:
+            return None
+        try:
+            if self.BM25_INDEX_PATH.exists():
+                bm25_index = BM25Index.load(self.BM25_INDEX_PATH)
+                if len(bm25_index) == count:
+                    print(f"✅ Index BM25 chargé : {len(bm25_index)} éléments, {len(bm25_index.vocabulary)} termes")
+                    return bm25_index
+            print("⚠️ Index BM25 absent ou périmé (relancer raptor/init_db.py), reconstruction en mémoire...")
+        except Exception as e:
+            print(f"⚠️ Index BM25 illisible ({str(e)}), reconstruction en mémoire...")
+        bm25_index = BM25Index.from_chroma_collection(self.collection)
+        print(f"✅ Index BM25 construit : {len(bm25_index)} éléments, {len(bm25_index.vocabulary)} termes")
+        return bm25_index
+    
+    def _retrieval_query(self, query: str) -> Union[str, QueryBundle]:
+        """
+        Requête du retriever : prompt de recherche complet pour la recherche vectorielle,
+        contexte seul pour BM25 (le gabarit du prompt favoriserait les mêmes nodes à chaque requête)
+        
+        Args:
+            query: Contexte de la recherche
+            
+        Returns:
+            Union[str, QueryBundle]: Requête à passer au retriever
+        """
+        formatted_query = search_query.format(query=query)
+        if isinstance(self.retriever, HybridRetriever):
+            return QueryBundle(query_str=query, custom_embedding_strs=[formatted_query])
+        return formatted_query
+    
+    # Le débit est régulé en amont par le limiteur partagé des modèles : en cas d'échec,
+    # on respecte le Retry-After renvoyé par Azure et on ne recule exponentiellement qu'à défaut
+    @retry(stop=stop_after_attempt(3), wait=wait_retry_after(wait_exponential(multiplier=1, min=4, max=10)))
     def search(self, query: str) -> str:
         """
         Recherche la législation applicable dans la base de connaissances
@@ -85,8 +175,8 @@ class RaptorSetup:
         print(f"\n📚 Recherche de législation pour: {query[:200]}...")
         
         # Construire la requête de recherche
-        formatted_query = search_query.format(query=query)
-        print(f"\nRequête formatée: {formatted_query[:200]}...")
+        retrieval_query = self._retrieval_query(query)
+        print(f"\nRequête formatée: {search_query.format(query=query)[:200]}...")
         
         try:
             print("\n🔍 Début de la recherche dans ChromaDB...")
@@ -94,31 +184,38 @@ class RaptorSetup:
             
             # Récupérer les documents pertinents avec retry
             print("🔄 Exécution de la requête via le retriever...")
-            results = self.retriever.retrieve(formatted_query)
-            print(f"✅ Requête exécutée - Nombre de résultats : {len(results)}")
-            
-            # Extraire le texte des résultats
-            text_results = []
-            for i, node in enumerate(results, 1):
-                print(f"\n📄 Traitement du résultat {i}/{len(results)}")
-                if hasattr(node, 'text'):
-                    text_results.append(node.text)
-                    print(f"✅ Texte extrait (longueur: {len(node.text)} caractères)")
-                elif hasattr(node, 'content'):
-                    text_results.append(node.content)
-                    print(f"✅ Contenu extrait (longueur: {len(node.content)} caractères)")
+            results = self.retriever.retrieve(retrieval_query)
+            return self._cache_search_results(query, results)
             
-            result_text = "\n".join(text_results) if text_results else "Aucune législation trouvée."
-            print(f"\n📝 Résultat final - Longueur totale : {len(result_text)} caractères")
-            
-            # Mettre en cache le résultat
-            self._search_cache[query] = result_text
-            print("✅ Résultat mis en cache")
-            
-            # Attendre entre les requêtes
-            sleep(2)
+        except Exception as e:
+            print(f"\n❌ Erreur lors de la recherche : {str(e)}")
+            print("📝 Détails de l'erreur :")
+            import traceback
+            print(traceback.format_exc())
+            raise
+
+    @retry(stop=stop_after_attempt(3), wait=wait_retry_after(wait_exponential(multiplier=1, min=4, max=10)))
+    async def asearch(self, query: str) -> str:
+        """
+        Version asynchrone de search, utilisable depuis la boucle d'événements
+        
+        Args:
+            query: Contexte de la recherche
             
-            return result_text
+        Returns:
+            str: Textes de loi trouvés
+        """
+        # Vérifier le cache
+        if query in self._search_cache:
+            print("\n📚 Utilisation du cache pour la recherche...")
+            return self._search_cache[query]
+        
+        print(f"\n📚 Recherche de législation (async) pour: {query[:200]}...")
+        retrieval_query = self._retrieval_query(query)
+        
+        try:
+            results = await self.retriever.aretrieve(retrieval_query)
+            return self._cache_search_results(query, results)
             
         except Exception as e:
             print(f"\n❌ Erreur lors de la recherche : {str(e)}")
@@ -127,6 +224,39 @@ class RaptorSetup:
             print(traceback.format_exc())
             raise
 
+    def _cache_search_results(self, query: str, results: list) -> str:
+        """
+        Extrait le texte des résultats du retriever et le met en cache
+        
+        Args:
+            query: Contexte de la recherche (clé du cache)
+            results: Nœuds retournés par le retriever
+            
+        Returns:
+            str: Textes de loi trouvés
+        """
+        print(f"✅ Requête exécutée - Nombre de résultats : {len(results)}")
+        
+        # Extraire le texte des résultats
+        text_results = []
+        for i, node in enumerate(results, 1):
+            print(f"\n📄 Traitement du résultat {i}/{len(results)}")
+            if hasattr(node, 'text'):
+                text_results.append(node.text)
+                print(f"✅ Texte extrait (longueur: {len(node.text)} caractères)")
+            elif hasattr(node, 'content'):
+                text_results.append(node.content)
+                print(f"✅ Contenu extrait (longueur: {len(node.content)} caractères)")
+        
+        result_text = "\n".join(text_results) if text_results else "Aucune législation trouvée."
+        print(f"\n📝 Résultat final - Longueur totale : {len(result_text)} caractères")
+        
+        # Mettre en cache le résultat
+        self._search_cache[query] = result_text
+        print("✅ Résultat mis en cache")
+        
+        return result_text
+
     def query(self, query_text: str) -> str:
         """
         Exécute une requête via le query engine
@@ -158,6 +288,29 @@ class RaptorSetup:
             print(traceback.format_exc())
             raise
 
+    async def aquery(self, query_text: str) -> str:
+        """
+        Version asynchrone de query (query engine interrogé via aquery)
+        
+        Args:
+            query_text: La question à poser
+            
+        Returns:
+            str: La réponse générée
+        """
+        print(f"\n📚 Exécution de la requête Raptor (async): {query_text[:200]}...")
+        try:
+            response = await self.query_engine.aquery(query_text)
+            print("✅ Réponse générée")
+            return str(response)
+            
+        except Exception as e:
+            print(f"\n❌ Erreur lors de la requête Raptor: {str(e)}")
+            print("📝 Détails de l'erreur :")
+            import traceback
+            print(traceback.format_exc())
+            raise
+
     def extract_pdf_content(self, pdf_path: str) -> Dict[str, Any]:
         """
         Extrait le contenu d'un PDF pour l'agent React
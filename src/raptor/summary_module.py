@@ -0,0 +1,104 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+from pydantic import PrivateAttr
+from llama_index.core.llms.llm import LLM
+from llama_index.core.schema import BaseNode, MetadataMode, NodeWithScore
+from llama_index.packs.raptor.base import DEFAULT_SUMMARY_PROMPT, SummaryModule
+from tenacity import retry, stop_after_attempt, wait_exponential
+from utils.rate_limiter import wait_retry_after
+from utils.summary_cache import SummaryCache, hash_node_text
+
+class ParallelSummaryModule(SummaryModule):
+    """
+    Module de résumé des clusters de l'arbre RAPTOR : tous les clusters d'un niveau sont
+    résumés simultanément (au plus num_workers appels en cours), chaque appel est rejoué
+    en cas d'échec, et les résumés sont mis en cache par l'ensemble de leurs nodes membres.
+    """
+
+    _cache: Optional[SummaryCache] = PrivateAttr(default=None)
+    _model_name: str = PrivateAttr(default="")
+    _stats: Dict[str, float] = PrivateAttr(
+        default_factory=lambda: {"clusters": 0, "cached": 0, "generated": 0, "seconds": 0.0}
+    )
+
+    def __init__(
+        self,
+        llm: Optional[LLM] = None,
+        summary_prompt: str = DEFAULT_SUMMARY_PROMPT,
+        num_workers: int = 8,
+        cache: Optional[SummaryCache] = None,
+    ):
+        """
+        Args:
+            llm: Modèle de résumé
+            summary_prompt: Prompt de résumé
+            num_workers: Nombre maximal de clusters résumés simultanément
+            cache: Cache des résumés (None : pas de cache)
+        """
+        super().__init__(llm=llm, summary_prompt=summary_prompt, num_workers=max(1, num_workers))
+        self._cache = cache
+        self._model_name = getattr(llm, "model", None) or type(llm).__name__
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistiques cumulées
+
+        Returns:
+            Dict: Clusters traités, résumés repris du cache, résumés générés et durée totale
+        """
+        return dict(self._stats)
+
+    def cluster_key(self, nodes: List[BaseNode]) -> str:
+        """Clé de cache d'un cluster : empreintes du texte de ses membres, modèle et prompt"""
+        member_ids = [hash_node_text(node.get_content(metadata_mode=MetadataMode.NONE)) for node in nodes]
+        return self._cache.build_key(self._model_name, self.summary_prompt, member_ids)
+
+    # Le débit est régulé par le limiteur du client HTTP du modèle (429 rejoués) :
+    # les nouvelles tentatives couvrent les autres erreurs transitoires
+    @retry(stop=stop_after_attempt(3), wait=wait_retry_after(wait_exponential(multiplier=1, min=4, max=30)), reraise=True)
+    async def _summarize_cluster(self, nodes: List[BaseNode]) -> str:
+        """Résume un cluster (un ou plusieurs appels LLM selon la taille du cluster)"""
+        with_scores = [NodeWithScore(node=node, score=1.0) for node in nodes]
+        response = await self.response_synthesizer.asynthesize(self.summary_prompt, with_scores)
+        return str(response)
+
+    async def generate_summaries(self, documents_per_cluster: List[List[BaseNode]]) -> List[str]:
+        """
+        Résume tous les clusters d'un niveau en parallèle
+
+        Args:
+            documents_per_cluster: Nodes de chaque cluster
+
+        Returns:
+            List[str]: Résumé de chaque cluster, dans l'ordre des clusters
+        """
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.num_workers)
+        cached = 0
+
+        async def summarize(nodes: List[BaseNode]) -> str:
+            nonlocal cached
+            key = self.cluster_key(nodes) if self._cache is not None else None
+            if key is not None:
+                summary = self._cache.get_summary(key)
+                if summary is not None:
+                    cached += 1
+                    return summary
+
+            async with semaphore:
+                summary = await self._summarize_cluster(nodes)
+            if key is not None:
+                self._cache.set_summary(key, summary)
+            return summary
+
+        summaries = await asyncio.gather(*(summarize(nodes) for nodes in documents_per_cluster))
+
+        elapsed = time.perf_counter() - start
+        self._stats["clusters"] += len(documents_per_cluster)
+        self._stats["cached"] += cached
+        self._stats["generated"] += len(documents_per_cluster) - cached
+        self._stats["seconds"] += elapsed
+        print(f"📝 {len(documents_per_cluster)} cluster(s) résumé(s) en {elapsed:.1f}s "
+              f"({cached} repris du cache, {self.num_workers} en parallèle au plus)")
+        return list(summaries)
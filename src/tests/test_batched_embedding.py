@@ -0,0 +1,76 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from typing import List
+from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
+from llama_index.core.embeddings import MockEmbedding
+from utils.batched_embedding import BatchedEmbedding, pack_batches
+
+
+class RecordingEmbedding(MockEmbedding):
+    """Modèle factice : embedding = [longueur du texte], enregistre les lots et la concurrence"""
+    batches: List[int] = []
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    async def _aget_text_embeddings(self, texts):
+        self.batches.append(len(texts))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [[float(len(text))] for text in texts]
+
+    def _get_text_embeddings(self, texts):
+        self.batches.append(len(texts))
+        return [[float(len(text))] for text in texts]
+
+
+class TestBatchedEmbedding:
+    """Tests des embeddings par lots de la construction de l'index"""
+
+    def test_pack_batches(self):
+        """Vérifie le découpage borné en nombre de textes et en tokens, sans réordonner"""
+        texts = ["a" * 400] * 5 + ["b" * 4000] + ["c" * 40] * 3
+        assert pack_batches(texts, max_batch_size=3, max_batch_tokens=10_000) == [(0, 3), (3, 6), (6, 9)]
+        # 100 tokens par texte "a", 1000 pour le texte "b" : le lot est coupé avant de dépasser 1000
+        assert pack_batches(texts, max_batch_size=100, max_batch_tokens=1000) == [(0, 5), (5, 6), (6, 9)]
+        assert pack_batches([], 10, 10) == []
+
+    def test_concurrent_batches_keep_order(self):
+        """Vérifie l'envoi parallèle borné des lots et l'ordre des embeddings renvoyés"""
+        inner = RecordingEmbedding(embed_dim=1, batches=[])
+        embed_model = BatchedEmbedding(inner, max_batch_size=4, max_concurrency=2)
+        texts = ["x" * i for i in range(1, 11)]
+
+        embeddings = asyncio.run(embed_model.aget_text_embedding_batch(texts))
+
+        assert embeddings == [[float(i)] for i in range(1, 11)]
+        assert inner.batches == [4, 4, 2]
+        assert inner.max_in_flight == 2
+        stats = embed_model.stats()
+        assert stats["texts"] == 10 and stats["batches"] == 3
+        assert stats["chunks_per_second"] > 0
+
+    def test_sync_path(self):
+        """Vérifie le chemin synchrone (embeddings des nodes insérés sans vecteur)"""
+        inner = RecordingEmbedding(embed_dim=1, batches=[])
+        embed_model = BatchedEmbedding(inner, max_batch_size=3)
+        assert embed_model.get_text_embedding_batch(["ab", "c", "def", "g"]) == [[2.0], [1.0], [3.0], [1.0]]
+        assert inner.batches == [3, 1]
+
+    def test_embedding_tokens_counted(self):
+        """Vérifie que chaque lot est signalé au compteur de tokens (chemins synchrone et asynchrone)"""
+        counter = TokenCountingHandler(tokenizer=lambda text: text.split())
+        inner = RecordingEmbedding(embed_dim=1, batches=[], callback_manager=CallbackManager([counter]))
+        embed_model = BatchedEmbedding(inner, max_batch_size=2)
+
+        embed_model.get_text_embedding_batch(["loi evin", "jeux", "credit conso"])
+        assert counter.total_embedding_token_count == 5
+        assert len(counter.embedding_token_counts) == 3
+
+        asyncio.run(embed_model.aget_text_embedding_batch(["abus alcool dangereux"]))
+        assert counter.total_embedding_token_count == 8
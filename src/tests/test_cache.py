@@ -0,0 +1,180 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlite3
+import cv2
+import numpy as np
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import ChatMessage, ImageBlock, TextBlock, MessageRole
+from utils.cache import PersistentLRUCache, make_cache_key
+from utils.llm_cache import LLMResponseCache
+from utils.embedding_cache import CachedEmbedding, EmbeddingCache
+from utils.ocr_cache import OCRResultCache, hash_pixels
+from utils.image_preprocessing import load_image
+from utils.raw_text_extractor import RawTextExtractor
+from utils.text_extractor import TextExtractor
+
+
+class FakeLLM:
+    """Modèle factice exposant les attributs utilisés pour la clé de cache"""
+
+    def __init__(self, engine: str = "gpt4o", temperature: float = 0.0):
+        self.model = "gpt-4o"
+        self.engine = engine
+        self.temperature = temperature
+
+
+class TestPersistentLRUCache:
+    """Tests du cache persistant SQLite"""
+
+    def test_get_set_and_persistence(self, tmp_path):
+        """Vérifie qu'une valeur est relue, y compris après réouverture du fichier"""
+        db_path = tmp_path / "cache.sqlite"
+        cache = PersistentLRUCache(str(db_path))
+        cache.set("a", b"valeur")
+        assert cache.get("a") == b"valeur"
+        assert cache.get("b") is None
+        cache.close()
+
+        reopened = PersistentLRUCache(str(db_path))
+        assert reopened.get("a") == b"valeur"
+        stats = reopened.stats()
+        assert stats["hits"] == 1 and stats["misses"] == 0
+        assert stats["entries"] == 1
+
+    def test_lru_eviction(self, tmp_path):
+        """Vérifie que les entrées les moins récemment utilisées sont évincées en premier"""
+        cache = PersistentLRUCache(str(tmp_path / "cache.sqlite"), max_size_mb=2500 / (1024 * 1024))
+        cache.set("ancienne", b"x" * 1000)
+        cache.set("recente", b"x" * 1000)
+        cache.get("ancienne")  # "ancienne" devient la plus récemment utilisée
+        cache.set("nouvelle", b"x" * 1000)
+
+        assert cache.get("recente") is None
+        assert cache.get("ancienne") is not None
+        assert cache.get("nouvelle") is not None
+
+    def test_make_cache_key_is_stable(self):
+        """Vérifie que la clé dépend uniquement du contenu"""
+        assert make_cache_key("prompt", 0.0, ["abc"]) == make_cache_key("prompt", 0.0, ["abc"])
+        assert make_cache_key("prompt", 0.0) != make_cache_key("prompt", 0.5)
+
+
+class TestLLMResponseCache:
+    """Tests des clés du cache des réponses LLM"""
+
+    def test_message_key_depends_on_image_prompt_and_model(self, tmp_path):
+        """Vérifie que la clé change avec l'image, le prompt ou le déploiement"""
+        cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+        llm = FakeLLM()
+
+        def message(prompt: str, image: bytes) -> ChatMessage:
+            return ChatMessage(role=MessageRole.USER, blocks=[TextBlock(text=prompt), ImageBlock(image=image)])
+
+        key = cache.build_message_key(llm, message("Décris", b"image-1"))
+        assert key == cache.build_message_key(llm, message("Décris", b"image-1"))
+        assert key != cache.build_message_key(llm, message("Décris", b"image-2"))
+        assert key != cache.build_message_key(llm, message("Analyse", b"image-1"))
+        assert key != cache.build_message_key(FakeLLM(engine="autre"), message("Décris", b"image-1"))
+
+    def test_response_roundtrip(self, tmp_path):
+        """Vérifie l'enregistrement et la relecture d'une réponse"""
+        cache = LLMResponseCache(str(tmp_path / "llm.sqlite"))
+        key = cache.build_key(FakeLLM(), "prompt")
+        assert cache.get_response(key) is None
+        cache.set_response(key, "réponse é")
+        assert cache.get_response(key) == "réponse é"
+
+
+class TestCachedEmbedding:
+    """Tests du cache des embeddings de requêtes"""
+
+    def test_query_embedding_served_from_cache(self, tmp_path):
+        """Vérifie qu'une requête identique à la normalisation près n'appelle pas le modèle"""
+        class CountingEmbedding(MockEmbedding):
+            calls: int = 0
+
+            def _get_query_embedding(self, query):
+                self.calls += 1
+                return super()._get_query_embedding(query)
+
+        inner = CountingEmbedding(embed_dim=8)
+        cache = EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+        embed_model = CachedEmbedding(inner, cache)
+
+        first = embed_model.get_query_embedding("Publicité  Canapé\n-50 %")
+        second = embed_model.get_query_embedding("publicité canapé -50 %")
+
+        assert inner.calls == 1
+        assert second == pytest.approx(first)
+        assert cache.stats()["hit_ratio"] == 0.5
+
+
+class TestOCRResultCache:
+    """Tests du cache des résultats OCR"""
+
+    def test_key_depends_on_pixels_not_encoding(self, tmp_path):
+        """Vérifie qu'une même image ré-encodée partage la clé, mais pas une autre configuration"""
+        image = np.random.default_rng(0).integers(0, 255, (40, 60, 3)).astype(np.uint8)
+        cv2.imwrite(str(tmp_path / "pub.png"), image)
+        cv2.imwrite(str(tmp_path / "pub.bmp"), image)
+        cache = OCRResultCache(str(tmp_path / "ocr.sqlite"))
+
+        png_hash = hash_pixels(load_image(str(tmp_path / "pub.png")))
+        bmp_hash = hash_pixels(load_image(str(tmp_path / "pub.bmp")))
+        assert png_hash == bmp_hash
+
+        key = cache.build_key(png_hash, "tesseract", lang="fra+eng", psm=(6,))
+        assert key == cache.build_key(bmp_hash, "tesseract", lang="fra+eng", psm=(6,))
+        assert key != cache.build_key(png_hash, "tesseract", lang="fra+eng", psm=(7,))
+        assert key != cache.build_key(png_hash, "tesseract", lang="fra+eng", psm=(6,), preprocessing={"deskew": True})
+
+    def test_raw_extraction_served_from_cache(self, tmp_path):
+        """Vérifie qu'une image déjà reconnue n'est pas soumise de nouveau au moteur"""
+        image_path = tmp_path / "pub.png"
+        cv2.imwrite(str(image_path), np.full((40, 60), 255, dtype=np.uint8))
+        cache = OCRResultCache(str(tmp_path / "ocr.sqlite"))
+        key = cache.build_key(hash_pixels(load_image(str(image_path))), "raw_tesseract", lang="fra+eng", psm=(6,))
+        cache.set_result(key, {"text": "Offre valable jusqu'au 31/12", "mean_conf": 91.5, "words": 4, "psm": 6})
+
+        extractor = RawTextExtractor(ocr_cache=cache)
+        extractor.available_engines = {"tesseract": True}
+
+        assert extractor.extract_raw_text(str(image_path), "tesseract") == {"tesseract": "Offre valable jusqu'au 31/12"}
+        assert cache.stats()["hits"] == 1
+
+    def test_cache_errors_and_empty_results(self, tmp_path, monkeypatch):
+        """Vérifie qu'un cache verrouillé ne fait pas perdre le résultat et qu'un texte vide n'est pas mis en cache"""
+        image_path = tmp_path / "pub.png"
+        cv2.imwrite(str(image_path), np.full((40, 60), 255, dtype=np.uint8))
+        cache = OCRResultCache(str(tmp_path / "ocr.sqlite"))
+        extractor = RawTextExtractor(ocr_cache=cache)
+        extractor.available_engines = {"tesseract": True}
+
+        monkeypatch.setattr(extractor, "_run_tesseract", lambda image, lang: {"text": "  ", "words": 0})
+        assert extractor.extract_raw_text(str(image_path), "tesseract") == {"tesseract": "  "}
+        assert cache.stats()["entries"] == 0
+
+        def locked(*args):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(extractor, "_run_tesseract", lambda image, lang: {"text": "Offre valable", "words": 2})
+        monkeypatch.setattr(cache, "get", locked)
+        monkeypatch.setattr(cache, "set", locked)
+        assert extractor.extract_raw_text(str(image_path), "tesseract") == {"tesseract": "Offre valable"}
+
+    def test_text_extraction_caches_engine_result(self, tmp_path, monkeypatch):
+        """Vérifie que extract_text conserve le résultat complet du moteur (confiances, mots) dans le cache"""
+        image_path = tmp_path / "pub.png"
+        cv2.imwrite(str(image_path), np.full((40, 60), 255, dtype=np.uint8))
+        cache = OCRResultCache(str(tmp_path / "ocr.sqlite"))
+        extractor = TextExtractor(ocr_cache=cache)
+        extractor.available_ocr_engines = {"tesseract": True}
+        result = {"text": "Offre valable jusqu'au 31/12", "words": 4, "mean_conf": 91.5, "psm": 6}
+        monkeypatch.setattr(extractor, "_run_tesseract", lambda image: dict(result))
+
+        assert extractor.extract_text(str(image_path), "tesseract") == result["text"]
+        key = extractor._text_cache_key(hash_pixels(load_image(str(image_path))), "tesseract", True, False)
+        assert cache.get_result(key) == {"engine": "tesseract", **result}
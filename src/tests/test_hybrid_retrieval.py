@@ -0,0 +1,86 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import chromadb
+from llama_index.core.base.base_retriever import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+from raptor.hybrid_retrieval import BM25Index, HybridRetriever, reciprocal_rank_fusion, tokenize
+
+TEXTS = {
+    "evin": "Article L. 3323-4 : toute publicité doit comporter la mention « L'abus d'alcool est dangereux pour la santé »",
+    "alcool": "La publicité en faveur des boissons alcooliques est autorisée dans la presse écrite",
+    "jeux": "Toute communication commerciale en faveur des jeux d'argent comporte un message de mise en garde",
+    "argent": "Le prix est exprimé en euros, l'argent liquide est accepté pour les jeux vidéo",
+    "credit": "Un crédit vous engage et doit être remboursé : mention obligatoire du crédit à la consommation",
+}
+
+
+class FixedRetriever(BaseRetriever):
+    """Retriever dense factice : renvoie toujours le même classement et enregistre les requêtes"""
+
+    def __init__(self, ids):
+        super().__init__()
+        self.ids = ids
+        self.queries = []
+
+    def _retrieve(self, query_bundle):
+        self.queries.append(query_bundle.query_str)
+        return [NodeWithScore(node=TextNode(text=TEXTS[node_id], id_=node_id), score=1.0) for node_id in self.ids]
+
+
+class TestBM25Index:
+    """Tests de l'index BM25 de la législation"""
+
+    def test_tokenize(self):
+        """Vérifie la normalisation (accents, mots vides) et la conservation des numéros d'articles"""
+        tokens = tokenize("Article L. 3323-4 : l'abus d'alcool")
+        assert "3323-4" in tokens
+        assert "abus alcool" in tokens
+        assert "l" not in tokens
+        assert tokenize("Sécurité") == tokenize("securite")
+
+    def test_exact_references_rank_first(self, tmp_path):
+        """Vérifie le classement par numéro d'article et expression figée, y compris après rechargement"""
+        index = BM25Index.build(list(TEXTS), list(TEXTS.values()))
+
+        assert index.search("article L3323-4", 2)[0][0] == "evin"
+        assert [node_id for node_id, _ in index.search("jeux d'argent", 5)][:2] == ["jeux", "argent"]
+        assert index.search("astérisque", 5) == []
+
+        index.save(tmp_path / "bm25_index.npz")
+        loaded = BM25Index.load(tmp_path / "bm25_index.npz")
+        assert loaded.search("jeux d'argent", 5) == index.search("jeux d'argent", 5)
+
+    def test_reciprocal_rank_fusion(self):
+        """Vérifie qu'un élément bien classé par les deux méthodes passe en tête"""
+        fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+        assert [node_id for node_id, _ in fused] == ["c", "a", "b", "d"]
+
+
+class TestHybridRetriever:
+    """Tests de la fusion des résultats denses et BM25"""
+
+    def test_lexical_match_recovered(self):
+        """Vérifie qu'un article cité exactement, absent des candidats denses, remonte dans le top-k"""
+        collection = chromadb.EphemeralClient().get_or_create_collection("test_hybrid")
+        collection.add(ids=list(TEXTS), documents=list(TEXTS.values()), embeddings=[[float(i), 1.0] for i in range(len(TEXTS))])
+        dense = FixedRetriever(["alcool", "credit", "argent"])
+        retriever = HybridRetriever(
+            dense, BM25Index.from_chroma_collection(collection), collection, top_k=2, candidates=3
+        )
+
+        results = retriever.retrieve(QueryBundle(
+            query_str="L. 3323-4 abus d'alcool",
+            custom_embedding_strs=["OBJECTIF : ... L. 3323-4 abus d'alcool"],
+        ))
+
+        assert [result.node.node_id for result in results] == ["alcool", "evin"]
+        assert "abus d'alcool" in results[1].node.get_content()
+        # La recherche dense reçoit le prompt complet, BM25 le contexte seul
+        assert dense.queries == ["OBJECTIF : ... L. 3323-4 abus d'alcool"]
+
+        async_results = asyncio.run(retriever.aretrieve("jeux d'argent"))
+        assert async_results[0].node.node_id == "argent"
@@ -0,0 +1,57 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from utils.image_budget import (
+    VISION_BUDGETS, estimate_vision_tokens, fit_image_to_budget, vision_effective_size, vision_render_dpi,
+)
+
+
+def encode(width, height, ext=".png", params=()):
+    """Image encodée avec un motif, pour que le ré-encodage ne soit pas trivial"""
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    cv2.putText(image, "SOLDES -50%", (10, height // 2), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+    return cv2.imencode(ext, image, list(params))[1].tobytes()
+
+
+class TestImageBudget:
+    """Tests du budget d'image des appels vision"""
+
+    def test_token_estimate(self):
+        """Vérifie l'estimation par tuiles de 512 px (valeurs de la documentation OpenAI)"""
+        assert estimate_vision_tokens(1024, 1024) == 765
+        assert estimate_vision_tokens(2048, 4096) == 1105
+        assert estimate_vision_tokens(4000, 4000, detail="low") == 85
+        assert vision_effective_size(300, 200) == (300, 200)
+
+    def test_layout_budget_saves_tokens(self):
+        """Vérifie la réduction de l'image pour la description de la mise en page"""
+        sent, info = fit_image_to_budget(encode(1240, 1754), VISION_BUDGETS["layout"])
+        assert info["sent_size"] == (512, 724)
+        assert cv2.imdecode(np.frombuffer(sent, np.uint8), cv2.IMREAD_COLOR).shape[:2] == (724, 512)
+        assert info["mime_type"] == "image/jpeg"
+        assert info["tokens_sent"] < info["tokens_full"]
+        assert info["bytes_sent"] < info["bytes_full"]
+
+    def test_raw_text_keeps_effective_resolution(self):
+        """Vérifie que l'extraction du texte reçoit l'image à la résolution effective du modèle"""
+        _, info = fit_image_to_budget(encode(1240, 1754), VISION_BUDGETS["raw_text"])
+        assert min(info["sent_size"]) == 768
+        assert info["tokens_sent"] == info["tokens_full"]
+
+    def test_small_image_sent_unchanged(self):
+        """Vérifie qu'une image déjà dans le budget n'est pas ré-encodée inutilement"""
+        original = encode(400, 300, ".jpg", (cv2.IMWRITE_JPEG_QUALITY, 60))
+        sent, info = fit_image_to_budget(original, VISION_BUDGETS["raw_text"])
+        assert sent == original
+        assert info["mime_type"] == "image/jpeg"
+
+    def test_render_dpi(self):
+        """Vérifie la résolution de rendu d'une page A4 : petit côté juste au-dessus de 768 px"""
+        dpi = vision_render_dpi(595, 842)
+        assert 595 * dpi / 72 >= 768
+        assert dpi < 100
+        assert vision_render_dpi(20, 30) == 300
@@ -0,0 +1,49 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from utils.image_preprocessing import estimate_skew, load_image, preprocess_image
+
+
+def make_text_image(angle: float = 0.0) -> np.ndarray:
+    """Image BGR synthétique contenant quelques lignes de texte, éventuellement inclinée"""
+    image = np.full((300, 600, 3), 255, dtype=np.uint8)
+    for i, line in enumerate(["SOLDES D'ETE", "JUSQU'A -50%", "VOIR CONDITIONS"]):
+        cv2.putText(image, line, (40, 80 + i * 70), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    if angle:
+        matrix = cv2.getRotationMatrix2D((300, 150), angle, 1.0)
+        image = cv2.warpAffine(image, matrix, (600, 300), borderValue=(255, 255, 255))
+    return image
+
+
+class TestImagePreprocessing:
+    """Tests du prétraitement OCR partagé"""
+
+    def test_output_is_grayscale_uint8(self):
+        """Vérifie que tous les moteurs reçoivent une image 2D uint8 de même taille"""
+        result = preprocess_image(make_text_image(), adaptive_threshold=True)
+        assert result.shape == (300, 600)
+        assert result.dtype == np.uint8
+        assert result.flags["C_CONTIGUOUS"]
+
+    def test_load_from_bytes_and_quoted_path(self, tmp_path):
+        """Vérifie le décodage depuis un contenu encodé et depuis un chemin avec apostrophe"""
+        image = make_text_image()
+        ok, encoded = cv2.imencode(".png", image)
+        assert ok
+        path = tmp_path / "Mention-Jeux d'argent.png"
+        path.write_bytes(encoded.tobytes())
+
+        assert np.array_equal(load_image(encoded.tobytes()), image)
+        assert np.array_equal(load_image(str(path)), image)
+
+    def test_deskew(self):
+        """Vérifie que l'inclinaison estimée est corrigée"""
+        skewed = cv2.cvtColor(make_text_image(angle=5), cv2.COLOR_BGR2GRAY)
+        assert abs(estimate_skew(skewed)) == pytest.approx(5, abs=1.5)
+
+        straightened = preprocess_image(skewed, deskew=True, clahe=False, sharpen=False)
+        assert abs(estimate_skew(straightened)) < 1.5
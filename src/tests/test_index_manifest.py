@@ -0,0 +1,102 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+from llama_index.core.schema import TextNode
+from raptor.index_manifest import IndexManifest, hash_file
+from raptor.init_db import INDEX_SETTINGS, SourceTaggedVectorStore
+
+
+class TestIndexManifest:
+    """Tests du registre de l'indexation incrémentale"""
+
+    def test_plan_and_checkpoint(self, tmp_path):
+        """Vérifie le tri des documents et la reprise depuis le registre écrit sur disque"""
+        path = tmp_path / "index_manifest.json"
+        manifest = IndexManifest(path, INDEX_SETTINGS)
+        manifest.record("loi_evin.pdf", "h1", nodes=12)
+        manifest.record("jeux.pdf", "h2", nodes=8)
+
+        # Nouveau processus (ex: après un arrêt brutal) : le registre est relu
+        resumed = IndexManifest(path, INDEX_SETTINGS)
+        plan = resumed.plan({"loi_evin.pdf": "h1", "jeux.pdf": "h2-modifie", "credit.pdf": "h3"})
+        assert plan == {
+            "new": ["credit.pdf"],
+            "modified": ["jeux.pdf"],
+            "unchanged": ["loi_evin.pdf"],
+            "removed": [],
+        }
+        assert resumed.plan({"loi_evin.pdf": "h1"})["removed"] == ["jeux.pdf"]
+
+    def test_settings_change_requires_rebuild(self, tmp_path):
+        """Vérifie qu'un changement de paramètres de construction invalide tout le registre"""
+        path = tmp_path / "index_manifest.json"
+        IndexManifest(path, INDEX_SETTINGS).record("loi_evin.pdf", "h1", nodes=12)
+
+        manifest = IndexManifest(path, {**INDEX_SETTINGS, "chunk_size": 512})
+        assert manifest.settings_changed
+        assert manifest.plan({"loi_evin.pdf": "h1"})["new"] == ["loi_evin.pdf"]
+
+    def test_hash_file(self, tmp_path):
+        """Vérifie que l'empreinte ne dépend que du contenu"""
+        (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 decret")
+        (tmp_path / "b.pdf").write_bytes(b"%PDF-1.4 decret")
+        assert hash_file(tmp_path / "a.pdf") == hash_file(tmp_path / "b.pdf")
+
+
+class TestSourceTaggedVectorStore:
+    """Tests du rattachement des nodes à leur document source"""
+
+    def test_nodes_tagged_and_deleted_by_source(self):
+        """Vérifie le marquage, l'élimination des doublons du clustering et la suppression par source"""
+        collection = chromadb.EphemeralClient().get_or_create_collection("test_sources")
+        store = SourceTaggedVectorStore(chroma_collection=collection)
+
+        store.set_source("loi_evin.pdf", "h1")
+        chunk = TextNode(text="Article L. 3323-4", embedding=[1.0, 0.0])
+        summary = TextNode(text="Résumé", embedding=[0.0, 1.0], metadata={"level": 0})
+        ids = store.add([chunk, summary, chunk])
+        assert ids[0] == ids[2] and ids[0] != ids[1]
+
+        store.set_source("jeux.pdf", "h2")
+        store.add([TextNode(text="Jeux d'argent", embedding=[1.0, 1.0])])
+
+        assert "source_file" in chunk.excluded_embed_metadata_keys
+        assert len(collection.get(where={"source_file": "loi_evin.pdf"})["ids"]) == 2
+
+        collection.delete(where={"source_file": "loi_evin.pdf"})
+        remaining = collection.get(include=["metadatas"])["metadatas"]
+        assert [metadata["source_file"] for metadata in remaining] == ["jeux.pdf"]
+
+
+class TestIncrementalIndexing:
+    """Tests de l'indexation des documents modifiés"""
+
+    def test_documents_indexed_in_one_event_loop(self, tmp_path):
+        """Vérifie que tous les documents sont indexés dans la même boucle d'événements"""
+        import asyncio
+        from types import SimpleNamespace
+        from llama_index.core import Document
+        from raptor.init_db import RaptorDBInitializer
+
+        collection = chromadb.EphemeralClient().get_or_create_collection("test_loops")
+        store = SourceTaggedVectorStore(chroma_collection=collection)
+        loops = []
+
+        async def insert(documents):
+            loops.append(asyncio.get_running_loop())
+            store.add([TextNode(text=doc.text, embedding=[1.0, float(len(loops))]) for doc in documents])
+
+        initializer = RaptorDBInitializer.__new__(RaptorDBInitializer)
+        initializer.collection = collection
+        initializer.manifest = IndexManifest(tmp_path / "index_manifest.json", INDEX_SETTINGS)
+        initializer.load_legislation_data = lambda files: [Document(text=f"Texte de {files[0].name}")]
+        retriever = SimpleNamespace(insert=insert, index=SimpleNamespace(vector_store=store))
+
+        files = {"loi_evin.pdf": tmp_path / "loi_evin.pdf", "jeux.pdf": tmp_path / "jeux.pdf"}
+        asyncio.run(initializer._index_all(retriever, list(files), files, {"loi_evin.pdf": "h1", "jeux.pdf": "h2"}))
+
+        assert len(loops) == 2 and loops[0] is loops[1]
+        assert initializer.manifest.plan({"loi_evin.pdf": "h1", "jeux.pdf": "h2"})["unchanged"] == ["jeux.pdf", "loi_evin.pdf"]
@@ -0,0 +1,65 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.vector_stores.types import ExactMatchFilter, MetadataFilters, VectorStoreQuery
+from raptor.local_index import LocalVectorStore
+
+
+def make_store(size: int = 50, dim: int = 16) -> LocalVectorStore:
+    """Index local rempli de vecteurs aléatoires"""
+    rng = np.random.default_rng(0)
+    store = LocalVectorStore(mode="exact")
+    store.add([
+        TextNode(text=f"article {i}", id_=f"n{i}", embedding=rng.standard_normal(dim).tolist(),
+                 metadata={"level": i % 2})
+        for i in range(size)
+    ])
+    return store
+
+
+class TestLocalVectorStore:
+    """Tests de l'index vectoriel en mémoire"""
+
+    def test_query_matches_brute_force(self):
+        """Vérifie que le top-k correspond au classement cosinus exact"""
+        store = make_store()
+        query = np.random.default_rng(1).standard_normal(16)
+        result = store.query(VectorStoreQuery(query_embedding=query.tolist(), similarity_top_k=5))
+
+        matrix = np.array([node.get_embedding() for node in store._nodes])
+        cosine = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        expected = [f"n{i}" for i in np.argsort(-cosine)[:5]]
+
+        assert result.ids == expected
+        assert result.similarities == pytest.approx(sorted(cosine, reverse=True)[:5], abs=1e-5)
+
+    def test_metadata_filter(self):
+        """Vérifie le filtrage par niveau (égalité sur les métadonnées)"""
+        store = make_store()
+        query = VectorStoreQuery(
+            query_embedding=[1.0] * 16,
+            similarity_top_k=5,
+            filters=MetadataFilters(filters=[ExactMatchFilter(key="level", value=1)]),
+        )
+        result = store.query(query)
+        assert len(result.nodes) == 5
+        assert all(node.metadata["level"] == 1 for node in result.nodes)
+
+    def test_delete(self):
+        """Vérifie la suppression des nœuds issus d'un document"""
+        store = LocalVectorStore()
+        kept = TextNode(text="a", id_="a", embedding=[1.0, 0.0])
+        kept.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id="doc-1")
+        removed = TextNode(text="b", id_="b", embedding=[0.0, 1.0])
+        removed.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id="doc-2")
+        store.add([kept, removed])
+
+        store.delete("doc-2")
+
+        assert len(store) == 1
+        result = store.query(VectorStoreQuery(query_embedding=[0.0, 1.0], similarity_top_k=2))
+        assert result.ids == ["a"]
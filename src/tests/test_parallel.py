@@ -0,0 +1,57 @@
+import pytest
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.parallel import iter_parallel
+
+
+_worker_offset = None
+
+
+def init_offset(offset: int) -> None:
+    """Initialisation factice d'un processus du pool"""
+    global _worker_offset
+    _worker_offset = offset
+
+
+def add_offset(value: int) -> int:
+    """Tâche factice dépendant de l'état préparé par l'initialisation"""
+    return value + _worker_offset
+
+
+def slow_square(value: int) -> int:
+    """Tâche factice : durée proportionnelle à la valeur, échec pour une valeur négative"""
+    if value < 0:
+        raise ValueError("valeur négative")
+    time.sleep(value / 10)
+    return value * value
+
+
+class TestIterParallel:
+    """Tests du traitement par lot en pool de processus"""
+
+    def test_results_stream_in_completion_order(self):
+        """Vérifie que les résultats arrivent dans l'ordre de fin de traitement, avec leur durée"""
+        items = list(iter_parallel(slow_square, [5, 1, 3], workers=3))
+        assert [item["item"] for item in items] == [1, 3, 5]
+        assert [item["result"] for item in items] == [1, 9, 25]
+        assert items[-1]["elapsed"] >= 0.5
+
+    def test_error_isolated_to_its_file(self):
+        """Vérifie qu'une erreur n'interrompt pas le reste du lot"""
+        items = {item["item"]: item for item in iter_parallel(slow_square, [1, -1, 2], workers=2)}
+        assert items[-1]["error"] == "ValueError: valeur négative"
+        assert items[1]["result"] == 1 and items[2]["result"] == 4
+
+    def test_sequential_mode(self):
+        """Vérifie le traitement séquentiel dans le processus courant (workers=1)"""
+        items = list(iter_parallel(lambda value: value + 1, [1, 2]))
+        assert [item["result"] for item in items] == [2, 3]
+
+    def test_single_item_runs_initializer(self):
+        """Vérifie qu'un lot d'un seul élément (workers > 1) passe par l'initialisation du pool"""
+        items = list(iter_parallel(add_offset, [1], workers=4, initializer=init_offset, initargs=(10,)))
+        assert items[0]["error"] is None
+        assert items[0]["result"] == 11
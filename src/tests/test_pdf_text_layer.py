@@ -0,0 +1,117 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import fitz
+import numpy as np
+from utils.image_preprocessing import load_image
+from utils.pdf_converter import (
+    extract_text_layer, is_text_layer_usable, parse_page_range,
+    render_pdf_pages, render_pdf_to_array, render_pdf_to_bytes,
+)
+
+LEGAL_LINES = [
+    "LIQUIDATION AVANT FERMETURE DEFINITIVE",
+    "Du 24 mars au 24 mai 2025 sur tous les salons et la literie",
+    "Offre valable dans la limite des stocks disponibles en magasin",
+    "Voir conditions en magasin, non cumulable avec d'autres promotions",
+    "67 rue Charles-Coulomb 14120 Mondeville www.exemple.fr",
+]
+
+
+def make_pdf(path, lines, with_photo=False):
+    """PDF d'une page : lignes de texte sélectionnable, sur une photo pleine page si demandé"""
+    pdf = fitz.open()
+    page = pdf.new_page(width=400, height=600)
+    if with_photo:
+        photo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 96), False)
+        photo.set_rect(photo.irect, (200, 120, 40))
+        page.insert_image(page.rect, pixmap=photo)
+    for i, line in enumerate(lines):
+        page.insert_text((20, 40 + i * 20), line, fontsize=9)
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+class TestPdfTextLayer:
+    """Tests de la lecture de la couche texte des PDF"""
+
+    def test_text_layer_with_positions(self, tmp_path):
+        """Vérifie la lecture du texte, dans l'ordre, avec la position de chaque bloc"""
+        layer = extract_text_layer(make_pdf(tmp_path / "pub.pdf", LEGAL_LINES))
+        assert layer["text"].split("\n")[0] == LEGAL_LINES[0]
+        assert "Mondeville" in layer["text"]
+        x0, y0, x1, y1 = layer["blocks"][0]["bbox"]
+        assert 0 <= x0 < x1 <= 400 and 0 <= y0 < y1 <= 600
+        assert is_text_layer_usable(layer)
+
+    def test_sparse_layer_falls_back(self, tmp_path):
+        """Vérifie qu'une page essentiellement image, avec une seule mention, n'est pas exploitée"""
+        layer = extract_text_layer(make_pdf(tmp_path / "pub.pdf", LEGAL_LINES[:1], with_photo=True))
+        assert layer["image_coverage"] == pytest.approx(1.0)
+        assert not is_text_layer_usable(layer)
+
+    def test_missing_layer(self, tmp_path):
+        """Vérifie qu'un PDF purement rastérisé n'a pas de couche texte"""
+        layer = extract_text_layer(make_pdf(tmp_path / "scan.pdf", [], with_photo=True))
+        assert layer["text"] == "" and layer["blocks"] == []
+        assert not is_text_layer_usable(layer)
+
+
+class TestPdfRendering:
+    """Tests de la rastérisation des PDF en mémoire"""
+
+    def test_render_to_array_and_bytes(self, tmp_path):
+        """Vérifie que le rendu brut et le rendu encodé ont les mêmes pixels, sans fichier écrit"""
+        pdf_path = make_pdf(tmp_path / "pub.pdf", LEGAL_LINES, with_photo=True)
+        array = render_pdf_to_array(pdf_path, dpi=144)
+        assert array.shape == (1200, 800, 3)
+
+        encoded = render_pdf_to_bytes(pdf_path, dpi=144)
+        assert encoded.startswith(b"\x89PNG")
+        assert np.array_equal(cv2.imdecode(np.frombuffer(encoded, np.uint8), cv2.IMREAD_COLOR), array)
+        assert sorted(os.listdir(tmp_path)) == ["pub.pdf"]
+
+    def test_ocr_loader_accepts_pdf(self, tmp_path):
+        """Vérifie que le chargement OCR rastérise directement la première page d'un PDF"""
+        pdf_path = make_pdf(tmp_path / "pub.pdf", LEGAL_LINES)
+        assert load_image(pdf_path).shape == (2500, 1667, 3)
+
+
+class TestPdfPages:
+    """Tests du rendu des PDF multipages"""
+
+    def test_parse_page_range(self):
+        """Vérifie la sélection de pages (numérotation à partir de 1, bornée au document)"""
+        assert parse_page_range(None, 3) == [0, 1, 2]
+        assert parse_page_range("all", 2) == [0, 1]
+        assert parse_page_range("1-3,5,2", 10) == [0, 1, 2, 4]
+        assert parse_page_range("8-", 10) == [7, 8, 9]
+        assert parse_page_range("2-40", 4) == [1, 2, 3]
+        with pytest.raises(ValueError):
+            parse_page_range("12", 4)
+
+    def test_render_pages_in_pool(self, tmp_path):
+        """Vérifie que le rendu réparti entre processus est identique au rendu page par page"""
+        pdf = fitz.open()
+        for i, line in enumerate(LEGAL_LINES):
+            pdf.new_page(width=200, height=300).insert_text((20, 40), f"Page {i + 1} : {line}", fontsize=8)
+        path = str(tmp_path / "catalogue.pdf")
+        pdf.save(path)
+        pdf.close()
+
+        rendered = render_pdf_pages(path, pages=[0, 2, 3, 4], dpi=72, workers=2)
+        assert list(rendered) == [0, 2, 3, 4]
+        for page_number, image_bytes in rendered.items():
+            assert image_bytes == render_pdf_to_bytes(path, dpi=72, page_number=page_number)
+        assert len(render_pdf_pages(path, dpi=72, workers=1)) == len(LEGAL_LINES)
+        # Résolution propre à chaque page, pool réutilisé d'un lot à l'autre
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            mixed = render_pdf_pages(path, pages=[0, 1], dpi={0: 72, 1: 36}, workers=2, executor=executor)
+            assert render_pdf_pages(path, pages=[4], dpi=72, executor=executor) == {4: rendered[4]}
+        assert mixed[1] == render_pdf_to_bytes(path, dpi=36, page_number=1)
+        assert mixed[0] == render_pdf_to_bytes(path, dpi=72, page_number=0)
@@ -0,0 +1,191 @@
+import pytest
+import asyncio
+import os
+import time
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent.pipeline import DAGPipeline
+
+
+class FakeTools:
+    """Outils factices enregistrant l'ordre des appels"""
+
+    def __init__(self, failing: str = None):
+        self.calls = []
+        self.failing = failing
+
+    def _record(self, name: str) -> str:
+        self.calls.append(name)
+        if name == self.failing:
+            raise ValueError("échec simulé")
+        return f"résultat {name}"
+
+    def extract_raw_text_for_agent(self, image_path):
+        return self._record("extract_raw_text")
+
+    def analyze_vision(self, image_path):
+        return self._record("analyze_vision")
+
+    def verify_consistency(self, vision_result):
+        return self._record("verify_consistency")
+
+    def verify_dates(self, vision_result):
+        return self._record("verify_dates")
+
+    def search_legislation(self, vision_result):
+        return self._record("search_legislation")
+
+    def get_clarifications(self, questions_text):
+        self.questions_text = questions_text
+        return self._record("get_clarifications")
+
+    def analyze_compliance(self):
+        return self._record("analyze_compliance")
+
+    async def _arecord(self, name: str) -> str:
+        await asyncio.sleep(0.2)
+        return self._record(name)
+
+    async def averify_consistency(self, vision_result):
+        return await self._arecord("verify_consistency")
+
+    async def averify_dates(self, vision_result):
+        return await self._arecord("verify_dates")
+
+    async def asearch_legislation(self, vision_result):
+        return await self._arecord("search_legislation")
+
+
+class TestDAGPipeline:
+    """Tests pour le pipeline déterministe"""
+
+    def test_levels_respect_dependencies(self):
+        """Les vérifications post-vision forment un seul niveau"""
+        pipeline = DAGPipeline(FakeTools())
+        levels = [[stage.name for stage in level] for level in pipeline.levels]
+
+        assert levels[0] == ["raw_text"]
+        assert levels[1] == ["vision_analysis"]
+        assert sorted(levels[2]) == ["consistency_check", "dates_verification", "legislation"]
+        assert levels[3] == ["clarifications"]
+        assert levels[4] == ["compliance_analysis"]
+
+    def test_run_produces_save_output_steps(self):
+        """Le résultat contient les mêmes étapes que le mode ReAct"""
+        tools = FakeTools()
+        results = DAGPipeline(tools).run("image.png")
+
+        assert tools.calls[:2] == ["extract_raw_text", "analyze_vision"]
+        assert tools.calls[-1] == "analyze_compliance"
+        assert set(results["steps"]) == {
+            "raw_text", "vision_analysis", "consistency_check", "dates_verification",
+            "legislation", "clarifications", "compliance_analysis",
+        }
+        assert results["final_response"] == "résultat analyze_compliance"
+        assert "résultat verify_dates" in tools.questions_text
+
+    def test_stage_error_does_not_stop_pipeline(self):
+        """Une étape en erreur est signalée sans interrompre les suivantes"""
+        tools = FakeTools(failing="verify_dates")
+        results = DAGPipeline(tools).run("image.png")
+
+        assert "Erreur" in results["steps"]["dates_verification"]
+        assert "analyze_compliance" in tools.calls
+
+    def test_arun_runs_post_vision_checks_concurrently(self):
+        """Les trois vérifications post-vision s'exécutent en parallèle"""
+        tools = FakeTools()
+        start = time.perf_counter()
+        results = asyncio.run(DAGPipeline(tools).arun("image.png"))
+        elapsed = time.perf_counter() - start
+
+        # Trois branches de 0,2 s : la durée totale est celle de la plus lente, pas leur somme
+        assert elapsed < 0.5
+        assert results["steps"]["legislation"] == "résultat search_legislation"
+        assert results["final_response"] == "résultat analyze_compliance"
+
+
+class TestDAGSessionCallbacks:
+    """Tests du suivi des appels LLM par session en mode DAG"""
+
+    def test_sessions_do_not_share_callbacks(self, tmp_path, monkeypatch):
+        """Vérifie que chaque session reçoit ses propres événements sans modifier le modèle partagé"""
+        from types import SimpleNamespace
+        from llama_index.core.llms import MockLLM
+        from main import AnalysisSession
+
+        monkeypatch.chdir(tmp_path)
+        shared = MockLLM()
+        shared_callbacks = shared.callback_manager
+        models = SimpleNamespace(llm=shared)
+        first = AnalysisSession(ai_models=models, raptor_setup=object(), pipeline="dag")
+        second = AnalysisSession(ai_models=models, raptor_setup=object(), pipeline="dag", token_counter=first.token_counter)
+
+        assert shared.callback_manager is shared_callbacks
+        assert first.tools.llm.callback_manager is first.callback_manager
+        assert second.tools.llm.callback_manager is second.callback_manager
+
+
+class TestAnalyzeFiles:
+    """Tests de l'analyse des PDF multipages par le pool de sessions"""
+
+    def test_pages_rendered_in_batches(self, tmp_path, monkeypatch):
+        """Vérifie le rendu par lots bornés, à la résolution de chaque page, et le regroupement des résultats"""
+        import fitz
+        import main
+        from utils.image_budget import vision_render_dpi
+        from utils.pdf_converter import render_pdf_pages
+
+        monkeypatch.chdir(tmp_path)
+        pdf = fitz.open()
+        sizes = [(595, 842) if i % 3 else (842, 1191) for i in range(10)]
+        for width, height in sizes:
+            pdf.new_page(width=width, height=height)
+        path = str(tmp_path / "catalogue.pdf")
+        pdf.save(path)
+        pdf.close()
+
+        batches, executors, in_memory, saved = [], [], [0], {}
+        peak = [0]
+
+        def fake_render(pdf_path, pages, dpi, workers=None, executor=None):
+            batches.append((list(pages), dict(dpi)))
+            executors.append(executor)
+            rendered = render_pdf_pages(pdf_path, pages, dpi={page: 18 for page in pages}, workers=1)
+            in_memory[0] += len(rendered)
+            peak[0] = max(peak[0], in_memory[0])
+            return rendered
+
+        class FakeSession:
+            def __init__(self, **kwargs):
+                self.ai_models = self.raptor_setup = self.token_counter = None
+                self.llm_cache = self.ocr_cache = None
+
+            async def analyze_page(self, file_path, page_number, image_bytes):
+                await asyncio.sleep(0.01)
+                in_memory[0] -= 1
+                return {"page": page_number + 1, "steps": {}, "final_response": f"page {page_number + 1}"}
+
+        monkeypatch.setattr(main, "render_pdf_pages", fake_render)
+        monkeypatch.setattr(main, "AnalysisSession", FakeSession)
+        monkeypatch.setattr(main, "save_output", lambda file_path, data: saved.setdefault(file_path, data))
+
+        asyncio.run(main.analyze_files([path], concurrency=2, render_workers=1))
+
+        assert all(len(pages) <= 2 for pages, _ in batches)
+        assert [page for pages, _ in batches for page in pages] == list(range(10))
+        for pages, dpi in batches:
+            for page in pages:
+                assert dpi[page] == vision_render_dpi(*sizes[page])
+        assert len({dpi[page] for pages, dpi in batches for page in pages}) == 2
+        # File bornée : quelques lots en mémoire au plus, jamais tout le document
+        assert peak[0] <= 6
+        assert [result["page"] for result in saved[path]["pages"]] == list(range(1, 11))
+
+        # Pool de rendu unique, dimensionné indépendamment du nombre de sessions
+        batches.clear()
+        executors.clear()
+        asyncio.run(main.analyze_files([path], concurrency=1, render_workers=3))
+        assert [len(pages) for pages, _ in batches] == [3, 3, 3, 1]
+        assert executors[0] is not None and all(executor is executors[0] for executor in executors)
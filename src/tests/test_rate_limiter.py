@@ -0,0 +1,81 @@
+import pytest
+import json
+import os
+import time
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from utils.rate_limiter import (
+    RateLimiter,
+    RateLimitedTransport,
+    estimate_request_tokens,
+    parse_retry_after,
+)
+
+
+class TestRateLimiter:
+    """Tests du limiteur de débit à seau de jetons"""
+
+    def test_no_wait_while_quota_available(self):
+        """Vérifie qu'aucune attente n'est imposée tant que le quota n'est pas épuisé"""
+        limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=10000)
+        start = time.monotonic()
+        for _ in range(10):
+            assert limiter.acquire(100) == 0.0
+        assert time.monotonic() - start < 0.1
+        assert limiter.stats()["requests"] == 10
+
+    def test_waits_when_requests_exhausted(self):
+        """Vérifie l'attente lorsque le nombre de requêtes par minute est atteint"""
+        # 600 requêtes/min : une requête toutes les 0,1 s une fois le seau vide
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=10**6)
+        for _ in range(600):
+            limiter.acquire(1)
+        waited = limiter.acquire(1)
+        assert 0.05 < waited < 0.5
+        assert limiter.stats()["waits"] == 1
+
+    def test_throttle_blocks_callers(self):
+        """Vérifie qu'un 429 suspend les requêtes suivantes pendant le Retry-After"""
+        limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=10**6)
+        limiter.throttle(0.2)
+        assert limiter.acquire(1) >= 0.15
+        assert limiter.stats()["throttled"] == 1
+
+    def test_parse_retry_after(self):
+        """Vérifie la lecture des en-têtes Retry-After"""
+        assert parse_retry_after({"retry-after-ms": "1500"}) == 1.5
+        assert parse_retry_after({"retry-after": "3"}) == 3.0
+        assert parse_retry_after({}) is None
+        assert parse_retry_after(None) is None
+
+    def test_estimate_request_tokens(self):
+        """Vérifie l'estimation des tokens d'une requête chat avec image"""
+        body = json.dumps({
+            "messages": [{"role": "user", "content": [
+                {"type": "text", "text": "x" * 400},
+                {"type": "image_url", "image_url": {"url": "data:image/png;base64,AAAA"}},
+            ]}],
+            "max_tokens": 50,
+        }).encode()
+        assert estimate_request_tokens(body) == 100 + 765 + 50
+        assert estimate_request_tokens(json.dumps({"input": ["abcd" * 10]}).encode()) == 10
+
+    def test_transport_replays_429(self):
+        """Vérifie que le transport rejoue la requête après un 429 en respectant Retry-After"""
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"retry-after-ms": "200"})
+            return httpx.Response(200, json={"ok": True})
+
+        limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=10**6)
+        client = httpx.Client(transport=RateLimitedTransport(limiter, transport=httpx.MockTransport(handler)))
+        response = client.post("https://example.test/chat", json={"messages": []})
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+        assert calls[1] - calls[0] >= 0.15
@@ -0,0 +1,90 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import TextNode
+from tenacity import wait_none
+from raptor.summary_module import ParallelSummaryModule
+from utils.summary_cache import SummaryCache
+
+
+class RecordingSynthesizer:
+    """Synthétiseur factice : résumé = textes joints, enregistre la concurrence et les échecs simulés"""
+
+    def __init__(self, failures: int = 0):
+        self.calls = 0
+        self.failures = failures
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def asynthesize(self, query, nodes):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("Erreur transitoire")
+        return " + ".join(node.node.get_content() for node in nodes)
+
+
+def make_clusters(count: int):
+    """Clusters de deux chunks, avec des métadonnées propres à chaque construction"""
+    return [
+        [TextNode(text=f"Article {i}.1", metadata={"last_modified_date": "2026-10-17"}),
+         TextNode(text=f"Article {i}.2")]
+        for i in range(count)
+    ]
+
+
+class TestParallelSummaryModule:
+    """Tests du résumé parallèle des clusters RAPTOR"""
+
+    def make_module(self, synthesizer, num_workers=3, cache=None):
+        module = ParallelSummaryModule(llm=MockLLM(), num_workers=num_workers, cache=cache)
+        module.response_synthesizer = synthesizer
+        return module
+
+    def test_bounded_concurrency_and_order(self):
+        """Vérifie que les clusters d'un niveau sont résumés en parallèle, dans la limite fixée, sans réordonner"""
+        synthesizer = RecordingSynthesizer()
+        module = self.make_module(synthesizer, num_workers=3)
+
+        summaries = asyncio.run(module.generate_summaries(make_clusters(8)))
+
+        assert summaries == [f"Article {i}.1 + Article {i}.2" for i in range(8)]
+        assert synthesizer.max_in_flight == 3
+        assert module.stats()["generated"] == 8
+
+    def test_cache_by_cluster_members(self, tmp_path):
+        """Vérifie la reprise des résumés d'une construction précédente, indépendamment des ids et de l'ordre des nodes"""
+        cache = SummaryCache(str(tmp_path / "summaries.sqlite"))
+        first = RecordingSynthesizer()
+        asyncio.run(self.make_module(first, cache=cache).generate_summaries(make_clusters(4)))
+        assert first.calls == 4
+
+        # Nouvelle construction : nouveaux ids de nodes, membres dans un autre ordre, un cluster inédit
+        clusters = [list(reversed(cluster)) for cluster in make_clusters(4)]
+        clusters.append([TextNode(text="Article 9.1")])
+        second = RecordingSynthesizer()
+        module = self.make_module(second, cache=cache)
+        summaries = asyncio.run(module.generate_summaries(clusters))
+
+        assert second.calls == 1
+        assert summaries[0] == "Article 0.1 + Article 0.2"
+        assert module.stats()["cached"] == 4
+
+    def test_retry_transient_error(self, monkeypatch):
+        """Vérifie qu'un échec transitoire est rejoué"""
+        monkeypatch.setattr(ParallelSummaryModule._summarize_cluster.retry, "wait", wait_none())
+        synthesizer = RecordingSynthesizer(failures=1)
+        module = self.make_module(synthesizer, num_workers=1)
+
+        summaries = asyncio.run(module.generate_summaries(make_clusters(1)))
+
+        assert summaries == ["Article 0.1 + Article 0.2"]
+        assert synthesizer.calls == 2
@@ -0,0 +1,109 @@
+import pytest
+import os
+import stat
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tesseract_ocr import parse_tsv, run_tesseract, run_tesseract_configs
+
+TSV_HEADER = "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext"
+
+
+def tsv_row(line: int, word: int, conf: float, text: str) -> str:
+    """Ligne TSV de niveau mot"""
+    return f"5\t1\t1\t1\t{line}\t{word}\t0\t0\t10\t10\t{conf}\t{text}"
+
+
+@pytest.fixture
+def fake_tesseract(tmp_path):
+    """
+    Exécutable imitant Tesseract : chaque mode répond après un délai différent
+    (psm 3 : rapide et de bonne qualité, psm 6 : lent, psm 7 : très lent)
+    """
+    script = tmp_path / "tesseract"
+    script.write_text(f"""#!{sys.executable}
+import sys, time
+psm = sys.argv[sys.argv.index("--psm") + 1]
+delays = {{"3": 0.1, "6": 1.0, "7": 5.0}}
+time.sleep(delays[psm])
+print({TSV_HEADER!r})
+words = 30 if psm == "3" else 5
+for i in range(words):
+    print(f"5\\t1\\t1\\t1\\t1\\t{{i}}\\t0\\t0\\t10\\t10\\t92\\tmot{{psm}}_{{i}}")
+""")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+class TestTesseractOCR:
+    """Tests de l'exécution parallèle de Tesseract"""
+
+    def test_parse_tsv(self):
+        """Vérifie la reconstruction du texte et des indicateurs de qualité"""
+        tsv = "\n".join([
+            TSV_HEADER,
+            "4\t1\t1\t1\t1\t0\t0\t0\t10\t10\t-1\t",
+            tsv_row(1, 1, 90, "Soldes"),
+            tsv_row(1, 2, 80, "-50%"),
+            tsv_row(2, 1, 70, "Conditions"),
+            tsv_row(2, 2, -1, ""),
+        ])
+        result = parse_tsv(tsv)
+        assert result["text"] == "Soldes -50%\nConditions"
+        assert result["words"] == 3
+        assert result["mean_conf"] == pytest.approx(80.0)
+
+    def test_early_exit_cancels_slow_configs(self, fake_tesseract):
+        """Vérifie que le premier résultat suffisant est retenu sans attendre les autres modes"""
+        start = time.monotonic()
+        result = run_tesseract_configs("image.png", tesseract_cmd=fake_tesseract, min_words=20, min_confidence=80)
+        assert result["psm"] == 3
+        assert time.monotonic() - start < 3
+
+    def test_configs_run_in_parallel(self, fake_tesseract):
+        """Vérifie que la durée totale est celle du mode le plus lent, pas leur somme"""
+        start = time.monotonic()
+        result = run_tesseract_configs("image.png", psms=(3, 6), tesseract_cmd=fake_tesseract, early_exit=False)
+        elapsed = time.monotonic() - start
+        assert result["psm"] == 3  # le plus de mots
+        assert elapsed < 1.0 + 0.1 + 0.5
+
+    def test_timeout_kills_slow_configs(self, fake_tesseract):
+        """Vérifie qu'un mode trop lent est arrêté au timeout et que les résultats déjà obtenus sont gardés"""
+        start = time.monotonic()
+        result = run_tesseract_configs(
+            "image.png", psms=(3, 7), tesseract_cmd=fake_tesseract, early_exit=False, timeout=1.0
+        )
+        assert result["psm"] == 3
+        assert time.monotonic() - start < 3
+
+
+@pytest.fixture
+def echo_tesseract(tmp_path):
+    """Exécutable imitant Tesseract : renvoie comme unique mot sa source et la taille lue sur stdin"""
+    script = tmp_path / "tesseract"
+    script.write_text(f"""#!{sys.executable}
+import sys
+source = sys.argv[1]
+size = len(sys.stdin.buffer.read()) if source == "stdin" else 0
+print({TSV_HEADER!r})
+print(f"5\\t1\\t1\\t1\\t1\\t1\\t0\\t0\\t10\\t10\\t90\\t{{source}}:{{size}}")
+""")
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(script)
+
+
+class TestTesseractInMemory:
+    """Tests du passage des images sans fichier temporaire ni shell"""
+
+    def test_bytes_sent_on_stdin(self, echo_tesseract):
+        """Vérifie que le contenu encodé est transmis sur l'entrée standard"""
+        result = run_tesseract(b"x" * 1234, psm=6, tesseract_cmd=echo_tesseract)
+        assert result["text"] == "stdin:1234"
+
+    def test_path_with_quotes_and_spaces(self, echo_tesseract):
+        """Vérifie qu'un chemin avec espaces et apostrophes est transmis intact"""
+        path = "tests_images/Mention-Jeux d'argent (V2).png"
+        result = run_tesseract_configs(path, psms=(3,), tesseract_cmd=echo_tesseract, early_exit=False)
+        assert result["text"] == f"{path}:0"
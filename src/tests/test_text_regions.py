@@ -0,0 +1,42 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from utils.text_regions import crop_for_ocr, detect_text_regions, sort_reading_order
+
+
+@pytest.fixture
+def advert():
+    """Visuel synthétique 1080x1080 : deux lignes d'accroche, une photo texturée et une mention légale"""
+    image = np.full((1080, 1080), 255, dtype=np.uint8)
+    noise = np.random.default_rng(0).integers(0, 255, (400, 400)).astype(np.uint8)
+    image[400:800, 600:1000] = cv2.GaussianBlur(noise, (15, 15), 5)
+    for i, line in enumerate(["SOLDES D'ETE", "JUSQU'A -50%"]):
+        cv2.putText(image, line, (40, 100 + i * 80), cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 3)
+    cv2.putText(image, "Voir conditions en magasin", (40, 1040), cv2.FONT_HERSHEY_SIMPLEX, 0.6, 0, 1)
+    return image
+
+
+class TestTextRegions:
+    """Tests de la détection des zones de texte"""
+
+    def test_detects_text_lines_only(self, advert):
+        """Vérifie que chaque ligne est trouvée, dans l'ordre de lecture, et que la photo est ignorée"""
+        boxes = detect_text_regions(advert)
+        assert len(boxes) == 3
+        assert [box[1] for box in boxes] == sorted(box[1] for box in boxes)
+        for x, y, w, h in boxes:
+            assert x + w < 600 or y + h < 400 or y > 800
+
+    def test_reading_order_groups_lines(self):
+        """Vérifie que les zones d'une même ligne sont triées de gauche à droite"""
+        boxes = [(500, 102, 80, 20), (20, 100, 80, 20), (20, 200, 80, 20)]
+        assert sort_reading_order(boxes) == [(20, 100, 80, 20), (500, 102, 80, 20), (20, 200, 80, 20)]
+
+    def test_small_crops_are_upscaled(self, advert):
+        """Vérifie l'agrandissement des petits textes avant l'OCR"""
+        crop = crop_for_ocr(advert, (40, 1020, 200, 16))
+        assert crop.shape == (32, 400)
@@ -0,0 +1,73 @@
+import pytest
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+import numpy as np
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters, VectorStoreQuery
+from raptor.init_db import UniqueIDVectorStore
+
+
+def make_store(name: str, **kwargs) -> UniqueIDVectorStore:
+    collection = chromadb.EphemeralClient().get_or_create_collection(name)
+    return UniqueIDVectorStore(chroma_collection=collection, **kwargs)
+
+
+class TestUniqueIDVectorStore:
+    """Tests de l'écriture en masse à identifiants stables"""
+
+    def test_reingestion_is_idempotent(self):
+        """Vérifie qu'une nouvelle ingestion des mêmes chunks remplace au lieu de dupliquer"""
+        store = make_store("test_idempotent", write_batch_size=2)
+        texts = [f"Article L. 3323-{i}" for i in range(5)]
+        embeddings = np.eye(5, dtype=np.float32)
+
+        first = store.add([TextNode(text=text) for text in texts], embeddings=embeddings)
+        # Nouveaux objets (nouveaux UUID), même contenu : mêmes identifiants
+        second = store.add([TextNode(text=text) for text in texts], embeddings=embeddings)
+
+        assert first == second
+        assert store._collection.count() == 5
+        assert store.stats()["writes"] == 6
+
+    def test_node_embeddings_and_duplicates(self):
+        """Vérifie l'écriture des embeddings portés par les nodes et l'élimination des doublons"""
+        store = make_store("test_duplicates")
+        chunk = TextNode(text="Jeux d'argent", embedding=[1.0, 0.0])
+        other = TextNode(text="Crédit", embedding=[0.0, 1.0])
+
+        ids = store.add([chunk, other, chunk])
+
+        assert ids[0] == ids[2]
+        assert store._collection.count() == 2
+        with pytest.raises(ValueError):
+            store.add([chunk], embeddings=np.zeros((2, 2)))
+
+    def test_parent_links_follow_stable_ids(self):
+        """Vérifie que les enfants d'un résumé le retrouvent par son identifiant stable"""
+        store = make_store("test_parents")
+        summary = TextNode(text="Résumé", metadata={"level": 0}, embedding=[1.0, 1.0])
+        children = [
+            TextNode(text=f"Chunk {i}", metadata={"parent_id": summary.node_id}, embedding=[1.0, float(i)])
+            for i in range(3)
+        ]
+
+        # Ordre de RAPTOR : les enfants sont écrits avant leur résumé
+        store.add(children)
+        (summary_id,) = store.add([summary])
+
+        assert summary_id != summary.node_id
+        result = store.query(VectorStoreQuery(
+            query_embedding=[1.0, 1.0],
+            similarity_top_k=5,
+            filters=MetadataFilters(filters=[MetadataFilter(key="parent_id", value=summary_id)]),
+        ))
+        assert len(result.ids) == 3
+        top = store.query(VectorStoreQuery(
+            query_embedding=[1.0, 1.0],
+            similarity_top_k=1,
+            filters=MetadataFilters(filters=[MetadataFilter(key="level", value=0)]),
+        ))
+        assert top.nodes[0].node_id == summary_id
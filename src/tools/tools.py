@@ -1,7 +1,6 @@
 import base64
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from llama_index.llms.azure_openai import AzureOpenAI
-from llama_index.core.schema import Document, MediaResource
 from llama_index.core.llms import ChatMessage, ImageBlock, TextBlock, MessageRole
 from llama_index.core.tools import BaseTool, FunctionTool
 from prompts.prompts import description_prompt, legal_prompt, clarifications_prompt, consistency_prompt, raw_text_extraction_prompt
@@ -9,21 +8,37 @@ from raptor.raptor_setup import RaptorSetup
 from datetime import datetime
 from utils.output_saver import OutputSaver
 from utils.text_extractor import TextExtractor
+from utils.llm_cache import LLMResponseCache
+from utils.ocr_cache import OCRResultCache
+from utils.image_budget import VISION_BUDGETS, fit_image_to_budget
 import os
 from pathlib import Path
 
 class Tools:
     """Collection des outils disponibles pour l'analyse de publicité"""
-    def __init__(self, llm: AzureOpenAI, raptor: RaptorSetup):
+    def __init__(
+        self,
+        llm: AzureOpenAI,
+        raptor: RaptorSetup,
+        llm_cache: Optional[LLMResponseCache] = None,
+        ocr_cache: Optional[OCRResultCache] = None,
+    ):
         self.llm = llm
         self.raptor = raptor
+        self.llm_cache = llm_cache
+        self.ocr_cache = ocr_cache
         self._tools = self._create_tools()
         self.vision_result = None
         self.legislation = None
         self.raw_text = None
         self.output_saver = OutputSaver()
-        self.text_extractor = TextExtractor()
+        self.text_extractor = TextExtractor(ocr_cache=ocr_cache)
         self.extracted_text = None
+        self.text_layer = None
+        self._source_images = {}
+        self._vision_images = {}
+        self._last_image_path = None
+        self.image_budget_stats = []
     
     def _create_tools(self) -> list[BaseTool]:
         """Crée la liste des outils disponibles pour l'agent"""
@@ -70,6 +85,71 @@ class Tools:
         """Retourne la liste des outils disponibles"""
         return self._tools
 
+    def reset_document_state(self) -> None:
+        """
+        Réinitialise l'état propre au document analysé, afin de réutiliser
+        la même instance (et le même agent) pour le fichier suivant d'un lot
+        """
+        self.vision_result = None
+        self.legislation = None
+        self.raw_text = None
+        self.extracted_text = None
+        self.text_layer = None
+        self._source_images = {}
+        self._vision_images = {}
+        self._last_image_path = None
+        self.image_budget_stats = []
+        self._clarifications_history = set()
+        self.output_saver.reset_analysis()
+
+    def _chat(self, msg: ChatMessage) -> str:
+        """Appel chat du LLM, servi depuis le cache si la même requête (texte + images) a déjà été faite"""
+        if self.llm_cache is None:
+            return str(self.llm.chat(messages=[msg]))
+        key = self.llm_cache.build_message_key(self.llm, msg)
+        cached = self.llm_cache.get_response(key)
+        if cached is not None:
+            return cached
+        result = str(self.llm.chat(messages=[msg]))
+        self.llm_cache.set_response(key, result)
+        return result
+
+    async def _achat(self, msg: ChatMessage) -> str:
+        """Version asynchrone de _chat"""
+        if self.llm_cache is None:
+            return str(await self.llm.achat(messages=[msg]))
+        key = self.llm_cache.build_message_key(self.llm, msg)
+        cached = self.llm_cache.get_response(key)
+        if cached is not None:
+            return cached
+        result = str(await self.llm.achat(messages=[msg]))
+        self.llm_cache.set_response(key, result)
+        return result
+
+    def _complete(self, prompt: str) -> str:
+        """Appel complete du LLM, servi depuis le cache si le même prompt a déjà été envoyé"""
+        if self.llm_cache is None:
+            return str(self.llm.complete(prompt))
+        key = self.llm_cache.build_key(self.llm, prompt)
+        cached = self.llm_cache.get_response(key)
+        if cached is not None:
+            return cached
+        result = str(self.llm.complete(prompt))
+        self.llm_cache.set_response(key, result)
+        return result
+
+    async def _acomplete(self, prompt: str) -> str:
+        """Version asynchrone de _complete"""
+        if self.llm_cache is None:
+            return str(await self.llm.acomplete(prompt))
+        key = self.llm_cache.build_key(self.llm, prompt)
+        cached = self.llm_cache.get_response(key)
+        if cached is not None:
+            return cached
+        result = str(await self.llm.acomplete(prompt))
+        self.llm_cache.set_response(key, result)
+        return result
+
     def analyze_vision(self, image_path: str) -> str:
         """
         Analyse une image publicitaire avec GPT-4V
@@ -84,11 +164,7 @@ class Tools:
         if not self.output_saver.is_analysis_in_progress():
             self.output_saver.start_new_analysis(image_path)
         
-        with open(image_path, "rb") as image_file:
-            img_data = base64.b64encode(image_file.read())
-        
-        self._last_image_data = img_data  # Garder l'image en mémoire
-        image_document = Document(image_resource=MediaResource(data=img_data))
+        self._last_image_path = image_path  # Image reprise par la cohérence et les clarifications
         
         # Préparer un prompt qui inclut le texte brut déjà extrait
         enhanced_prompt = description_prompt
@@ -106,12 +182,11 @@ TEXTE BRUT DÉJÀ EXTRAIT:
             role=MessageRole.USER,
             blocks=[
                 TextBlock(text=enhanced_prompt),
-                ImageBlock(image=image_document.image_resource.data),
+                self._vision_image_block(image_path, "layout"),
             ],
         )
 
-        response = self.llm.chat(messages=[msg])
-        result = str(response)
+        result = self._chat(msg)
         
         # Supprimer le préfixe "assistant:" s'il est présent
         if result.startswith("assistant:"):
@@ -135,6 +210,30 @@ TEXTE BRUT DÉJÀ EXTRAIT:
         """
         print("\n🔍 Vérification de la cohérence des informations...")
         
+        msg = self._build_consistency_message(vision_result)
+        response = self._chat(msg)
+        
+        return self._save_consistency_result(response)
+
+    async def averify_consistency(self, vision_result: str) -> str:
+        """
+        Version asynchrone de verify_consistency (appel LLM via achat)
+        
+        Args:
+            vision_result: Résultat de l'analyse visuelle
+            
+        Returns:
+            str: Rapport de vérification de cohérence
+        """
+        print("\n🔍 Vérification de la cohérence des informations (async)...")
+        
+        msg = self._build_consistency_message(vision_result)
+        response = await self._achat(msg)
+        
+        return self._save_consistency_result(response)
+
+    def _build_consistency_message(self, vision_result: str) -> ChatMessage:
+        """Construit le message multimodal de vérification de cohérence"""
         if not self.vision_result:
             raise ValueError("L'analyse visuelle doit être effectuée d'abord")
         
@@ -157,17 +256,16 @@ TEXTE BRUT DÉJÀ EXTRAIT:
 
 {consistency_prompt.format(vision_result=vision_result, current_date=current_date)}"""
         
-        msg = ChatMessage(
+        return ChatMessage(
             role=MessageRole.USER,
             blocks=[
                 TextBlock(text=enhanced_prompt),
-                ImageBlock(image=self._last_image_data),
+                self._vision_image_block(self._last_image_path, "verification"),
             ],
         )
-        
-        response = self.llm.chat(messages=[msg])
-        result = str(response)
-        
+
+    def _save_consistency_result(self, result: str) -> str:
+        """Nettoie et sauvegarde le rapport de cohérence"""
         # Supprimer le préfixe "assistant:" s'il est présent
         if result.startswith("assistant:"):
             result = result[len("assistant:"):].strip()
@@ -188,6 +286,29 @@ TEXTE BRUT DÉJÀ EXTRAIT:
         """
         print("\n📅 Vérification de la cohérence des dates...")
         
+        # Utiliser le LLM pour analyser les dates
+        response = self._complete(self._build_dates_prompt(vision_result))
+        
+        return self._save_dates_result(response)
+
+    async def averify_dates(self, vision_result: str = None) -> str:
+        """
+        Version asynchrone de verify_dates (appel LLM via acomplete)
+        
+        Args:
+            vision_result: Résultat de l'analyse visuelle (optionnel)
+            
+        Returns:
+            str: Rapport de vérification des dates
+        """
+        print("\n📅 Vérification de la cohérence des dates (async)...")
+        
+        response = await self._acomplete(self._build_dates_prompt(vision_result))
+        
+        return self._save_dates_result(response)
+
+    def _build_dates_prompt(self, vision_result: str = None) -> str:
+        """Construit le prompt de vérification des dates"""
         if not vision_result and not self.vision_result:
             raise ValueError("L'analyse visuelle doit être effectuée d'abord")
             
@@ -237,10 +358,10 @@ RECOMMANDATIONS :
 VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉRENT]
 """
         
-        # Utiliser le LLM pour analyser les dates
-        response = self.llm.complete(prompt)
-        result = str(response)
-        
+        return prompt
+
+    def _save_dates_result(self, result: str) -> str:
+        """Nettoie et sauvegarde le rapport de vérification des dates"""
         # Supprimer le préfixe "assistant:" s'il est présent
         if result.startswith("assistant:"):
             result = result[len("assistant:"):].strip()
@@ -266,6 +387,7 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
         print("\n🔍 Recherche de législation...")
         print(f"Vision result utilisé pour la recherche: {vision_result[:200]}...")
         
+        raw_legislation = None
         try:
             # Rechercher dans la base de connaissances
             raw_legislation = self.raptor.search(vision_result)
@@ -275,16 +397,41 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
             self.legislation = raw_legislation
             
             # Utiliser le query engine pour synthétiser la réponse
-            query = f"""Analyser et synthétiser la législation suivante dans le contexte de cette publicité :
+            synthesis = self.raptor.query(self._build_legislation_query(vision_result, raw_legislation))
+            print(f"\nSynthèse de la législation: {synthesis[:200]}...")
             
-            CONTEXTE PUBLICITAIRE :
-            {vision_result}
+            self.output_saver.save_legislation(synthesis)
             
-            LÉGISLATION TROUVÉE :
-            {raw_legislation}
-            """
+            return synthesis
             
-            synthesis = self.raptor.query(query)
+        except Exception as e:
+            print(f"\n❌ Erreur lors de la recherche de législation: {str(e)}")
+            # En cas d'erreur, utiliser la législation brute si disponible
+            if raw_legislation:
+                return raw_legislation
+            raise
+
+    async def asearch_legislation(self, vision_result: str) -> str:
+        """
+        Version asynchrone de search_legislation (recherche et synthèse non bloquantes)
+        Args:
+            vision_result: Résultat de l'analyse visuelle
+        Returns:
+            str: Législation applicable
+        """
+        print("\n🔍 Recherche de législation (async)...")
+        
+        raw_legislation = None
+        try:
+            # Rechercher dans la base de connaissances
+            raw_legislation = await self.raptor.asearch(vision_result)
+            print(f"\nLégislation brute trouvée: {raw_legislation[:200]}...")
+            
+            # Stocker la législation brute
+            self.legislation = raw_legislation
+            
+            # Utiliser le query engine pour synthétiser la réponse
+            synthesis = await self.raptor.aquery(self._build_legislation_query(vision_result, raw_legislation))
             print(f"\nSynthèse de la législation: {synthesis[:200]}...")
             
             self.output_saver.save_legislation(synthesis)
@@ -298,6 +445,17 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
                 return raw_legislation
             raise
 
+    def _build_legislation_query(self, vision_result: str, raw_legislation: str) -> str:
+        """Construit la requête de synthèse de la législation trouvée"""
+        return f"""Analyser et synthétiser la législation suivante dans le contexte de cette publicité :
+            
+            CONTEXTE PUBLICITAIRE :
+            {vision_result}
+            
+            LÉGISLATION TROUVÉE :
+            {raw_legislation}
+            """
+
     def get_clarifications(self, questions_text: str) -> str:
         """
         Obtient des clarifications spécifiques en analysant l'image
@@ -328,13 +486,12 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
             role=MessageRole.USER,
             blocks=[
                 TextBlock(text=clarifications_prompt.format(questions_text=questions_text)),
-                ImageBlock(image=self._last_image_data),
+                self._vision_image_block(self._last_image_path, "verification"),
             ],
         )
         
         print("\nEnvoi de l'image et des questions au LLM...")
-        response = self.llm.chat(messages=[msg])
-        result = str(response)
+        result = self._chat(msg)
         
         # Supprimer le préfixe "assistant:" s'il est présent
         if result.startswith("assistant:"):
@@ -354,8 +511,7 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
             raise ValueError("Toutes les étapes précédentes doivent être complétées")
             
         prompt = legal_prompt.format(description=self.vision_result)
-        response = self.llm.complete(prompt)
-        result = str(response)
+        result = self._complete(prompt)
         
         # Supprimer le préfixe "assistant:" s'il est présent
         if result.startswith("assistant:"):
@@ -435,30 +591,22 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
         print(f"\n🔍 Extraction de texte brut avec GPT Vision: {image_path}")
         
         # Vérifier que l'image existe
-        if not os.path.exists(image_path):
+        if not self._has_image(image_path):
             print(f"❌ Image non trouvée: {image_path}")
             return ""
         
-        # Charger l'image en base64
-        with open(image_path, "rb") as image_file:
-            img_data = base64.b64encode(image_file.read())
-        
-        # Créer le document d'image
-        image_document = Document(image_resource=MediaResource(data=img_data))
-        
         # Créer un message multimodal avec l'image et la demande d'extraction de texte brut
         msg = ChatMessage(
             role=MessageRole.USER,
             blocks=[
                 TextBlock(text=raw_text_extraction_prompt),
-                ImageBlock(image=image_document.image_resource.data),
+                self._vision_image_block(image_path, "raw_text"),
             ],
         )
         
         # Envoyer la demande à GPT Vision
         try:
-            response = self.llm.chat(messages=[msg])
-            extracted_text = str(response)
+            extracted_text = self._chat(msg)
             
             # Supprimer le préfixe "assistant:" s'il est présent
             if extracted_text.startswith("assistant:"):
@@ -481,6 +629,87 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
             print(f"❌ Erreur lors de l'extraction de texte avec GPT Vision: {str(e)}")
             return f"ERREUR: {str(e)}"
 
+    def set_source_image(self, path: str, image_bytes: bytes) -> None:
+        """
+        Associe à un fichier (ex: PDF) son rendu en mémoire : les outils l'utilisent
+        à la place du fichier, sans image intermédiaire sur disque
+        
+        Args:
+            path: Chemin du fichier analysé (tel que transmis aux outils)
+            image_bytes: Image encodée (PNG, JPEG)
+        """
+        self._source_images[os.path.abspath(path)] = image_bytes
+
+    def _has_image(self, image_path: str) -> bool:
+        """Indique si l'image est disponible (rendu en mémoire ou fichier)"""
+        return os.path.abspath(image_path) in self._source_images or os.path.exists(image_path)
+
+    def _read_image_bytes(self, image_path: str) -> bytes:
+        """
+        Charge l'image depuis le rendu en mémoire s'il existe, sinon depuis le fichier
+        
+        Args:
+            image_path: Chemin de l'image ou du fichier rendu en mémoire
+            
+        Returns:
+            bytes: Image encodée
+        """
+        image_bytes = self._source_images.get(os.path.abspath(image_path))
+        if image_bytes is None:
+            with open(image_path, "rb") as image_file:
+                image_bytes = image_file.read()
+        return image_bytes
+
+    def _vision_image_block(self, image_path: str, call_type: str) -> ImageBlock:
+        """
+        Prépare l'image d'un appel vision selon le budget de son type (taille, format, détail)
+        et comptabilise les tokens économisés par rapport à l'image pleine résolution
+        
+        Args:
+            image_path: Chemin de l'image ou du fichier rendu en mémoire
+            call_type: Type d'appel ("raw_text", "verification" ou "layout", voir VISION_BUDGETS)
+            
+        Returns:
+            ImageBlock: Bloc image du message multimodal
+        """
+        key = (os.path.abspath(image_path), call_type)
+        if key not in self._vision_images:
+            image_bytes, info = fit_image_to_budget(self._read_image_bytes(image_path), VISION_BUDGETS[call_type])
+            self._vision_images[key] = (base64.b64encode(image_bytes), info)
+        image_data, info = self._vision_images[key]
+        self.image_budget_stats.append({"call": call_type, **info})
+        return ImageBlock(image=image_data, image_mimetype=info["mime_type"], detail=info["detail"])
+
+    def image_budget_report(self) -> Dict[str, int]:
+        """
+        Bilan des images envoyées pour le document en cours
+        
+        Returns:
+            Dict[str, int]: Nombre d'appels vision, tokens et octets (pleine résolution / envoyés)
+                            et tokens économisés
+        """
+        stats = self.image_budget_stats
+        tokens_full = sum(call["tokens_full"] for call in stats)
+        tokens_sent = sum(call["tokens_sent"] for call in stats)
+        return {
+            "calls": len(stats),
+            "tokens_full": tokens_full,
+            "tokens_sent": tokens_sent,
+            "tokens_saved": tokens_full - tokens_sent,
+            "bytes_full": sum(call["bytes_full"] for call in stats),
+            "bytes_sent": sum(call["bytes_sent"] for call in stats),
+        }
+
+    def set_text_layer(self, layer: Optional[Dict[str, Any]]) -> None:
+        """
+        Fournit la couche texte du PDF d'origine : l'extraction du texte brut la reprend
+        telle quelle au lieu d'interroger GPT Vision
+        
+        Args:
+            layer: Résultat de extract_text_layer (None : extraction par vision)
+        """
+        self.text_layer = layer
+
     def extract_raw_text_for_agent(self, image_path: str) -> str:
         """
         Extrait le texte brut d'une image publicitaire pour l'agent ReACT
@@ -495,7 +724,7 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
         
         try:
             # Vérifier que l'image existe
-            if not os.path.exists(image_path):
+            if not self._has_image(image_path):
                 error_msg = f"❌ Image non trouvée: {image_path}"
                 print(error_msg)
                 return error_msg
@@ -503,8 +732,13 @@ VERDICT DE COHÉRENCE TEMPORELLE : [COHÉRENT/NON COHÉRENT/PARTIELLEMENT COHÉR
             # Initialiser une nouvelle analyse - Important: doit être fait AVANT d'essayer de sauvegarder des résultats
             self.output_saver.start_new_analysis(image_path)
             
-            # Utiliser GPT Vision pour l'extraction
-            result = self.extract_raw_text_with_vision(image_path)
+            if self.text_layer is not None:
+                # PDF avec couche texte : texte exact et positions déjà disponibles, aucun appel vision
+                result = self.text_layer["text"]
+                print(f"📄 Texte brut lu dans la couche texte du PDF ({len(self.text_layer['blocks'])} blocs), appel GPT Vision évité")
+            else:
+                # Utiliser GPT Vision pour l'extraction
+                result = self.extract_raw_text_with_vision(image_path)
             
             # Vérifier que le résultat n'est pas vide
             if not result or len(result.strip()) < 10:
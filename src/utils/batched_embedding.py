@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Tuple
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.callbacks import CBEventType, EventPayload
+from pydantic import Field, PrivateAttr
+
+# Limites d'une requête d'embedding Azure OpenAI : 2048 textes et ~300 000 tokens au total
+MAX_BATCH_SIZE = 2048
+MAX_BATCH_TOKENS = 300_000
+
+def estimate_text_tokens(text: str) -> int:
+    """Estimation du nombre de tokens d'un texte (~4 caractères par token, comme le limiteur)"""
+    return max(1, len(text) // 4)
+
+def pack_batches(texts: List[str], max_batch_size: int, max_batch_tokens: int) -> List[Tuple[int, int]]:
+    """
+    Regroupe des textes consécutifs en lots bornés en nombre de textes et en tokens
+
+    Args:
+        texts: Textes à vectoriser
+        max_batch_size: Nombre maximal de textes par lot
+        max_batch_tokens: Nombre maximal de tokens (estimés) par lot
+
+    Returns:
+        List[Tuple[int, int]]: Bornes (début, fin) de chaque lot, dans l'ordre des textes
+    """
+    batches = []
+    start, batch_tokens = 0, 0
+    for i, text in enumerate(texts):
+        tokens = estimate_text_tokens(text)
+        if i > start and (i - start >= max_batch_size or batch_tokens + tokens > max_batch_tokens):
+            batches.append((start, i))
+            start, batch_tokens = i, 0
+        batch_tokens += tokens
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+class BatchedEmbedding(BaseEmbedding):
+    """
+    Modèle d'embedding pour la construction de l'index : les textes sont regroupés en
+    grands lots (bornés en nombre et en tokens) et plusieurs lots sont envoyés
+    simultanément. Le débit en tokens/minute reste régulé par le limiteur du client
+    HTTP du modèle encapsulé (voir AIModels), qui rejoue aussi les réponses 429.
+    """
+
+    max_batch_tokens: int = Field(default=100_000, description="Nombre maximal de tokens par lot")
+    max_concurrency: int = Field(default=4, description="Nombre maximal de lots envoyés simultanément")
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _stats: Dict[str, float] = PrivateAttr(default_factory=lambda: {"texts": 0, "batches": 0, "seconds": 0.0})
+
+    def __init__(
+        self,
+        embed_model: BaseEmbedding,
+        max_batch_size: int = 256,
+        max_batch_tokens: int = 100_000,
+        max_concurrency: int = 4,
+        **kwargs: Any,
+    ):
+        """
+        Args:
+            embed_model: Modèle d'embedding réel
+            max_batch_size: Nombre maximal de textes par requête
+            max_batch_tokens: Nombre maximal de tokens (estimés) par requête
+            max_concurrency: Nombre maximal de requêtes simultanées
+        """
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=min(max_batch_size, MAX_BATCH_SIZE),
+            callback_manager=embed_model.callback_manager,
+            max_batch_tokens=min(max_batch_tokens, MAX_BATCH_TOKENS),
+            max_concurrency=max(1, max_concurrency),
+            **kwargs,
+        )
+        self._embed_model = embed_model
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "BatchedEmbedding"
+
+    def _record(self, texts: int, batches: int, elapsed: float) -> None:
+        """Comptabilise un appel et affiche son débit"""
+        self._stats["texts"] += texts
+        self._stats["batches"] += batches
+        self._stats["seconds"] += elapsed
+        print(f"🧮 {texts} texte(s) vectorisé(s) en {batches} lot(s), {elapsed:.1f}s "
+              f"({texts / elapsed if elapsed > 0 else 0:.1f} chunks/s)")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Statistiques cumulées
+
+        Returns:
+            Dict: Textes vectorisés, lots envoyés, durée totale et débit (chunks/s)
+        """
+        stats = dict(self._stats)
+        stats["chunks_per_second"] = stats["texts"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return stats
+
+    def get_text_embedding_batch(self, texts: List[str], show_progress: bool = False, **kwargs: Any) -> List[Embedding]:
+        """Embeddings d'une liste de textes, lot par lot (chemin synchrone)"""
+        if not texts:
+            return []
+        start = time.perf_counter()
+        batches = pack_batches(texts, self.embed_batch_size, self.max_batch_tokens)
+        embeddings = []
+        for batch_start, batch_end in batches:
+            batch = texts[batch_start:batch_end]
+            # Un événement EMBEDDING par lot, comme BaseEmbedding (comptage des tokens)
+            with self.callback_manager.event(
+                CBEventType.EMBEDDING, payload={EventPayload.SERIALIZED: self.to_dict()}
+            ) as event:
+                batch_embeddings = self._embed_model._get_text_embeddings(batch)
+                event.on_end(payload={EventPayload.CHUNKS: batch, EventPayload.EMBEDDINGS: batch_embeddings})
+            embeddings.extend(batch_embeddings)
+        self._record(len(texts), len(batches), time.perf_counter() - start)
+        return embeddings
+
+    async def aget_text_embedding_batch(self, texts: List[str], show_progress: bool = False) -> List[Embedding]:
+        """Embeddings d'une liste de textes, plusieurs lots en parallèle (ordre des textes conservé)"""
+        if not texts:
+            return []
+        start = time.perf_counter()
+        batches = pack_batches(texts, self.embed_batch_size, self.max_batch_tokens)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_batch(batch_start: int, batch_end: int) -> List[Embedding]:
+            batch = texts[batch_start:batch_end]
+            async with semaphore:
+                event_id = self.callback_manager.on_event_start(
+                    CBEventType.EMBEDDING, payload={EventPayload.SERIALIZED: self.to_dict()}
+                )
+                embeddings = await self._embed_model._aget_text_embeddings(batch)
+                self.callback_manager.on_event_end(
+                    CBEventType.EMBEDDING,
+                    payload={EventPayload.CHUNKS: batch, EventPayload.EMBEDDINGS: embeddings},
+                    event_id=event_id,
+                )
+                return embeddings
+
+        results = await asyncio.gather(*(embed_batch(batch_start, batch_end) for batch_start, batch_end in batches))
+        self._record(len(texts), len(batches), time.perf_counter() - start)
+        return [embedding for batch in results for embedding in batch]
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed_model._get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await self._embed_model._aget_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._embed_model._get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await self._embed_model._aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._embed_model._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self._embed_model._aget_text_embeddings(texts)
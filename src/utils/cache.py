@@ -0,0 +1,172 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Attente maximale d'un verrou d'écriture SQLite (cache partagé entre processus)
+BUSY_TIMEOUT_S = 30.0
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Calcule l'empreinte SHA-256 d'un contenu binaire
+
+    Args:
+        data: Contenu à hacher
+
+    Returns:
+        str: Empreinte hexadécimale
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Construit une clé de cache stable à partir de plusieurs composants
+
+    Args:
+        parts: Composants sérialisables en JSON (textes, nombres, empreintes...)
+
+    Returns:
+        str: Clé SHA-256 des composants
+    """
+    serialized = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hash_bytes(serialized.encode("utf-8"))
+
+class PersistentLRUCache:
+    """
+    Cache clé/valeur persistant sur disque (SQLite) avec éviction LRU bornée en taille.
+    Utilisable depuis plusieurs threads, il tient à jour ses compteurs de succès/échecs.
+    """
+
+    def __init__(self, db_path: str, max_size_mb: float = 256, name: str = "cache"):
+        """
+        Initialise le cache
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            max_size_mb: Taille maximale des valeurs stockées (en Mo) avant éviction
+            name: Nom du cache (pour les logs)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT_S, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries(last_access)")
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Récupère une valeur et met à jour sa date de dernier accès
+
+        Args:
+            key: Clé recherchée
+
+        Returns:
+            Optional[bytes]: Valeur stockée, ou None si absente
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            # Date d'accès indicative : une base verrouillée ne doit pas faire échouer la lecture
+            try:
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                self._conn.rollback()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Enregistre une valeur puis évince les entrées les moins récemment utilisées si nécessaire
+
+        Args:
+            key: Clé de l'entrée
+            value: Valeur binaire à stocker
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(value), len(value), now, now),
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error:
+                # Ne pas laisser la connexion partagée dans une transaction inachevée
+                self._conn.rollback()
+                raise
+
+    def get_json(self, key: str) -> Optional[Any]:
+        """Récupère une valeur sérialisée en JSON"""
+        value = self.get(key)
+        return json.loads(value.decode("utf-8")) if value is not None else None
+
+    def set_json(self, key: str, value: Any) -> None:
+        """Enregistre une valeur sérialisable en JSON"""
+        self.set(key, json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+    def _evict(self) -> None:
+        """Supprime les entrées les plus anciennes tant que la taille maximale est dépassée (verrou déjà pris)"""
+        total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+
+        # Descendre sous 90 % de la limite pour ne pas évincer à chaque écriture
+        target = int(self.max_size_bytes * 0.9)
+        evicted = 0
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access ASC").fetchall():
+            if total_size <= target:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total_size -= size
+            evicted += 1
+
+        print(f"🧹 Cache {self.name} : {evicted} entrée(s) évincée(s)")
+
+    def clear(self) -> None:
+        """Vide entièrement le cache"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistiques d'utilisation du cache
+
+        Returns:
+            Dict: Succès, échecs, taux de succès, nombre d'entrées et taille occupée
+        """
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_mb": size / (1024 * 1024),
+            "max_size_mb": self.max_size_bytes / (1024 * 1024),
+        }
+
+    def close(self) -> None:
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            self._conn.close()
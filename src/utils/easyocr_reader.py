@@ -0,0 +1,195 @@
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from utils.image_preprocessing import ImageSource, preprocess_image
+
+logger = logging.getLogger("EasyOCRReader")
+
+DEFAULT_LANGS = ("fr", "en")
+
+# Readers déjà chargés dans ce processus, par (langues, gpu)
+_readers: Dict[Tuple[Tuple[str, ...], bool], Any] = {}
+_readers_lock = threading.Lock()
+
+def default_gpu() -> bool:
+    """Mode GPU par défaut : CPU sauf si EASYOCR_GPU=1"""
+    return os.getenv("EASYOCR_GPU", "0") == "1"
+
+def get_reader(langs: Optional[Sequence[str]] = None, gpu: Optional[bool] = None) -> Any:
+    """
+    Retourne le Reader EasyOCR du processus pour ces langues, construit au premier appel
+    puis réutilisé (les modèles de détection et de reconnaissance restent chargés)
+
+    Args:
+        langs: Langues (ex: ["fr", "en"])
+        gpu: Utiliser le GPU (par défaut : variable EASYOCR_GPU, sinon CPU)
+
+    Returns:
+        easyocr.Reader: Reader prêt à l'emploi
+    """
+    import easyocr
+
+    key = (tuple(langs or DEFAULT_LANGS), default_gpu() if gpu is None else gpu)
+    with _readers_lock:
+        reader = _readers.get(key)
+        if reader is None:
+            logger.info(f"Chargement du Reader EasyOCR {key[0]} ({'GPU' if key[1] else 'CPU'})")
+            # La quantification n'accélère que l'inférence CPU
+            reader = easyocr.Reader(list(key[0]), gpu=key[1], quantize=not key[1], verbose=False)
+            _readers[key] = reader
+        return reader
+
+def prepare_image(image: ImageSource) -> np.ndarray:
+    """
+    Applique le prétraitement OCR partagé, en mémoire (EasyOCR accepte les tableaux NumPy)
+
+    Args:
+        image: Chemin, contenu encodé ou image déjà décodée
+
+    Returns:
+        np.ndarray: Image en niveaux de gris prétraitée
+    """
+    return preprocess_image(image)
+
+def recognize_result(
+    image: Union[str, np.ndarray], langs: Optional[Sequence[str]] = None, gpu: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    Lit le texte avec deux configurations (paragraphes, puis texte dense) et garde la plus longue
+
+    Args:
+        image: Chemin ou image (niveaux de gris ou RGB)
+        langs: Langues
+        gpu: Utiliser le GPU
+
+    Returns:
+        Dict: {"text", "mean_conf", "regions": [{"box": (x, y, largeur, hauteur), "text", "conf"}]}
+              (le mode paragraphe ne fournit pas de confiance : "conf" et "mean_conf" valent alors None)
+    """
+    reader = get_reader(langs, gpu)
+    configs = [
+        # Config 1: Standard
+        {"paragraph": True, "width_ths": 0.7, "height_ths": 0.7},
+        # Config 2: Optimisée pour le texte dense
+        {"paragraph": False, "width_ths": 0.5, "height_ths": 0.5},
+    ]
+
+    results = []
+    for config in configs:
+        try:
+            lines = reader.readtext(image, detail=1, **config)
+        except Exception as e:
+            logger.warning(f"Erreur lors de l'extraction EasyOCR ({config}): {str(e)}")
+            continue
+        if not lines:
+            continue
+
+        regions = []
+        for line in lines:
+            points, text = line[0], line[1]
+            xs = [int(point[0]) for point in points]
+            ys = [int(point[1]) for point in points]
+            regions.append({
+                "box": (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)),
+                "text": text,
+                "conf": float(line[2]) * 100 if len(line) > 2 else None,
+            })
+        confidences = [region["conf"] for region in regions if region["conf"] is not None]
+        results.append({
+            "text": "\n".join(region["text"] for region in regions),
+            "mean_conf": float(np.mean(confidences)) if confidences else None,
+            "regions": regions,
+        })
+
+    if not results:
+        return {"text": "", "mean_conf": None, "regions": []}
+    return max(results, key=lambda result: len(result["text"]))
+
+def recognize(image: Union[str, np.ndarray], langs: Optional[Sequence[str]] = None, gpu: Optional[bool] = None) -> str:
+    """
+    Lit le texte d'une image (voir recognize_result)
+
+    Args:
+        image: Chemin ou image (niveaux de gris ou RGB)
+        langs: Langues
+        gpu: Utiliser le GPU
+
+    Returns:
+        str: Texte extrait
+    """
+    return recognize_result(image, langs, gpu)["text"]
+
+def _init_worker(langs: Tuple[str, ...], gpu: bool, threads: int) -> None:
+    """Initialise un processus du pool : threads limités et Reader chargé d'avance"""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    get_reader(langs, gpu)
+
+def _recognize_file(image_path: str, langs: Tuple[str, ...], gpu: bool) -> Dict[str, Any]:
+    """Tâche exécutée dans un processus du pool"""
+    return recognize_result(prepare_image(image_path), langs, gpu)
+
+class EasyOCRPool:
+    """
+    Pool de processus possédant chacun un Reader EasyOCR chaud, pour reconnaître
+    plusieurs images simultanément sur les cœurs CPU lors des traitements par lot
+    """
+
+    def __init__(self, workers: int = 2, langs: Optional[Sequence[str]] = None, gpu: bool = False):
+        """
+        Initialise le pool (les Readers sont chargés au démarrage de chaque processus)
+
+        Args:
+            workers: Nombre de processus
+            langs: Langues
+            gpu: Utiliser le GPU (déconseillé avec plusieurs processus)
+        """
+        self.langs = tuple(langs or DEFAULT_LANGS)
+        self.gpu = gpu
+        self.workers = max(1, workers)
+        # Répartir les cœurs entre les processus pour éviter la sursouscription de torch
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.langs, self.gpu, threads),
+        )
+
+    def recognize_files(self, image_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Reconnaît le texte de plusieurs images en parallèle
+
+        Args:
+            image_paths: Chemins des images
+
+        Returns:
+            Dict[str, Dict]: {chemin: résultat (voir recognize_result)}, texte "ERREUR: ..." pour les images en échec
+        """
+        futures = {
+            path: self._executor.submit(_recognize_file, path, self.langs, self.gpu)
+            for path in image_paths
+        }
+        results = {}
+        for path, future in futures.items():
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                logger.error(f"Erreur EasyOCR pour {path}: {str(e)}")
+                results[path] = {"text": f"ERREUR: {str(e)}", "mean_conf": None, "regions": []}
+        return results
+
+    def close(self) -> None:
+        """Arrête les processus du pool"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "EasyOCRPool":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,137 @@
+import re
+import unicodedata
+from typing import Any, List, Optional
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from pydantic import PrivateAttr
+from utils.cache import PersistentLRUCache, make_cache_key
+
+def normalize_query(text: str) -> str:
+    """
+    Normalise une requête avant calcul de la clé : Unicode NFKC, casse et espaces.
+    Deux publicités ne différant que par la mise en forme partagent ainsi le même embedding.
+
+    Args:
+        text: Texte de la requête
+
+    Returns:
+        str: Texte normalisé
+    """
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+class EmbeddingCache(PersistentLRUCache):
+    """Cache persistant des embeddings de requêtes (vecteurs float32), adressé par modèle et texte normalisé"""
+
+    def __init__(self, db_path: str = "cache/query_embeddings.sqlite", max_size_mb: float = 128):
+        """
+        Initialise le cache des embeddings
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            max_size_mb: Taille maximale du cache (en Mo)
+        """
+        super().__init__(db_path, max_size_mb=max_size_mb, name="embeddings")
+
+    def build_key(self, model_name: str, text: str) -> str:
+        """Clé d'une requête pour un modèle donné"""
+        return make_cache_key(model_name, normalize_query(text))
+
+    def get_embedding(self, key: str) -> Optional[Embedding]:
+        """
+        Récupère un embedding
+
+        Args:
+            key: Clé de la requête
+
+        Returns:
+            Optional[Embedding]: Vecteur, ou None si absent
+        """
+        value = self.get(key)
+        if value is None:
+            return None
+        return np.frombuffer(value, dtype=np.float32).tolist()
+
+    def set_embedding(self, key: str, embedding: Embedding) -> None:
+        """
+        Enregistre un embedding au format float32
+
+        Args:
+            key: Clé de la requête
+            embedding: Vecteur à stocker
+        """
+        self.set(key, np.asarray(embedding, dtype=np.float32).tobytes())
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Modèle d'embedding servant les embeddings de requêtes depuis un cache persistant
+    et déléguant tous les autres appels au modèle encapsulé (ex: AzureOpenAIEmbedding).
+    Seules les requêtes sont mises en cache : les documents indexés ne passent pas par ce chemin.
+    """
+
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+
+    def __init__(self, embed_model: BaseEmbedding, cache: EmbeddingCache, **kwargs: Any):
+        """
+        Args:
+            embed_model: Modèle d'embedding réel
+            cache: Cache des embeddings de requêtes
+        """
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            callback_manager=embed_model.callback_manager,
+            **kwargs,
+        )
+        self._embed_model = embed_model
+        self._cache = cache
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    @property
+    def cache(self) -> EmbeddingCache:
+        """Cache utilisé (pour consulter ses statistiques)"""
+        return self._cache
+
+    def get_query_embedding(self, query: str) -> Embedding:
+        """Embedding d'une requête, calculé seulement en cas d'absence du cache"""
+        key = self._cache.build_key(self.model_name, query)
+        embedding = self._cache.get_embedding(key)
+        if embedding is not None:
+            print("♻️ Embedding de la requête récupéré depuis le cache")
+            return embedding
+        embedding = super().get_query_embedding(query)
+        self._cache.set_embedding(key, embedding)
+        return embedding
+
+    async def aget_query_embedding(self, query: str) -> Embedding:
+        """Version asynchrone de get_query_embedding"""
+        key = self._cache.build_key(self.model_name, query)
+        embedding = self._cache.get_embedding(key)
+        if embedding is not None:
+            print("♻️ Embedding de la requête récupéré depuis le cache")
+            return embedding
+        embedding = await super().aget_query_embedding(query)
+        self._cache.set_embedding(key, embedding)
+        return embedding
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._embed_model._get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await self._embed_model._aget_query_embedding(query)
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._embed_model._get_text_embedding(text)
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return await self._embed_model._aget_text_embedding(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._embed_model._get_text_embeddings(texts)
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self._embed_model._aget_text_embeddings(texts)
@@ -0,0 +1,143 @@
+import math
+from typing import Any, Dict, Tuple
+import cv2
+import numpy as np
+
+# Tarification vision de GPT-4o (détail "high") : l'image est ramenée dans un carré de 2048 px,
+# puis son petit côté à 768 px, et facturée par tuile de 512 px
+VISION_MAX_SIDE = 2048
+VISION_SHORT_SIDE = 768
+VISION_TILE_SIZE = 512
+VISION_BASE_TOKENS = 85
+VISION_TILE_TOKENS = 170
+
+# Budget d'image par type d'appel vision :
+# - raw_text : lecture de tout le texte, y compris les mentions en petits caractères, à la
+#   résolution effective du modèle (rien au-delà n'est vu, seul l'envoi est allégé)
+# - verification : cohérence et clarifications (numéros, adresses, URL), même résolution
+# - layout : description de la mise en page, la taille des tuiles suffit à un petit côté de 512 px
+VISION_BUDGETS: Dict[str, Dict[str, Any]] = {
+    "raw_text": {"short_side": VISION_SHORT_SIDE, "format": "jpeg", "quality": 90, "detail": "high"},
+    "verification": {"short_side": VISION_SHORT_SIDE, "format": "jpeg", "quality": 85, "detail": "high"},
+    "layout": {"short_side": 512, "format": "jpeg", "quality": 80, "detail": "high"},
+}
+
+MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp", "png": "image/png"}
+
+def detect_image_format(image_bytes: bytes) -> str:
+    """Format d'une image encodée d'après sa signature ("jpeg", "png", "webp", ou "" si inconnu)"""
+    if image_bytes[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if image_bytes[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "webp"
+    return ""
+
+def vision_effective_size(width: int, height: int, short_side: int = VISION_SHORT_SIDE) -> Tuple[int, int]:
+    """
+    Taille à laquelle l'image est réellement vue (et facturée) : ramenée dans le carré
+    de 2048 px puis à un petit côté de short_side px, sans jamais être agrandie
+
+    Args:
+        width: Largeur de l'image
+        height: Hauteur de l'image
+        short_side: Taille maximale du petit côté
+
+    Returns:
+        Tuple[int, int]: (largeur, hauteur)
+    """
+    scale = min(1.0, VISION_MAX_SIDE / max(width, height))
+    if min(width, height) * scale > short_side:
+        scale = short_side / min(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+def estimate_vision_tokens(width: int, height: int, detail: str = "high") -> int:
+    """
+    Estime le coût en tokens d'une image pour GPT-4o
+
+    Args:
+        width: Largeur de l'image envoyée
+        height: Hauteur de l'image envoyée
+        detail: Niveau de détail ("low" : coût fixe, "high" ou "auto" : par tuile de 512 px)
+
+    Returns:
+        int: Nombre de tokens estimé
+    """
+    if detail == "low":
+        return VISION_BASE_TOKENS
+    width, height = vision_effective_size(width, height)
+    tiles = math.ceil(width / VISION_TILE_SIZE) * math.ceil(height / VISION_TILE_SIZE)
+    return VISION_BASE_TOKENS + VISION_TILE_TOKENS * tiles
+
+def fit_image_to_budget(image_bytes: bytes, budget: Dict[str, Any]) -> Tuple[bytes, Dict[str, Any]]:
+    """
+    Réduit et ré-encode une image selon le budget d'un type d'appel vision
+
+    Args:
+        image_bytes: Image encodée (PNG, JPEG...)
+        budget: Budget (voir VISION_BUDGETS) : petit côté maximal, format, qualité, détail
+
+    Returns:
+        Tuple[bytes, Dict]: Image à envoyer et bilan {"size", "sent_size", "mime_type", "detail",
+                            "tokens_full", "tokens_sent", "bytes_full", "bytes_sent"}
+    """
+    detail = budget.get("detail", "high")
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        # Format non décodable par OpenCV (ex: GIF) : image envoyée telle quelle
+        return image_bytes, {
+            "size": None, "sent_size": None, "mime_type": None, "detail": detail,
+            "tokens_full": 0, "tokens_sent": 0, "bytes_full": len(image_bytes), "bytes_sent": len(image_bytes),
+        }
+
+    height, width = image.shape[:2]
+    sent_width, sent_height = vision_effective_size(width, height, budget.get("short_side", VISION_SHORT_SIDE))
+    if (sent_width, sent_height) != (width, height):
+        image = cv2.resize(image, (sent_width, sent_height), interpolation=cv2.INTER_AREA)
+
+    image_format = budget.get("format", "jpeg")
+    if image_format == "webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, budget.get("quality", 85)]
+    elif image_format == "jpeg":
+        params = [cv2.IMWRITE_JPEG_QUALITY, budget.get("quality", 85)]
+    else:
+        params = []
+    ok, encoded = cv2.imencode(f".{'jpg' if image_format == 'jpeg' else image_format}", image, params)
+    if not ok:
+        raise ValueError(f"Encodage {image_format} impossible")
+    sent_bytes = encoded.tobytes()
+
+    # Image déjà dans le budget : l'original est conservé si le ré-encodage ne l'allège pas
+    original_format = detect_image_format(image_bytes)
+    if (sent_width, sent_height) == (width, height) and original_format and len(sent_bytes) >= len(image_bytes):
+        sent_bytes, image_format = image_bytes, original_format
+
+    return sent_bytes, {
+        "size": (width, height),
+        "sent_size": (sent_width, sent_height),
+        "mime_type": MIME_TYPES.get(image_format, f"image/{image_format}"),
+        "detail": detail,
+        "tokens_full": estimate_vision_tokens(width, height, detail),
+        "tokens_sent": estimate_vision_tokens(sent_width, sent_height, detail),
+        "bytes_full": len(image_bytes),
+        "bytes_sent": len(sent_bytes),
+    }
+
+def vision_render_dpi(page_width_pt: float, page_height_pt: float, max_dpi: int = 300, min_dpi: int = 72) -> int:
+    """
+    Résolution de rendu d'une page PDF juste suffisante pour le plus exigeant des budgets
+    vision : au-delà, les pixels rendus sont supprimés par la réduction avant envoi
+
+    Args:
+        page_width_pt: Largeur de la page (points PDF, 1/72 de pouce)
+        page_height_pt: Hauteur de la page (points PDF)
+        max_dpi: Résolution maximale
+        min_dpi: Résolution minimale
+
+    Returns:
+        int: Résolution de rendu (dpi)
+    """
+    short_side = max(budget.get("short_side", VISION_SHORT_SIDE) for budget in VISION_BUDGETS.values())
+    scale = min(VISION_MAX_SIDE / max(page_width_pt, page_height_pt), short_side / min(page_width_pt, page_height_pt))
+    return int(min(max_dpi, max(min_dpi, math.ceil(72 * scale))))
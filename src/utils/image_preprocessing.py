@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Any, Dict, Union
+import cv2
+import numpy as np
+from PIL import Image
+
+# Paramètres par défaut du prétraitement OCR (aussi utilisés comme composante des clés de cache)
+DEFAULT_PREPROCESSING: Dict[str, Any] = {
+    "clahe": True,
+    "clip_limit": 2.0,
+    "tile_grid_size": 8,
+    "sharpen": True,
+    "sharpen_amount": 1.0,
+    "sharpen_sigma": 1.0,
+    "adaptive_threshold": False,
+    "deskew": False,
+}
+
+ImageSource = Union[str, Path, bytes, np.ndarray, Image.Image]
+
+def load_image(source: ImageSource) -> np.ndarray:
+    """
+    Décode une image une seule fois en tableau NumPy (BGR ou niveaux de gris)
+
+    Args:
+        source: Chemin (image ou PDF), contenu encodé, tableau NumPy ou image PIL
+
+    Returns:
+        np.ndarray: Image décodée
+    """
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, Image.Image):
+        if source.mode not in ("L", "RGB"):
+            source = source.convert("RGB")
+        array = np.asarray(source)
+        return array if array.ndim == 2 else cv2.cvtColor(array, cv2.COLOR_RGB2BGR)
+    if isinstance(source, (str, Path)) and Path(source).suffix.lower() == ".pdf":
+        # PDF : première page rastérisée directement en mémoire, sans fichier PNG intermédiaire
+        from utils.pdf_converter import render_pdf_to_array
+        return render_pdf_to_array(str(source))
+    if isinstance(source, (str, Path)):
+        # np.fromfile + imdecode : gère les chemins non ASCII (accents, apostrophes)
+        data = np.fromfile(str(source), dtype=np.uint8)
+    else:
+        data = np.frombuffer(source, dtype=np.uint8)
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Impossible de décoder l'image: {source if isinstance(source, (str, Path)) else '<bytes>'}")
+    return image
+
+def to_grayscale(image: np.ndarray) -> np.ndarray:
+    """Convertit en niveaux de gris (sans copie si l'image l'est déjà)"""
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+def apply_clahe(gray: np.ndarray, clip_limit: float = 2.0, tile_grid_size: int = 8) -> np.ndarray:
+    """Égalisation adaptative du contraste (CLAHE)"""
+    clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(tile_grid_size, tile_grid_size))
+    return clahe.apply(gray)
+
+def unsharp_mask(gray: np.ndarray, amount: float = 1.0, sigma: float = 1.0) -> np.ndarray:
+    """Renforce la netteté : image + amount * (image - flou gaussien)"""
+    blurred = cv2.GaussianBlur(gray, (0, 0), sigma)
+    return cv2.addWeighted(gray, 1.0 + amount, blurred, -amount, 0)
+
+def adaptive_threshold(gray: np.ndarray, block_size: int = 31, c: int = 10) -> np.ndarray:
+    """Binarisation adaptative (fonds non uniformes, textes sur photos)"""
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, block_size, c)
+
+def estimate_skew(gray: np.ndarray) -> float:
+    """
+    Estime l'inclinaison du texte (en degrés) à partir du rectangle minimal englobant l'encre
+
+    Args:
+        gray: Image en niveaux de gris
+
+    Returns:
+        float: Angle de rotation à appliquer pour redresser l'image
+    """
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    coords = cv2.findNonZero(binary)
+    if coords is None or len(coords) < 10:
+        return 0.0
+    # La convention d'angle de minAreaRect varie selon la version d'OpenCV : ramener dans ]-45, 45]
+    angle = cv2.minAreaRect(coords)[-1] % 90
+    if angle > 45:
+        angle -= 90
+    return float(angle)
+
+def deskew(gray: np.ndarray, max_angle: float = 15.0) -> np.ndarray:
+    """Redresse l'image si l'inclinaison estimée est significative et plausible"""
+    angle = estimate_skew(gray)
+    if abs(angle) < 0.5 or abs(angle) > max_angle:
+        return gray
+    height, width = gray.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+def preprocess_image(source: ImageSource, **options: Any) -> np.ndarray:
+    """
+    Prétraitement OCR partagé par tous les moteurs : décodage unique, niveaux de gris,
+    CLAHE, masque flou (netteté), puis binarisation adaptative et redressement optionnels
+
+    Args:
+        source: Chemin, contenu encodé, tableau NumPy ou image PIL
+        options: Surcharges de DEFAULT_PREPROCESSING
+
+    Returns:
+        np.ndarray: Image en niveaux de gris (uint8) prête pour l'OCR
+    """
+    params = {**DEFAULT_PREPROCESSING, **options}
+    gray = to_grayscale(load_image(source))
+
+    if params["deskew"]:
+        gray = deskew(gray)
+    if params["clahe"]:
+        gray = apply_clahe(gray, params["clip_limit"], params["tile_grid_size"])
+    if params["sharpen"]:
+        gray = unsharp_mask(gray, params["sharpen_amount"], params["sharpen_sigma"])
+    if params["adaptive_threshold"]:
+        gray = adaptive_threshold(gray)
+
+    return np.ascontiguousarray(gray)
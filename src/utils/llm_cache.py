@@ -0,0 +1,93 @@
+from typing import Any, Optional
+from llama_index.core.llms import ChatMessage, ImageBlock, TextBlock
+from utils.cache import PersistentLRUCache, hash_bytes, make_cache_key
+
+class LLMResponseCache(PersistentLRUCache):
+    """
+    Cache persistant des réponses LLM, adressé par le contenu de la requête :
+    empreinte SHA-256 des images, prompt complet, modèle/déploiement et température.
+    Une publicité déjà soumise (ex: ré-upload "V2-" identique) ne coûte alors plus aucun appel.
+    """
+
+    def __init__(self, db_path: str = "cache/llm_responses.sqlite", max_size_mb: float = 256):
+        """
+        Initialise le cache des réponses LLM
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            max_size_mb: Taille maximale du cache (en Mo)
+        """
+        super().__init__(db_path, max_size_mb=max_size_mb, name="LLM")
+        self.token_counter = None
+
+    def set_token_counter(self, token_counter: Any) -> None:
+        """Définir le compteur de tokens recevant les succès/échecs du cache."""
+        self.token_counter = token_counter
+
+    def build_key(self, llm: Any, prompt: str, images: Optional[list] = None) -> str:
+        """
+        Construit la clé d'une requête
+
+        Args:
+            llm: Modèle interrogé (nom du modèle, déploiement et température pris en compte)
+            prompt: Prompt entièrement rendu
+            images: Contenus binaires des images jointes (optionnel)
+
+        Returns:
+            str: Clé de cache
+        """
+        return make_cache_key(
+            getattr(llm, "model", ""),
+            getattr(llm, "engine", ""),
+            getattr(llm, "temperature", None),
+            prompt,
+            [hash_bytes(image) for image in images or []],
+        )
+
+    def build_message_key(self, llm: Any, message: ChatMessage) -> str:
+        """
+        Construit la clé d'un message multimodal (blocs texte et image)
+
+        Args:
+            llm: Modèle interrogé
+            message: Message envoyé au modèle
+
+        Returns:
+            str: Clé de cache
+        """
+        texts = []
+        images = []
+        for block in message.blocks:
+            if isinstance(block, TextBlock):
+                texts.append(block.text)
+            elif isinstance(block, ImageBlock) and block.image is not None:
+                images.append(block.image)
+        return self.build_key(llm, "\n".join(texts), images)
+
+    def get_response(self, key: str) -> Optional[str]:
+        """
+        Récupère une réponse mise en cache
+
+        Args:
+            key: Clé de la requête
+
+        Returns:
+            Optional[str]: Réponse, ou None si absente
+        """
+        value = self.get(key)
+        if self.token_counter:
+            self.token_counter.record_llm_cache_lookup(hit=value is not None)
+        if value is None:
+            return None
+        print("♻️ Réponse LLM récupérée depuis le cache")
+        return value.decode("utf-8")
+
+    def set_response(self, key: str, response: str) -> None:
+        """
+        Enregistre une réponse
+
+        Args:
+            key: Clé de la requête
+            response: Réponse du modèle
+        """
+        self.set(key, response.encode("utf-8"))
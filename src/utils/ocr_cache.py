@@ -0,0 +1,108 @@
+import json
+import logging
+import sqlite3
+import zlib
+from typing import Any, Dict, Optional
+import numpy as np
+from utils.cache import PersistentLRUCache, hash_bytes, make_cache_key
+from utils.image_preprocessing import DEFAULT_PREPROCESSING
+
+logger = logging.getLogger("OCRResultCache")
+
+def hash_pixels(image: np.ndarray) -> str:
+    """
+    Empreinte des pixels décodés (et non du fichier) : une image ré-encodée, renommée
+    ou dont seules les métadonnées changent conserve la même empreinte
+
+    Args:
+        image: Image décodée
+
+    Returns:
+        str: Empreinte SHA-256 des dimensions, du type et des pixels
+    """
+    header = f"{image.shape}|{image.dtype}".encode("ascii")
+    return hash_bytes(header + np.ascontiguousarray(image).tobytes())
+
+class OCRResultCache(PersistentLRUCache):
+    """
+    Cache persistant des résultats OCR (texte, confiances et zones), adressé par l'empreinte
+    des pixels décodés, le moteur et sa configuration (langue, modes, prétraitement).
+    Relancer une extraction sur un dossier inchangé ne coûte alors que la lecture des images.
+    Une erreur d'accès au cache (base verrouillée, disque plein...) est journalisée et ignorée :
+    elle ne fait jamais perdre un résultat OCR.
+    """
+
+    def __init__(self, db_path: str = "cache/ocr_results.sqlite", max_size_mb: float = 128):
+        """
+        Initialise le cache des résultats OCR
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            max_size_mb: Taille maximale du cache (en Mo)
+        """
+        super().__init__(db_path, max_size_mb=max_size_mb, name="OCR")
+
+    def build_key(
+        self,
+        pixel_hash: str,
+        engine: str,
+        lang: Any = None,
+        psm: Any = None,
+        preprocessing: Optional[Dict[str, Any]] = None,
+        **options: Any,
+    ) -> str:
+        """
+        Construit la clé d'un résultat OCR
+
+        Args:
+            pixel_hash: Empreinte des pixels décodés (voir hash_pixels)
+            engine: Moteur ou chaîne d'extraction (ex: "tesseract", "easyocr")
+            lang: Langue(s) du moteur
+            psm: Mode(s) de segmentation Tesseract
+            preprocessing: Paramètres du prétraitement (défaut : DEFAULT_PREPROCESSING)
+            options: Autres paramètres influant sur le résultat
+
+        Returns:
+            str: Clé de cache
+        """
+        return make_cache_key(
+            pixel_hash,
+            engine,
+            lang,
+            psm,
+            {**DEFAULT_PREPROCESSING, **(preprocessing or {})},
+            options,
+        )
+
+    def get_result(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère un résultat OCR
+
+        Args:
+            key: Clé du résultat
+
+        Returns:
+            Optional[Dict]: Résultat ({"text", "mean_conf", "regions", ...}), ou None si absent ou illisible
+        """
+        try:
+            value = self.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du cache OCR impossible: {str(e)}")
+            return None
+        if value is None:
+            return None
+        return json.loads(zlib.decompress(value).decode("utf-8"))
+
+    def set_result(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Enregistre un résultat OCR (JSON compressé)
+
+        Args:
+            key: Clé du résultat
+            result: Résultat sérialisable en JSON
+        """
+        serialized = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        try:
+            self.set(key, zlib.compress(serialized.encode("utf-8")))
+        except sqlite3.Error as e:
+            logger.warning(f"Écriture dans le cache OCR impossible: {str(e)}")
@@ -17,6 +17,10 @@ class OutputSaver:
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.reset_analysis()
+    
+    def reset_analysis(self) -> None:
+        """Abandonne l'analyse en cours (aucune analyse n'est alors considérée en cours)"""
         self.current_analysis: Dict[str, Any] = {
             "timestamp": "",
             "image_path": "",
@@ -255,6 +259,12 @@ def save_output(input_path: str, analysis_data: Dict[str, Any]) -> str:
             "final_response": make_json_serializable(analysis_data.get("final_response", "")),
             "extracted_text": make_json_serializable(analysis_data.get("extracted_text", ""))
         }
+        # Bilan des images envoyées aux appels vision (tokens économisés)
+        if analysis_data.get("image_budget"):
+            clean_data["image_budget"] = make_json_serializable(analysis_data["image_budget"])
+        # PDF multipage : détail des résultats de chaque page
+        if analysis_data.get("pages"):
+            clean_data["pages"] = make_json_serializable(analysis_data["pages"])
         
         # Sauvegarder en JSON
         with open(output_path, 'w', encoding='utf-8') as f:
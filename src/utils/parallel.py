@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+def _timed_call(func: Callable[[Any], Any], item: Any) -> Tuple[Any, Optional[str], float]:
+    """
+    Exécute func(item) en mesurant sa durée ; l'erreur éventuelle est renvoyée
+    au lieu d'être levée pour ne pas interrompre le reste du lot
+
+    Returns:
+        Tuple: (résultat, message d'erreur ou None, durée en secondes)
+    """
+    start = time.perf_counter()
+    try:
+        return func(item), None, time.perf_counter() - start
+    except Exception as e:
+        return None, f"{type(e).__name__}: {str(e)}", time.perf_counter() - start
+
+def iter_parallel(
+    func: Callable[[Any], Any],
+    items: Sequence[Any],
+    workers: int = 1,
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> Iterator[Dict[str, Any]]:
+    """
+    Applique func à chaque élément, dans un pool de processus si workers > 1, et renvoie
+    les résultats au fil de l'eau dans l'ordre où ils se terminent
+
+    Args:
+        func: Fonction à appliquer (fonction de module ou functools.partial si workers > 1)
+        items: Éléments à traiter
+        workers: Nombre de processus (1 : exécution séquentielle dans le processus courant)
+        initializer: Fonction d'initialisation de chaque processus du pool
+        initargs: Arguments de l'initialisation
+
+    Returns:
+        Iterator[Dict]: {"item", "result", "error", "elapsed"} pour chaque élément terminé
+    """
+    # Même pour un seul élément, le pool est nécessaire dès que workers > 1 : l'état
+    # préparé par l'initialisation (ex: extracteur du processus) n'existe que dans ses processus
+    if workers <= 1 or not items:
+        for item in items:
+            result, error, elapsed = _timed_call(func, item)
+            yield {"item": item, "result": result, "error": error, "elapsed": elapsed}
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(items)), initializer=initializer, initargs=initargs
+    ) as executor:
+        futures = {executor.submit(_timed_call, func, item): item for item in items}
+        for future in as_completed(futures):
+            try:
+                result, error, elapsed = future.result()
+            except Exception as e:
+                # Processus interrompu (ex: manque de mémoire) : seul cet élément est en échec
+                result, error, elapsed = None, f"{type(e).__name__}: {str(e)}", 0.0
+            yield {"item": futures[future], "result": result, "error": error, "elapsed": elapsed}
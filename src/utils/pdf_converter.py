@@ -3,51 +3,279 @@ from pathlib import Path
 import os
 from datetime import datetime
 import argparse
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+import cv2
+import numpy as np
 
-def convert_pdf_to_image(pdf_path: str, dpi: int = 300, format: str = "png") -> str:
+def render_pdf_page(pdf_path: str, dpi: int = 300, page_number: int = 0) -> fitz.Pixmap:
     """
-    Convertit un PDF en image
+    Rastérise une page de PDF en mémoire
+    
+    Args:
+        pdf_path: Chemin vers le PDF
+        dpi: Résolution de l'image (dots per inch)
+        page_number: Numéro de la page (0 : première page)
+        
+    Returns:
+        fitz.Pixmap: Image RGB sans canal alpha
+    """
+    with fitz.open(pdf_path) as pdf:
+        zoom = dpi / 72  # zoom factor (72 dpi est la résolution par défaut)
+        mat = fitz.Matrix(zoom, zoom)  # matrice de transformation pour le zoom
+        return pdf[page_number].get_pixmap(matrix=mat, colorspace=fitz.csRGB, alpha=False)
+
+def render_pdf_to_array(pdf_path: str, dpi: int = 300, page_number: int = 0) -> np.ndarray:
+    """
+    Rastérise une page de PDF directement en tableau NumPy (BGR, convention OpenCV),
+    sans encodage intermédiaire : utilisé par l'OCR
+    
+    Args:
+        pdf_path: Chemin vers le PDF
+        dpi: Résolution de l'image (dots per inch)
+        page_number: Numéro de la page (0 : première page)
+        
+    Returns:
+        np.ndarray: Image BGR
+    """
+    pix = render_pdf_page(pdf_path, dpi, page_number)
+    rgb = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    return cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+
+def render_pdf_to_bytes(pdf_path: str, dpi: int = 300, page_number: int = 0, format: str = "png") -> bytes:
+    """
+    Rastérise une page de PDF en image encodée, en mémoire : utilisé pour les ImageBlock du modèle vision
     
     Args:
         pdf_path: Chemin vers le PDF
         dpi: Résolution de l'image (dots per inch)
+        page_number: Numéro de la page (0 : première page)
         format: Format de l'image (png, jpg)
         
     Returns:
-        str: Chemin vers l'image convertie
+        bytes: Image encodée
     """
-    try:
-        # Créer le dossier converted_images s'il n'existe pas
-        output_dir = Path("converted_images")
-        output_dir.mkdir(exist_ok=True)
+    pix = render_pdf_page(pdf_path, dpi, page_number)
+    return pix.tobytes(output="jpeg" if format in ("jpg", "jpeg") else format)
+
+def get_page_count(pdf_path: str) -> int:
+    """Nombre de pages d'un PDF"""
+    with fitz.open(pdf_path) as pdf:
+        return len(pdf)
+
+def get_page_size(pdf_path: str, page_number: int = 0) -> Tuple[float, float]:
+    """Dimensions (largeur, hauteur) d'une page PDF en points (1/72 de pouce)"""
+    with fitz.open(pdf_path) as pdf:
+        rect = pdf[page_number].rect
+        return rect.width, rect.height
+
+def parse_page_range(pages: Optional[str], page_count: int) -> List[int]:
+    """
+    Convertit une sélection de pages ("1-3,5", numérotation à partir de 1) en numéros de page
+    
+    Args:
+        pages: Sélection de pages (None ou "all" : toutes les pages)
+        page_count: Nombre de pages du document
         
-        # Générer le nom du fichier de sortie
-        pdf_name = Path(pdf_path).stem
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = output_dir / f"{pdf_name}_{timestamp}.{format}"
+    Returns:
+        List[int]: Numéros de page (à partir de 0), triés et sans doublon
+    """
+    if not pages or pages.strip().lower() == "all":
+        return list(range(page_count))
+    
+    selected = set()
+    for part in pages.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-", 1)
+            first = int(start) if start.strip() else 1
+            last = int(end) if end.strip() else page_count
+        else:
+            first = last = int(part)
+        selected.update(range(max(first, 1) - 1, min(last, page_count)))
+    
+    if not selected:
+        raise ValueError(f"Aucune page valide dans la sélection '{pages}' ({page_count} pages)")
+    return sorted(selected)
+
+def _render_pages_worker(
+    pdf_path: str, page_numbers: List[int], dpi: Union[int, Dict[int, int]], format: str
+) -> List[Tuple[int, bytes]]:
+    """Tâche d'un processus du pool : ouvre le PDF une fois et rastérise sa part des pages"""
+    output = "jpeg" if format in ("jpg", "jpeg") else format
+    rendered = []
+    with fitz.open(pdf_path) as pdf:
+        for page_number in page_numbers:
+            zoom = (dpi[page_number] if isinstance(dpi, dict) else dpi) / 72
+            rendered.append((page_number, pdf[page_number].get_pixmap(
+                matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False
+            ).tobytes(output=output)))
+    return rendered
+
+def render_pdf_pages(
+    pdf_path: str,
+    pages: Optional[List[int]] = None,
+    dpi: Union[int, Dict[int, int]] = 300,
+    format: str = "png",
+    workers: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None,
+) -> Dict[int, bytes]:
+    """
+    Rastérise plusieurs pages d'un PDF en mémoire, réparties sur un pool de processus
+    (chaque processus ouvre son propre document PyMuPDF)
+    
+    Args:
+        pdf_path: Chemin vers le PDF
+        pages: Numéros de page (à partir de 0) ; None : toutes les pages
+        dpi: Résolution de l'image (dots per inch), ou {numéro de page: résolution}
+             lorsque les pages n'ont pas toutes le même format
+        format: Format de l'image (png, jpg)
+        workers: Nombre de processus (défaut : nombre de cœurs)
+        executor: Pool de processus réutilisé d'un appel à l'autre (rendu par lots) ;
+                  None : pool créé pour cet appel
         
-        # Ouvrir le PDF
-        pdf = fitz.open(pdf_path)
+    Returns:
+        Dict[int, bytes]: {numéro de page: image encodée}, dans l'ordre des pages
+    """
+    if pages is None:
+        pages = list(range(get_page_count(pdf_path)))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pages)))
+    
+    if workers == 1 and executor is None:
+        rendered = _render_pages_worker(pdf_path, pages, dpi, format)
+    else:
+        # Répartition entrelacée : les pages lourdes (souvent consécutives) sont réparties entre processus
+        chunks = [pages[i::workers] for i in range(workers)]
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        try:
+            futures = [pool.submit(_render_pages_worker, pdf_path, chunk, dpi, format) for chunk in chunks]
+            rendered = [item for future in futures for item in future.result()]
+        finally:
+            if executor is None:
+                pool.shutdown(wait=True)
+    
+    return dict(sorted(rendered))
+
+def save_converted_image(pdf_path: str, image_bytes: bytes, format: str = "png") -> str:
+    """
+    Écrit une page rastérisée dans converted_images/ (optionnel : l'analyse travaille en mémoire)
+    
+    Args:
+        pdf_path: Chemin vers le PDF d'origine
+        image_bytes: Image encodée
+        format: Format de l'image (extension du fichier)
         
-        # Convertir la première page en image avec la résolution spécifiée
-        page = pdf[0]
-        zoom = dpi / 72  # zoom factor (72 dpi est la résolution par défaut)
-        mat = fitz.Matrix(zoom, zoom)  # matrice de transformation pour le zoom
-        pix = page.get_pixmap(matrix=mat)
+    Returns:
+        str: Chemin vers l'image écrite
+    """
+    # Créer le dossier converted_images s'il n'existe pas
+    output_dir = Path("converted_images")
+    output_dir.mkdir(exist_ok=True)
+    
+    # Générer le nom du fichier de sortie
+    pdf_name = Path(pdf_path).stem
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = output_dir / f"{pdf_name}_{timestamp}.{format}"
+    output_path.write_bytes(image_bytes)
+    return str(output_path)
+
+def convert_pdf_to_image(pdf_path: str, dpi: int = 300, format: str = "png") -> str:
+    """
+    Convertit un PDF en image
+    
+    Args:
+        pdf_path: Chemin vers le PDF
+        dpi: Résolution de l'image (dots per inch)
+        format: Format de l'image (png, jpg)
         
-        # Sauvegarder l'image
-        pix.save(str(output_path))
+    Returns:
+        str: Chemin vers l'image convertie
+    """
+    try:
+        # Convertir la première page en image avec la résolution spécifiée, puis l'écrire
+        image_bytes = render_pdf_to_bytes(pdf_path, dpi, format=format)
+        output_path = save_converted_image(pdf_path, image_bytes, format)
         print(f"✅ PDF converti en image : {output_path}")
-        print(f"📊 Résolution: {dpi} dpi, Format: {format}, Dimensions: {pix.width}x{pix.height}")
+        print(f"📊 Résolution: {dpi} dpi, Format: {format}")
         
-        return str(output_path)
+        return output_path
         
     except Exception as e:
         print(f"❌ Erreur lors de la conversion du PDF : {str(e)}")
         raise
-    finally:
-        if 'pdf' in locals():
-            pdf.close()
+
+def extract_text_layer(pdf_path: str, page_number: int = 0) -> Dict[str, Any]:
+    """
+    Lit la couche texte d'une page PDF (texte sélectionnable des PDF issus d'outils de mise en page)
+    avec la position de chaque bloc, sans rastérisation ni OCR
+    
+    Args:
+        pdf_path: Chemin vers le PDF
+        page_number: Numéro de la page (0 : première page, celle qui est analysée)
+        
+    Returns:
+        Dict[str, Any]: Texte dans l'ordre de lecture, blocs {"bbox": (x0, y0, x1, y1), "text"}
+                        en points PDF, et indicateurs de densité (caractères, mots, couvertures)
+    """
+    with fitz.open(pdf_path) as pdf:
+        page = pdf[page_number]
+        page_rect = page.rect
+        page_area = page_rect.get_area() or 1.0
+        
+        blocks = []
+        # sort=True : blocs triés de haut en bas puis de gauche à droite
+        for x0, y0, x1, y1, text, _, block_type in page.get_text("blocks", sort=True):
+            if block_type != 0 or not text.strip():
+                continue
+            blocks.append({
+                "bbox": (round(x0, 1), round(y0, 1), round(x1, 1), round(y1, 1)),
+                "text": text.strip(),
+            })
+        
+        # Surface occupée par les images (texte éventuellement présent uniquement dans l'image)
+        image_area = sum(
+            fitz.Rect(info["bbox"]).intersect(page_rect).get_area() for info in page.get_image_info()
+        )
+    
+    text = "\n".join(block["text"] for block in blocks)
+    chars = [char for char in text if not char.isspace()]
+    # Polices sans table Unicode : caractères de contrôle, de remplacement ou de la zone privée
+    unreadable = sum(1 for char in chars if char == "\ufffd" or unicodedata.category(char) in ("Cc", "Co"))
+    
+    return {
+        "text": text,
+        "blocks": blocks,
+        "page_number": page_number + 1,
+        "chars": len(chars),
+        "words": len(text.split()),
+        "text_coverage": sum((b["bbox"][2] - b["bbox"][0]) * (b["bbox"][3] - b["bbox"][1]) for b in blocks) / page_area,
+        "image_coverage": min(1.0, image_area / page_area),
+        "unreadable_ratio": unreadable / len(chars) if chars else 0.0,
+    }
+
+def is_text_layer_usable(layer: Dict[str, Any], min_chars: int = 100, min_words: int = 20) -> bool:
+    """
+    Indique si la couche texte suffit à remplacer l'OCR et l'extraction par vision
+    
+    Args:
+        layer: Résultat de extract_text_layer
+        min_chars: Nombre minimal de caractères (hors espaces)
+        min_words: Nombre minimal de mots
+        
+    Returns:
+        bool: False si la couche est absente, trop pauvre, illisible, ou si la page est
+              essentiellement une image (le texte visible y est alors incrusté)
+    """
+    if layer["chars"] < min_chars or layer["words"] < min_words:
+        return False
+    if layer["unreadable_ratio"] > 0.1:
+        return False
+    if layer["image_coverage"] > 0.5 and layer["text_coverage"] < 0.05:
+        return False
+    return True
 
 if __name__ == "__main__":
     # Permet d'exécuter le script directement pour tester
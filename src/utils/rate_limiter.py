@@ -0,0 +1,317 @@
+import asyncio
+import json
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+import httpx
+from tenacity import RetryCallState
+from tenacity.wait import wait_base
+
+# Estimation forfaitaire d'une image jointe (GPT-4o, détail "high", image ~1024 px)
+IMAGE_TOKENS_ESTIMATE = 765
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """
+    Lit le délai d'attente imposé par le serveur (en-têtes retry-after-ms ou Retry-After)
+
+    Args:
+        headers: En-têtes de la réponse
+
+    Returns:
+        Optional[float]: Délai en secondes, ou None si absent/illisible
+    """
+    if headers is None:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        # Format date HTTP
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def estimate_request_tokens(body: bytes) -> int:
+    """
+    Estime le nombre de tokens consommés par une requête Azure OpenAI (chat ou embedding)
+    à partir de son corps JSON : ~4 caractères par token, forfait par image, plus max_tokens
+
+    Args:
+        body: Corps de la requête
+
+    Returns:
+        int: Nombre de tokens estimé
+    """
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        return max(1, len(body) // 4)
+    if not isinstance(payload, dict):
+        return 1
+
+    chars = 0
+    images = 0
+
+    # Embeddings : une chaîne ou une liste de chaînes
+    inputs = payload.get("input")
+    if isinstance(inputs, str):
+        chars += len(inputs)
+    elif isinstance(inputs, list):
+        chars += sum(len(item) for item in inputs if isinstance(item, str))
+
+    # Chat : contenu texte ou liste de blocs texte/image
+    for message in payload.get("messages", []):
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            chars += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if not isinstance(part, dict):
+                    continue
+                if part.get("type") == "image_url":
+                    images += 1
+                else:
+                    chars += len(str(part.get("text", "")))
+
+    completion = payload.get("max_tokens") or payload.get("max_completion_tokens") or 0
+    return max(1, chars // 4 + images * IMAGE_TOKENS_ESTIMATE + int(completion))
+
+class TokenBucket:
+    """Seau à jetons : capacité maximale et remplissage continu (non thread-safe, protégé par le limiteur)"""
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0):
+        """
+        Initialise le seau, plein
+
+        Args:
+            capacity: Nombre de jetons disponibles par période
+            per_seconds: Durée de la période (en secondes)
+        """
+        self.capacity = float(capacity)
+        self.rate = self.capacity / per_seconds
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Ajoute les jetons accumulés depuis la dernière mise à jour"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Temps nécessaire pour disposer de amount jetons (0 si disponibles)"""
+        # Une requête plus grosse que la capacité attend seulement que le seau soit plein
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Retire amount jetons (le solde peut devenir négatif pour une requête hors norme)"""
+        self.tokens -= amount
+
+class RateLimiter:
+    """
+    Limiteur de débit partagé (requêtes/min et tokens/min) pour un déploiement Azure OpenAI.
+    N'attend que lorsque le quota est réellement épuisé, et suspend tous les appelants
+    pendant la durée Retry-After annoncée par le serveur après une réponse 429.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, name: str = "azure"):
+        """
+        Initialise le limiteur
+
+        Args:
+            requests_per_minute: Nombre maximal de requêtes par minute
+            tokens_per_minute: Nombre maximal de tokens par minute
+            name: Nom du déploiement (pour les logs)
+        """
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "waits": 0, "wait_seconds": 0.0, "throttled": 0}
+
+    def _try_acquire(self, tokens: int) -> float:
+        """
+        Réserve une requête et tokens jetons si possible
+
+        Returns:
+            float: 0 si la réservation est faite, sinon le temps d'attente avant de réessayer
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self._stats["requests"] += 1
+            return 0.0
+
+    def _record_wait(self, waited: float) -> None:
+        """Comptabilise une attente imposée par le quota"""
+        if waited <= 0:
+            return
+        with self._lock:
+            self._stats["waits"] += 1
+            self._stats["wait_seconds"] += waited
+        print(f"⏳ Quota {self.name} atteint : attente de {waited:.1f}s")
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Attend (en bloquant le thread) que le quota permette la requête
+
+        Args:
+            tokens: Nombre de tokens estimé de la requête
+
+        Returns:
+            float: Temps d'attente total (en secondes)
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                self._record_wait(waited)
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+    async def aacquire(self, tokens: int = 1) -> float:
+        """
+        Version asynchrone de acquire : attend sans bloquer la boucle d'événements
+
+        Args:
+            tokens: Nombre de tokens estimé de la requête
+
+        Returns:
+            float: Temps d'attente total (en secondes)
+        """
+        waited = 0.0
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                self._record_wait(waited)
+                return waited
+            await asyncio.sleep(wait)
+            waited += wait
+
+    def throttle(self, retry_after: Optional[float]) -> float:
+        """
+        Suspend toutes les requêtes après une réponse 429
+
+        Args:
+            retry_after: Délai annoncé par le serveur (None : 1 seconde par défaut)
+
+        Returns:
+            float: Délai appliqué (en secondes)
+        """
+        delay = retry_after if retry_after is not None else 1.0
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            self._stats["throttled"] += 1
+        print(f"🚦 429 reçu pour {self.name} : pause de {delay:.1f}s")
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Statistiques du limiteur
+
+        Returns:
+            Dict: Requêtes autorisées, attentes, temps d'attente cumulé et réponses 429
+        """
+        with self._lock:
+            return dict(self._stats)
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """Transport httpx synchrone soumettant chaque requête au limiteur et rejouant les 429"""
+
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.BaseTransport] = None, max_retries: int = 5):
+        """
+        Args:
+            limiter: Limiteur partagé
+            transport: Transport sous-jacent (par défaut httpx.HTTPTransport)
+            max_retries: Nombre maximal de rejeux après une réponse 429
+        """
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+        self.max_retries = max_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_request_tokens(request.read())
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(tokens)
+            response = self.transport.handle_request(request)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            # La pause est appliquée par le limiteur à tous les appelants lors du prochain acquire
+            self.limiter.throttle(parse_retry_after(response.headers))
+            response.close()
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+class AsyncRateLimitedTransport(httpx.AsyncBaseTransport):
+    """Transport httpx asynchrone soumettant chaque requête au limiteur et rejouant les 429"""
+
+    def __init__(self, limiter: RateLimiter, transport: Optional[httpx.AsyncBaseTransport] = None, max_retries: int = 5):
+        """
+        Args:
+            limiter: Limiteur partagé
+            transport: Transport sous-jacent (par défaut httpx.AsyncHTTPTransport)
+            max_retries: Nombre maximal de rejeux après une réponse 429
+        """
+        self.limiter = limiter
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.max_retries = max_retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = estimate_request_tokens(await request.aread())
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire(tokens)
+            response = await self.transport.handle_async_request(request)
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+            self.limiter.throttle(parse_retry_after(response.headers))
+            await response.aclose()
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+class wait_retry_after(wait_base):
+    """
+    Stratégie d'attente tenacity : respecte le Retry-After de l'erreur (réponse 429)
+    et ne retombe sur la stratégie de repli que si le serveur n'en donne pas
+    """
+
+    def __init__(self, fallback: wait_base):
+        self.fallback = fallback
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        response = getattr(exception, "response", None)
+        retry_after = parse_retry_after(getattr(response, "headers", None))
+        if retry_after is not None:
+            return retry_after
+        return self.fallback(retry_state)
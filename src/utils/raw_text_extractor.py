@@ -7,13 +7,18 @@ Ce module est spécialement conçu pour extraire le texte brut sans aucune corre
 import os
 import sys
 import logging
-import tempfile
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any, Tuple
+from functools import partial
+from typing import Dict, Iterator, List, Optional, Union, Any, Tuple
 import cv2
 import numpy as np
-from PIL import Image, ImageEnhance
+sys.path.append(str(Path(__file__).parent.parent))  # Ajoute le dossier src au PYTHONPATH (exécution directe)
+from utils.easyocr_reader import get_reader
+from utils.image_preprocessing import load_image, preprocess_image, to_grayscale
+from utils.ocr_cache import OCRResultCache, hash_pixels
+from utils.parallel import iter_parallel
+from utils.tesseract_ocr import api_available, ocr_image
 
 # Configuration du logger
 logging.basicConfig(
@@ -22,16 +27,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger("RawTextExtractor")
 
+# Extracteur propre à chaque processus du pool de iter_extract_raw_text
+_worker_extractor = None
+
+def _init_raw_worker(cache_path: Optional[str], cache_size_mb: float) -> None:
+    """Initialise un processus du pool : un extracteur (et sa connexion au cache OCR) par processus"""
+    global _worker_extractor
+    ocr_cache = OCRResultCache(cache_path, max_size_mb=cache_size_mb) if cache_path else None
+    _worker_extractor = RawTextExtractor(ocr_cache=ocr_cache)
+
+def _extract_raw_in_worker(image_path: str, method: str = "auto") -> Dict[str, str]:
+    """Tâche exécutée dans un processus du pool"""
+    return _worker_extractor.extract_raw_text(image_path, method)
+
 class RawTextExtractor:
     """
     Classe pour extraire le texte brut des images sans aucune correction
     orthographique. Préserve le texte tel qu'il est reconnu par l'OCR.
     """
     
-    def __init__(self):
+    def __init__(self, ocr_cache: Optional[OCRResultCache] = None):
         """
         Initialise l'extracteur de texte brut
+        
+        Args:
+            ocr_cache: Cache persistant des résultats OCR (optionnel)
         """
+        self.ocr_cache = ocr_cache
         # Vérifier les moteurs OCR disponibles
         self.available_engines = self._check_available_engines()
         logger.info(f"Moteurs OCR disponibles: {', '.join(self.available_engines.keys())}")
@@ -58,6 +80,10 @@ class RawTextExtractor:
         except FileNotFoundError:
             pass
         
+        # API Tesseract persistante (tesserocr) : utilisable même sans l'exécutable
+        if api_available():
+            engines["tesseract"] = True
+        
         # Vérifier si EasyOCR est disponible
         try:
             import easyocr
@@ -67,49 +93,44 @@ class RawTextExtractor:
             
         return engines
     
-    def _preprocess_image(self, image_path: str) -> str:
+    def _preprocess_image(self, image: Union[str, np.ndarray]) -> np.ndarray:
         """
-        Prétraite l'image pour améliorer la reconnaissance OCR
+        Prétraite l'image pour améliorer la reconnaissance OCR (en mémoire, sans fichier temporaire)
         
         Args:
-            image_path: Chemin vers l'image
+            image: Chemin vers l'image ou image déjà prétraitée
             
         Returns:
-            str: Chemin vers l'image prétraitée
+            np.ndarray: Image prétraitée (ou image d'origine en niveaux de gris si le prétraitement échoue)
         """
-        try:
-            # Ouvrir l'image
-            img = Image.open(image_path)
-            
-            # Convertir en niveaux de gris si nécessaire
-            if img.mode != 'L':
-                img = img.convert('L')
-            
-            # Améliorer le contraste
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(1.5)
-            
-            # Améliorer la netteté
-            enhancer = ImageEnhance.Sharpness(img)
-            img = enhancer.enhance(2.0)
-            
-            # Sauvegarder dans un fichier temporaire
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            img.save(temp_file.name)
+        if isinstance(image, np.ndarray):
+            return image
+        return self._preprocess_decoded(load_image(image))
+    
+    def _preprocess_decoded(self, decoded: np.ndarray) -> np.ndarray:
+        """
+        Prétraite une image déjà décodée
+        
+        Args:
+            decoded: Image décodée (BGR ou niveaux de gris)
             
-            logger.info(f"Image prétraitée sauvegardée: {temp_file.name}")
-            return temp_file.name
+        Returns:
+            np.ndarray: Image prétraitée (ou image d'origine en niveaux de gris si le prétraitement échoue)
+        """
+        try:
+            # Pipeline OpenCV partagé avec TextExtractor (niveaux de gris, CLAHE, netteté)
+            return preprocess_image(decoded)
             
         except Exception as e:
             logger.error(f"Erreur lors du prétraitement de l'image: {str(e)}")
-            return image_path
+            return to_grayscale(decoded)
     
-    def extract_with_tesseract(self, image_path: str, lang: str = "fra+eng") -> str:
+    def extract_with_tesseract(self, image: Union[str, np.ndarray], lang: str = "fra+eng") -> str:
         """
         Extrait le texte brut en utilisant Tesseract
         
         Args:
-            image_path: Chemin vers l'image
+            image: Chemin vers l'image ou image déjà prétraitée
             lang: Langues à utiliser (ex: "fra+eng")
             
         Returns:
@@ -120,48 +141,42 @@ class RawTextExtractor:
             return ""
         
         # Vérifier que l'image existe
-        if not os.path.exists(image_path):
-            logger.error(f"Image non trouvée: {image_path}")
+        if isinstance(image, str) and not os.path.exists(image):
+            logger.error(f"Image non trouvée: {image}")
             return ""
         
-        # Prétraiter l'image
-        processed_image = self._preprocess_image(image_path)
-        
         try:
-            # Extraire le texte avec Tesseract
-            result = subprocess.run(
-                ["tesseract", processed_image, "stdout", "-l", lang, "--psm", "6"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Nettoyer le fichier temporaire
-            if processed_image != image_path:
-                os.unlink(processed_image)
-            
-            if result.returncode != 0:
-                logger.error(f"Erreur Tesseract: {result.stderr}")
-                return ""
-            
-            return result.stdout.strip()
+            return self._run_tesseract(self._preprocess_image(image), lang)["text"]
             
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction avec Tesseract: {str(e)}")
-            # Nettoyer le fichier temporaire
-            if processed_image != image_path:
-                try:
-                    os.unlink(processed_image)
-                except:
-                    pass
             return ""
     
-    def extract_with_easyocr(self, image_path: str, langs: List[str] = None) -> str:
+    def _run_tesseract(self, image: np.ndarray, lang: str = "fra+eng") -> Dict[str, Any]:
+        """
+        Reconnaissance Tesseract d'une image prétraitée
+        
+        Args:
+            image: Image prétraitée
+            lang: Langues à utiliser
+            
+        Returns:
+            Dict: {"text", "words", "mean_conf", "psm"}
+        """
+        # Image transmise à Tesseract en mémoire
+        # (API persistante partagée avec TextExtractor, ou entrée standard de l'exécutable)
+        result = ocr_image(image, psms=(6,), lang=lang, early_exit=False)
+        if result is None:
+            # Échec (timeout, erreur) : ne pas le confondre avec une image sans texte
+            raise RuntimeError("Tesseract n'a produit aucun résultat")
+        return result
+    
+    def extract_with_easyocr(self, image: Union[str, np.ndarray], langs: List[str] = None) -> str:
         """
         Extrait le texte brut en utilisant EasyOCR
         
         Args:
-            image_path: Chemin vers l'image
+            image: Chemin vers l'image ou image déjà prétraitée
             langs: Langues à utiliser (ex: ["fr", "en"])
             
         Returns:
@@ -175,26 +190,13 @@ class RawTextExtractor:
             langs = ["fr", "en"]
         
         # Vérifier que l'image existe
-        if not os.path.exists(image_path):
-            logger.error(f"Image non trouvée: {image_path}")
+        if isinstance(image, str) and not os.path.exists(image):
+            logger.error(f"Image non trouvée: {image}")
             return ""
             
         try:
-            import easyocr
-            reader = easyocr.Reader(langs)
-            
-            # Prétraiter l'image
-            processed_image = self._preprocess_image(image_path)
-            
-            # Extraire le texte
-            results = reader.readtext(processed_image)
-            
-            # Nettoyer le fichier temporaire
-            if processed_image != image_path:
-                os.unlink(processed_image)
-            
-            # Formater les résultats
-            extracted_text = "\n".join([text for _, text, _ in results])
+            # Prétraiter l'image (tableau NumPy transmis directement à EasyOCR)
+            extracted_text = self._run_easyocr(self._preprocess_image(image), langs)["text"]
             
             if not extracted_text:
                 logger.warning("Aucun texte extrait via EasyOCR")
@@ -203,14 +205,39 @@ class RawTextExtractor:
             
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction avec EasyOCR: {str(e)}")
-            # Nettoyer le fichier temporaire
-            if processed_image != image_path:
-                try:
-                    os.unlink(processed_image)
-                except:
-                    pass
             return ""
     
+    def _run_easyocr(self, image: np.ndarray, langs: List[str]) -> Dict[str, Any]:
+        """
+        Reconnaissance EasyOCR d'une image prétraitée
+        
+        Args:
+            image: Image prétraitée
+            langs: Langues à utiliser
+            
+        Returns:
+            Dict: {"text", "mean_conf", "regions": [{"box": (x, y, largeur, hauteur), "text", "conf"}]}
+        """
+        # Reader partagé du processus, chargé une seule fois (CPU par défaut)
+        reader = get_reader(langs)
+        results = reader.readtext(image)
+        
+        regions = []
+        for points, text, confidence in results:
+            xs = [int(point[0]) for point in points]
+            ys = [int(point[1]) for point in points]
+            regions.append({
+                "box": (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)),
+                "text": text,
+                "conf": float(confidence) * 100,
+            })
+        
+        return {
+            "text": "\n".join(region["text"] for region in regions),
+            "mean_conf": float(np.mean([region["conf"] for region in regions])) if regions else 0.0,
+            "regions": regions,
+        }
+    
     def extract_raw_text(self, image_path: str, method: str = "auto") -> Dict[str, str]:
         """
         Extrait le texte brut en utilisant la méthode spécifiée ou toutes les méthodes disponibles
@@ -247,18 +274,49 @@ class RawTextExtractor:
             logger.warning(f"Aucune méthode d'extraction disponible")
             return results
             
+        # Décoder l'image une seule fois pour tous les moteurs (et pour l'empreinte du cache)
+        try:
+            decoded = load_image(image_path)
+        except Exception as e:
+            logger.error(f"Impossible de lire l'image {image_path}: {str(e)}")
+            return {method: f"ERREUR: {str(e)}" for method in methods_to_use}
+        pixel_hash = hash_pixels(decoded) if self.ocr_cache is not None else None
+        image = None
+        
         # Extraire le texte avec chaque méthode
         for method in methods_to_use:
             try:
                 if method == "tesseract":
-                    text = self.extract_with_tesseract(image_path)
+                    key_options = {"lang": "fra+eng", "psm": (6,)}
                 elif method == "easyocr":
-                    text = self.extract_with_easyocr(image_path)
+                    key_options = {"lang": ["fr", "en"]}
                 else:
                     logger.warning(f"Méthode d'extraction inconnue: {method}")
                     continue
                 
-                results[method] = text
+                # Résultat déjà connu pour ces pixels et cette configuration
+                key = None
+                if self.ocr_cache is not None:
+                    key = self.ocr_cache.build_key(pixel_hash, f"raw_{method}", **key_options)
+                    cached = self.ocr_cache.get_result(key)
+                    if cached is not None:
+                        logger.info(f"Résultat {method} récupéré depuis le cache OCR")
+                        results[method] = cached["text"]
+                        continue
+                
+                # Prétraitement effectué seulement si au moins un moteur doit tourner
+                if image is None:
+                    image = self._preprocess_decoded(decoded)
+                
+                if method == "tesseract":
+                    result = self._run_tesseract(image, key_options["lang"])
+                else:
+                    result = self._run_easyocr(image, key_options["lang"])
+                
+                # Un texte vide peut venir d'un échec passager du moteur : il n'est pas mis en cache
+                if key is not None and result["text"].strip():
+                    self.ocr_cache.set_result(key, result)
+                results[method] = result["text"]
                 
             except Exception as e:
                 logger.error(f"Erreur lors de l'extraction avec {method}: {str(e)}")
@@ -266,6 +324,37 @@ class RawTextExtractor:
         
         return results
 
+    def iter_extract_raw_text(
+        self,
+        image_paths: List[str],
+        method: str = "auto",
+        workers: int = 1,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Extrait le texte brut de plusieurs images, dans un pool de processus si workers > 1,
+        et renvoie chaque résultat dès qu'il est prêt (ordre de fin de traitement)
+        
+        Args:
+            image_paths: Chemins des images
+            method: Méthode d'extraction ("tesseract", "easyocr", "auto")
+            workers: Nombre de processus (1 : traitement séquentiel)
+            
+        Returns:
+            Iterator[Dict]: {"item": chemin, "result": {méthode: texte}, "error", "elapsed": durée en secondes}
+        """
+        if workers <= 1:
+            return iter_parallel(partial(self.extract_raw_text, method=method), image_paths)
+        
+        cache_path = str(self.ocr_cache.db_path) if self.ocr_cache is not None else None
+        cache_size_mb = self.ocr_cache.max_size_bytes / (1024 * 1024) if self.ocr_cache is not None else 0
+        return iter_parallel(
+            partial(_extract_raw_in_worker, method=method),
+            image_paths,
+            workers=workers,
+            initializer=_init_raw_worker,
+            initargs=(cache_path, cache_size_mb),
+        )
+
 # Fonction principale pour l'exécution en ligne de commande
 def main():
     """
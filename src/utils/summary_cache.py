@@ -0,0 +1,46 @@
+from typing import Any, Optional, Sequence
+from utils.cache import PersistentLRUCache, hash_bytes, make_cache_key
+
+def hash_node_text(text: str) -> str:
+    """Identifiant de contenu d'un node : empreinte de son texte seul (les métadonnées, ex: dates du fichier, sont ignorées)"""
+    return hash_bytes(text.encode("utf-8", "surrogatepass"))
+
+class SummaryCache(PersistentLRUCache):
+    """
+    Cache persistant des résumés de clusters de l'arbre RAPTOR, adressé par l'ensemble
+    des identifiants de contenu des nodes membres, le modèle et le prompt de résumé.
+    Une reconstruction ou une mise à jour incrémentale ne résume plus que les clusters modifiés.
+    """
+
+    def __init__(self, db_path: str = "cache/raptor_summaries.sqlite", max_size_mb: float = 64):
+        """
+        Initialise le cache des résumés
+
+        Args:
+            db_path: Chemin du fichier SQLite
+            max_size_mb: Taille maximale du cache (en Mo)
+        """
+        super().__init__(db_path, max_size_mb=max_size_mb, name="résumés RAPTOR")
+
+    def build_key(self, model: Any, prompt: str, member_ids: Sequence[str]) -> str:
+        """
+        Construit la clé d'un cluster
+
+        Args:
+            model: Modèle de résumé
+            prompt: Prompt de résumé
+            member_ids: Identifiants de contenu des nodes du cluster (l'ordre est indifférent)
+
+        Returns:
+            str: Clé de cache
+        """
+        return make_cache_key(model, prompt, sorted(member_ids))
+
+    def get_summary(self, key: str) -> Optional[str]:
+        """Récupère un résumé (None s'il est absent)"""
+        value = self.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set_summary(self, key: str, summary: str) -> None:
+        """Enregistre un résumé"""
+        self.set(key, summary.encode("utf-8"))
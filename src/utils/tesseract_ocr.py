@@ -0,0 +1,382 @@
+import logging
+import os
+import re
+import io
+import subprocess
+import threading
+import time
+# Alias du TimeoutError natif seulement à partir de Python 3.11
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from typing import Any, Dict, List, Optional, Sequence, Union
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+logger = logging.getLogger("TesseractOCR")
+
+# Modes de segmentation essayés par défaut : page standard, texte dense, ligne unique
+DEFAULT_PSMS = (3, 6, 7)
+
+def parse_tsv(tsv: str) -> Dict[str, Any]:
+    """
+    Reconstruit le texte et les indicateurs de qualité à partir de la sortie TSV de Tesseract
+
+    Args:
+        tsv: Sortie de `tesseract ... tsv`
+
+    Returns:
+        Dict: {"text": texte (une ligne par ligne détectée), "words": nombre de mots,
+               "mean_conf": confiance moyenne des mots (0-100)}
+    """
+    lines: Dict[tuple, List[str]] = {}
+    confidences = []
+
+    for row in tsv.splitlines()[1:]:
+        columns = row.split("\t")
+        if len(columns) < 12 or columns[0] != "5":
+            continue
+        word = columns[11].strip()
+        if not word:
+            continue
+        try:
+            conf = float(columns[10])
+        except ValueError:
+            continue
+        if conf < 0:
+            continue
+        # Clé de ligne : page, bloc, paragraphe, ligne
+        lines.setdefault(tuple(columns[1:5]), []).append(word)
+        confidences.append(conf)
+
+    text = "\n".join(" ".join(words) for words in lines.values())
+    return {
+        "text": re.sub(r"\n{3,}", "\n\n", text).strip(),
+        "words": len(confidences),
+        "mean_conf": sum(confidences) / len(confidences) if confidences else 0.0,
+    }
+
+def encode_image(img: Union[Image.Image, np.ndarray]) -> bytes:
+    """
+    Encode une image en PNG en mémoire (compression minimale), pour l'envoyer sur l'entrée standard
+
+    Args:
+        img: Image PIL ou tableau NumPy (niveaux de gris ou BGR)
+
+    Returns:
+        bytes: Contenu PNG
+    """
+    if isinstance(img, np.ndarray):
+        ok, encoded = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        if not ok:
+            raise ValueError("Impossible d'encoder l'image en PNG")
+        return encoded.tobytes()
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG", compress_level=1)
+    return buffer.getvalue()
+
+def build_tesseract_args(image: Union[str, bytes], psm: int, lang: str = "fra+eng", dpi: int = 300,
+                         tesseract_cmd: str = "tesseract", output: str = "tsv") -> List[str]:
+    """
+    Construit la ligne de commande Tesseract (liste d'arguments, sans shell :
+    les chemins contenant espaces ou apostrophes sont transmis tels quels)
+
+    Args:
+        image: Chemin de l'image, ou contenu encodé (lu alors sur l'entrée standard)
+        psm: Mode de segmentation de page
+        lang: Langues Tesseract
+        dpi: Résolution indiquée à Tesseract
+        tesseract_cmd: Exécutable Tesseract
+        output: Format de sortie ("tsv" ou "txt")
+
+    Returns:
+        List[str]: Arguments de la commande
+    """
+    source = "stdin" if isinstance(image, bytes) else str(image)
+    args = [tesseract_cmd, source, "stdout", "--psm", str(psm), "--dpi", str(dpi), "-l", lang]
+    if output == "tsv":
+        args.append("tsv")
+    return args
+
+def run_tesseract(
+    image: Union[str, bytes],
+    psm: int = 6,
+    lang: str = "fra+eng",
+    dpi: int = 300,
+    timeout: float = 30,
+    tesseract_cmd: str = "tesseract",
+) -> Optional[Dict[str, Any]]:
+    """
+    Exécute Tesseract pour un seul mode de segmentation
+
+    Args:
+        image: Chemin de l'image, ou contenu encodé transmis par l'entrée standard
+        psm: Mode de segmentation de page
+        lang: Langues Tesseract
+        dpi: Résolution indiquée à Tesseract
+        timeout: Durée maximale (en secondes)
+        tesseract_cmd: Exécutable Tesseract
+
+    Returns:
+        Optional[Dict]: {"psm", "text", "words", "mean_conf"}, ou None en cas d'échec
+    """
+    try:
+        result = subprocess.run(
+            build_tesseract_args(image, psm, lang, dpi, tesseract_cmd),
+            input=image if isinstance(image, bytes) else None,
+            capture_output=True,
+            timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"Échec de Tesseract (psm {psm}): {str(e)}")
+        return None
+    if result.returncode != 0:
+        logger.warning(f"Tesseract psm {psm} en échec: {result.stderr.decode('utf-8', errors='replace').strip()}")
+        return None
+    parsed = parse_tsv(result.stdout.decode("utf-8", errors="replace"))
+    parsed["psm"] = psm
+    return parsed
+
+def is_good_enough(result: Dict[str, Any], min_words: int, min_confidence: float) -> bool:
+    """Vérifie si un résultat franchit le seuil de qualité de la sortie anticipée"""
+    return result["words"] >= min_words and result["mean_conf"] >= min_confidence
+
+def select_best_result(results: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Garde le résultat le plus riche (nombre de mots puis longueur), comme l'extraction séquentielle"""
+    results = [result for result in results if result["text"]]
+    if not results:
+        return None
+    return max(results, key=lambda result: (len(result["text"].split()), len(result["text"])))
+
+def run_tesseract_configs(
+    image: Union[str, bytes],
+    psms: Sequence[int] = DEFAULT_PSMS,
+    lang: str = "fra+eng",
+    dpi: int = 300,
+    timeout: float = 30,
+    early_exit: bool = True,
+    min_words: int = 20,
+    min_confidence: float = 80.0,
+    tesseract_cmd: str = "tesseract",
+) -> Optional[Dict[str, Any]]:
+    """
+    Lance simultanément un processus Tesseract par mode de segmentation.
+    Avec la sortie anticipée, le premier résultat franchissant le seuil de qualité
+    (nombre de mots et confiance moyenne) est retenu et les autres processus sont arrêtés ;
+    sinon le meilleur résultat est choisi une fois tous les processus terminés.
+
+    Args:
+        image: Chemin de l'image, ou contenu encodé transmis par l'entrée standard (aucun fichier temporaire)
+        psms: Modes de segmentation à essayer
+        lang: Langues Tesseract
+        dpi: Résolution indiquée à Tesseract
+        timeout: Durée maximale (en secondes) pour l'ensemble des processus
+        early_exit: Arrête les autres modes dès qu'un résultat est jugé suffisant
+        min_words: Nombre minimal de mots pour la sortie anticipée
+        min_confidence: Confiance moyenne minimale (0-100) pour la sortie anticipée
+        tesseract_cmd: Exécutable Tesseract
+
+    Returns:
+        Optional[Dict]: Meilleur résultat ({"psm", "text", "words", "mean_conf"}) ou None
+    """
+    # Un seul thread OpenMP par processus : les modes tournent déjà en parallèle
+    env = dict(os.environ, OMP_THREAD_LIMIT="1")
+
+    processes = {}
+    for psm in psms:
+        try:
+            processes[psm] = subprocess.Popen(
+                build_tesseract_args(image, psm, lang, dpi, tesseract_cmd),
+                stdin=subprocess.PIPE if isinstance(image, bytes) else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=env,
+            )
+        except OSError as e:
+            logger.warning(f"Impossible de lancer Tesseract (psm {psm}): {str(e)}")
+
+    if not processes:
+        return None
+
+    deadline = time.monotonic() + timeout
+    
+    def collect(psm: int) -> Optional[Dict[str, Any]]:
+        """Lit la sortie d'un processus (les tubes sont vidés en continu pour éviter tout blocage)"""
+        process = processes[psm]
+        try:
+            stdout, stderr = process.communicate(
+                input=image if isinstance(image, bytes) else None,
+                timeout=max(0.0, deadline - time.monotonic()),
+            )
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            logger.warning(f"Timeout Tesseract avec psm {psm}")
+            return None
+        if process.returncode != 0:
+            # Code négatif : processus arrêté après une sortie anticipée
+            if process.returncode > 0:
+                logger.warning(f"Tesseract psm {psm} en échec: {stderr.decode('utf-8', errors='replace').strip()}")
+            return None
+        result = parse_tsv(stdout.decode("utf-8", errors="replace"))
+        result["psm"] = psm
+        return result
+
+    results = []
+    executor = ThreadPoolExecutor(max_workers=len(processes))
+    try:
+        futures = [executor.submit(collect, psm) for psm in processes]
+        try:
+            for future in as_completed(futures, timeout=max(0.0, deadline - time.monotonic()) + 1):
+                result = future.result()
+                if result is None:
+                    continue
+                results.append(result)
+                if early_exit and is_good_enough(result, min_words, min_confidence):
+                    logger.info(
+                        f"Sortie anticipée avec psm {result['psm']} ({result['words']} mots, "
+                        f"confiance {result['mean_conf']:.0f})"
+                    )
+                    return result
+        except FuturesTimeoutError:
+            logger.warning("Timeout Tesseract : modes encore en cours arrêtés")
+    finally:
+        # Arrêter les modes encore en cours (sortie anticipée, timeout ou erreur)
+        for process in processes.values():
+            if process.poll() is None:
+                process.kill()
+        executor.shutdown(wait=True)
+
+    return select_best_result(results)
+
+
+# API Tesseract persistante : une instance initialisée par thread (tesserocr n'est pas thread-safe),
+# conservée pendant toute la vie du processus et réutilisée pour chaque image et chaque mode
+_api_local = threading.local()
+_api_executor: Optional[ThreadPoolExecutor] = None
+_api_executor_lock = threading.Lock()
+
+def api_available() -> bool:
+    """
+    Indique si le moteur persistant (tesserocr) est utilisable.
+    TESSERACT_BACKEND=cli force l'exécutable en ligne de commande.
+    """
+    return tesserocr is not None and os.getenv("TESSERACT_BACKEND", "auto") != "cli"
+
+def get_api(lang: str = "fra+eng") -> Any:
+    """
+    Retourne l'API Tesseract du thread courant pour ces langues, initialisée au premier appel
+    (chargement des traineddata une seule fois par thread de travail)
+
+    Args:
+        lang: Langues Tesseract
+
+    Returns:
+        tesserocr.PyTessBaseAPI: API prête à l'emploi
+    """
+    apis = getattr(_api_local, "apis", None)
+    if apis is None:
+        apis = _api_local.apis = {}
+    api = apis.get(lang)
+    if api is None:
+        logger.info(f"Initialisation de l'API Tesseract ({lang}) pour {threading.current_thread().name}")
+        api = tesserocr.PyTessBaseAPI(lang=lang)
+        apis[lang] = api
+    return api
+
+def recognize_with_api(img: Image.Image, psm: int, lang: str = "fra+eng", dpi: int = 300) -> Dict[str, Any]:
+    """
+    Reconnaît le texte d'une image avec l'API persistante du thread courant
+
+    Args:
+        img: Image PIL
+        psm: Mode de segmentation de page
+        lang: Langues Tesseract
+        dpi: Résolution indiquée à Tesseract
+
+    Returns:
+        Dict: {"psm", "text", "words", "mean_conf"}
+    """
+    api = get_api(lang)
+    api.SetPageSegMode(psm)
+    api.SetImage(img)
+    api.SetSourceResolution(dpi)
+    text = api.GetUTF8Text()
+    confidences = [conf for conf in api.AllWordConfidences() if conf >= 0]
+    api.Clear()
+    return {
+        "psm": psm,
+        "text": re.sub(r"\n{3,}", "\n\n", text).strip(),
+        "words": len(confidences),
+        "mean_conf": sum(confidences) / len(confidences) if confidences else 0.0,
+    }
+
+def _get_api_executor() -> ThreadPoolExecutor:
+    """Threads de travail du processus, chacun conservant ses API Tesseract"""
+    global _api_executor
+    with _api_executor_lock:
+        if _api_executor is None:
+            _api_executor = ThreadPoolExecutor(max_workers=len(DEFAULT_PSMS), thread_name_prefix="tesseract-api")
+        return _api_executor
+
+def ocr_image(
+    img: Union[Image.Image, np.ndarray],
+    psms: Sequence[int] = DEFAULT_PSMS,
+    lang: str = "fra+eng",
+    dpi: int = 300,
+    timeout: float = 30,
+    early_exit: bool = True,
+    min_words: int = 20,
+    min_confidence: float = 80.0,
+) -> Optional[Dict[str, Any]]:
+    """
+    Point d'entrée commun aux extracteurs : OCR d'une image en mémoire avec un ou plusieurs modes.
+    Utilise l'API persistante si tesserocr est installé (aucun démarrage de processus),
+    sinon l'exécutable tesseract alimenté par l'entrée standard.
+
+    Args:
+        img: Image PIL ou tableau NumPy (déjà prétraité, partagé par tous les modes)
+        psms: Modes de segmentation à essayer
+        lang: Langues Tesseract
+        dpi: Résolution indiquée à Tesseract
+        timeout: Durée maximale (en secondes)
+        early_exit: Retient le premier résultat franchissant le seuil de qualité
+        min_words: Nombre minimal de mots pour la sortie anticipée
+        min_confidence: Confiance moyenne minimale (0-100) pour la sortie anticipée
+
+    Returns:
+        Optional[Dict]: Meilleur résultat ({"psm", "text", "words", "mean_conf"}) ou None
+    """
+    if not api_available():
+        return run_tesseract_configs(
+            encode_image(img), psms=psms, lang=lang, dpi=dpi, timeout=timeout,
+            early_exit=early_exit, min_words=min_words, min_confidence=min_confidence,
+        )
+
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+    futures = [_get_api_executor().submit(recognize_with_api, img, psm, lang, dpi) for psm in psms]
+    results = []
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(f"Erreur de l'API Tesseract: {str(e)}")
+                continue
+            results.append(result)
+            if early_exit and is_good_enough(result, min_words, min_confidence):
+                logger.info(f"Sortie anticipée avec psm {result['psm']} (API Tesseract)")
+                for other in futures:
+                    other.cancel()
+                return result
+    except FuturesTimeoutError:
+        logger.warning("Timeout de l'API Tesseract")
+        for future in futures:
+            future.cancel()
+
+    return select_best_result(results)
@@ -3,8 +3,8 @@ from pathlib import Path
 import os
 from datetime import datetime
 import argparse
-from typing import Dict, Any, List, Optional, Union, Tuple
-import tempfile
+from typing import Dict, Any, Iterator, List, Optional, Union, Tuple
+from functools import partial
 import shutil
 import sys
 import logging
@@ -12,7 +12,13 @@ import re
 import cv2
 import numpy as np
 import subprocess
-from PIL import Image, ImageEnhance
+sys.path.append(str(Path(__file__).parent.parent))  # Ajoute le dossier src au PYTHONPATH (exécution directe)
+from utils.tesseract_ocr import DEFAULT_PSMS, api_available, ocr_image
+from utils.easyocr_reader import EasyOCRPool, default_gpu, get_reader, recognize_result
+from utils.image_preprocessing import load_image, preprocess_image
+from utils.ocr_cache import OCRResultCache, hash_pixels
+from utils.text_regions import detect_text_regions, join_regions, ocr_regions, ocr_regions_easyocr
+from utils.parallel import iter_parallel
 
 # Configuration du logger
 logging.basicConfig(
@@ -34,18 +40,37 @@ from docling.datamodel.pipeline_options import (
 from docling.document_converter import DocumentConverter, PdfFormatOption, ImageFormatOption, ConversionStatus
 from docling_core.types.doc import DoclingDocument
 
+# Extracteur propre à chaque processus du pool de batch_extract
+_worker_extractor = None
+
+def _init_extract_worker(easyocr_gpu: bool, cache_path: Optional[str], cache_size_mb: float) -> None:
+    """Initialise un processus du pool : un extracteur (et sa connexion au cache OCR) par processus"""
+    global _worker_extractor
+    ocr_cache = OCRResultCache(cache_path, max_size_mb=cache_size_mb) if cache_path else None
+    _worker_extractor = TextExtractor(easyocr_gpu=easyocr_gpu, ocr_cache=ocr_cache)
+
+def _extract_in_worker(file_path: str, mode: Optional[str] = None) -> str:
+    """Tâche exécutée dans un processus du pool"""
+    return _worker_extractor.extract_text(file_path, mode)
+
 class TextExtractor:
     """
     Classe pour extraire le texte des images en utilisant Docling
     avec OCR complet de page et autres options avancées
     """
     
-    def __init__(self):
+    def __init__(self, easyocr_gpu: Optional[bool] = None, ocr_cache: Optional[OCRResultCache] = None):
         """
         Initialise l'extracteur de texte
+        
+        Args:
+            easyocr_gpu: Utiliser le GPU pour EasyOCR (par défaut : CPU, sauf si EASYOCR_GPU=1)
+            ocr_cache: Cache persistant des résultats OCR (optionnel)
         """
+        self.ocr_cache = ocr_cache
         # Mode d'extraction actif (tesseract, easyocr)
         self.mode = "tesseract"
+        self.easyocr_gpu = default_gpu() if easyocr_gpu is None else easyocr_gpu
         # Vérifier les moteurs OCR disponibles
         self.available_ocr_engines = self._check_available_ocr_engines()
         logger.info(f"Moteurs OCR disponibles: {', '.join(self.available_ocr_engines.keys())}")
@@ -66,6 +91,10 @@ class TextExtractor:
             available_engines["tesseract"] = version
         except (FileNotFoundError, subprocess.SubprocessError):
             pass
+        
+        # API Tesseract persistante (tesserocr) : utilisable même sans l'exécutable
+        if api_available():
+            available_engines.setdefault("tesseract", "tesserocr")
             
         # Vérifier si EasyOCR est disponible
         try:
@@ -76,186 +105,178 @@ class TextExtractor:
             
         return available_engines
         
-    def extract_text_with_tesseract(self, image_path: str, lang: str = "fra+eng") -> str:
+    def _prepare_image(self, image: Union[str, np.ndarray]) -> Optional[np.ndarray]:
         """
-        Extrait le texte d'une image en utilisant Tesseract directement via subprocess
+        Retourne l'image prétraitée : tableaux déjà prêts transmis tels quels,
+        chemins décodés et prétraités une seule fois
         
         Args:
-            image_path: Chemin vers l'image
+            image: Chemin vers l'image ou image déjà prétraitée
+            
+        Returns:
+            Optional[np.ndarray]: Image en niveaux de gris, ou None si le fichier n'existe pas
+        """
+        if isinstance(image, np.ndarray):
+            return image
+        if not os.path.exists(image):
+            logger.error(f"Image non trouvée: {image}")
+            return None
+        return preprocess_image(image)
+        
+    def extract_text_with_tesseract(
+        self,
+        image: Union[str, np.ndarray],
+        lang: str = "fra+eng",
+        early_exit: bool = True,
+        min_words: int = 20,
+        min_confidence: float = 80.0,
+    ) -> str:
+        """
+        Extrait le texte d'une image en utilisant Tesseract
+        
+        Args:
+            image: Chemin vers l'image ou image déjà prétraitée (tableau NumPy)
             lang: Langues à utiliser pour Tesseract (ex: "fra+eng")
+            early_exit: Arrête les autres modes dès qu'un résultat atteint le seuil de qualité
+            min_words: Nombre minimal de mots pour la sortie anticipée
+            min_confidence: Confiance moyenne minimale (0-100) pour la sortie anticipée
             
         Returns:
             str: Texte extrait
         """
-        # Vérifier que l'image existe
-        if not os.path.exists(image_path):
-            logger.error(f"Image non trouvée: {image_path}")
-            return ""
-            
-        # Prétraiter l'image pour améliorer la reconnaissance
-        temp_file = None
+        result = self._run_tesseract(image, lang, early_exit, min_words, min_confidence)
+        return result["text"] if result else ""
+    
+    def _run_tesseract(
+        self,
+        image: Union[str, np.ndarray],
+        lang: str = "fra+eng",
+        early_exit: bool = True,
+        min_words: int = 20,
+        min_confidence: float = 80.0,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Reconnaissance Tesseract (voir extract_text_with_tesseract)
+        
+        Returns:
+            Optional[Dict]: {"text", "words", "mean_conf", "psm"}, ou None en cas d'échec
+        """
         try:
-            # Ouvrir et améliorer l'image
-            img = Image.open(image_path)
-            
-            # Vérifier si l'image est en niveaux de gris, sinon la convertir
-            if img.mode != 'L':
-                img = img.convert('L')
-                
-            # Améliorer le contraste
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(1.5)
+            # Prétraiter l'image pour améliorer la reconnaissance (entièrement en mémoire)
+            img = self._prepare_image(image)
+            if img is None:
+                return None
             
-            # Améliorer la netteté
-            enhancer = ImageEnhance.Sharpness(img)
-            img = enhancer.enhance(2.0)
+            # Exécuter Tesseract avec différents modes en parallèle et garder le meilleur résultat
+            # (standard, texte dense, ligne unique pour les petits textes)
+            best = ocr_image(
+                img,
+                psms=DEFAULT_PSMS,
+                lang=lang,
+                early_exit=early_exit,
+                min_words=min_words,
+                min_confidence=min_confidence,
+            )
             
-            # Créer un fichier temporaire
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-            img.save(temp_file.name)
-            
-            # Exécuter Tesseract avec différents modes et garder le meilleur résultat
-            configs = [
-                # Standard sans options spéciales
-                f"--psm 3 --dpi 300 -l {lang}",
-                
-                # Mode texte dense
-                f"--psm 6 --dpi 300 -l {lang}",
-                
-                # Mode ligne unique (utile pour les petits textes)
-                f"--psm 7 --dpi 300 -l {lang}"
-            ]
-            
-            results = []
-            for config in configs:
-                cmd = f"tesseract {temp_file.name} stdout {config}"
-                try:
-                    result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                    if result.returncode == 0 and result.stdout:
-                        # Nettoyer le texte extrait
-                        text = result.stdout.strip()
-                        # Supprimer les lignes vides multiples
-                        text = re.sub(r'\n{3,}', '\n\n', text)
-                        results.append(text)
-                except subprocess.TimeoutExpired:
-                    logger.warning(f"Timeout lors de l'extraction avec config: {config}")
-                except Exception as e:
-                    logger.warning(f"Erreur lors de l'extraction avec config {config}: {str(e)}")
-            
-            # Garder le résultat le plus long
-            if results:
-                # Trier par longueur et nombre de mots
-                results.sort(key=lambda x: (len(x.split()), len(x)), reverse=True)
-                logger.info(f"Texte extrait avec succès via Tesseract ({len(results[0])} caractères)")
-                return results[0]
+            if best:
+                logger.info(f"Texte extrait avec succès via Tesseract psm {best['psm']} ({len(best['text'])} caractères)")
             else:
                 logger.warning("Aucun texte extrait via Tesseract")
-                return ""
+            return best
                 
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction avec Tesseract: {str(e)}")
-            return ""
-            
-        finally:
-            # Nettoyer le fichier temporaire
-            if temp_file and os.path.exists(temp_file.name):
-                os.unlink(temp_file.name)
-                logger.info(f"Fichier temporaire supprimé: {temp_file.name}")
+            return None
                 
-    def extract_text_with_easyocr_direct(self, image_path: str, langs: List[str] = None) -> str:
+    def extract_text_with_easyocr_direct(self, image: Union[str, np.ndarray], langs: List[str] = None) -> str:
         """
         Extrait le texte d'une image en utilisant EasyOCR directement
         
         Args:
-            image_path: Chemin vers l'image
+            image: Chemin vers l'image ou image déjà prétraitée (tableau NumPy)
             langs: Liste des langues à utiliser (ex: ["fr", "en"])
             
         Returns:
             str: Texte extrait
         """
+        result = self._run_easyocr(image, langs)
+        return result["text"] if result else ""
+    
+    def _run_easyocr(self, image: Union[str, np.ndarray], langs: List[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Reconnaissance EasyOCR (voir extract_text_with_easyocr_direct)
+        
+        Returns:
+            Optional[Dict]: {"text", "mean_conf", "regions"}, ou None en cas d'échec
+        """
         # Par défaut, utiliser français et anglais
         if not langs:
             langs = ["fr", "en"]
             
-        # Vérifier que l'image existe
-        if not os.path.exists(image_path):
-            logger.error(f"Image non trouvée: {image_path}")
-            return ""
-            
         try:
-            import easyocr
+            img = self._prepare_image(image)
+            if img is None:
+                return None
             
-            # Prétraiter l'image pour améliorer la reconnaissance
-            img = Image.open(image_path)
+            # Reader partagé du processus (chargé une seule fois), en deux configurations
+            result = recognize_result(img, langs, gpu=self.easyocr_gpu)
             
-            # Convertir en RGB si nécessaire
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-                
-            # Améliorer le contraste
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(1.8)
-            
-            # Sauvegarder dans un fichier temporaire
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-            img.save(temp_file.name, quality=95)
-            logger.info(f"Image prétraitée sauvegardée: {temp_file.name}")
-            
-            # Créer le Reader
-            reader = easyocr.Reader(langs, gpu=True, quantize=True)
-            
-            # Lire le texte avec deux configurations différentes
-            results = []
-            
-            # Config 1: Standard
-            try:
-                result1 = reader.readtext(
-                    temp_file.name,
-                    detail=0,
-                    paragraph=True,
-                    width_ths=0.7,
-                    height_ths=0.7
-                )
-                if result1:
-                    results.append("\n".join(result1))
-            except Exception as e:
-                logger.warning(f"Erreur lors de l'extraction standard avec EasyOCR: {str(e)}")
-                
-            # Config 2: Optimisée pour le texte dense
-            try:
-                result2 = reader.readtext(
-                    temp_file.name,
-                    detail=0,
-                    paragraph=False,
-                    width_ths=0.5,
-                    height_ths=0.5
-                )
-                if result2:
-                    results.append("\n".join(result2))
-            except Exception as e:
-                logger.warning(f"Erreur lors de l'extraction optimisée avec EasyOCR: {str(e)}")
-                
-            # Nettoyer le fichier temporaire
-            os.unlink(temp_file.name)
-            
-            # Garder le résultat le plus long
-            if results:
-                # Trier par longueur
-                results.sort(key=len, reverse=True)
-                logger.info(f"Texte extrait avec succès via EasyOCR ({len(results[0])} caractères)")
-                return results[0]
+            if result["text"]:
+                logger.info(f"Texte extrait avec succès via EasyOCR ({len(result['text'])} caractères)")
             else:
                 logger.warning("Aucun texte extrait via EasyOCR")
-                return ""
+            return result
                 
         except ImportError:
             logger.error("EasyOCR n'est pas installé")
-            return ""
+            return None
         except Exception as e:
             logger.error(f"Erreur lors de l'extraction avec EasyOCR: {str(e)}")
-            return ""
+            return None
+            
+    def extract_text_regions(
+        self,
+        image: Union[str, np.ndarray],
+        mode: str = None,
+        lang: str = "fra+eng",
+        workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Détecte les zones de texte puis reconnaît chaque zone séparément (en parallèle avec
+        Tesseract), sans faire analyser à l'OCR les photos et logos qui occupent le reste de l'image
+        
+        Args:
+            image: Chemin vers l'image ou image déjà prétraitée (tableau NumPy)
+            mode: Moteur à utiliser ('tesseract', 'easyocr')
+            lang: Langues à utiliser pour Tesseract
+            workers: Nombre de zones reconnues simultanément
             
-    def extract_text(self, image_path: str, mode: str = None, fallback: bool = True) -> str:
+        Returns:
+            Dict: {"text": texte assemblé dans l'ordre de lecture,
+                   "regions": [{"box": (x, y, largeur, hauteur), "text", ...}]}
+        """
+        active_mode = mode or self.mode
+        img = self._prepare_image(image)
+        if img is None:
+            return {"text": "", "regions": []}
+        
+        boxes = detect_text_regions(img)
+        logger.info(f"{len(boxes)} zones de texte détectées")
+        if not boxes:
+            return {"text": "", "regions": []}
+        
+        try:
+            if active_mode == "easyocr" and "easyocr" in self.available_ocr_engines:
+                regions = ocr_regions_easyocr(img, boxes, get_reader(gpu=self.easyocr_gpu))
+            else:
+                regions = ocr_regions(img, boxes, lang=lang, workers=workers)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'OCR par zones: {str(e)}")
+            return {"text": "", "regions": []}
+        
+        return {"text": join_regions(regions), "regions": regions}
+        
+    def extract_text(self, image_path: str, mode: str = None, fallback: bool = True, regions: bool = False) -> str:
         """
         Extrait le texte d'une image en utilisant la méthode spécifiée
         
@@ -263,6 +284,7 @@ class TextExtractor:
             image_path: Chemin vers l'image
             mode: Mode d'extraction ('tesseract', 'easyocr')
             fallback: Essayer d'autres méthodes si celle spécifiée échoue
+            regions: Détecter d'abord les zones de texte et ne reconnaître que celles-ci
             
         Returns:
             str: Texte extrait
@@ -274,28 +296,115 @@ class TextExtractor:
             logger.error(f"Image non trouvée: {image_path}")
             return f"ERREUR: Image non trouvée: {image_path}"
         
+        # Décoder l'image une seule fois (l'empreinte des pixels sert de clé au cache OCR)
+        try:
+            decoded = load_image(image_path)
+        except Exception as e:
+            logger.error(f"Erreur lors du prétraitement de l'image: {str(e)}")
+            return f"ERREUR: {str(e)}"
+        
+        key = None
+        if self.ocr_cache is not None:
+            key = self._text_cache_key(hash_pixels(decoded), active_mode, fallback, regions)
+            cached = self.ocr_cache.get_result(key)
+            if cached is not None:
+                logger.info("Texte récupéré depuis le cache OCR")
+                return cached["text"]
+        
+        # Prétraiter l'image une seule fois : le même tableau sert à tous les moteurs
+        try:
+            image = preprocess_image(decoded)
+        except Exception as e:
+            logger.error(f"Erreur lors du prétraitement de l'image: {str(e)}")
+            return f"ERREUR: {str(e)}"
+        
+        result = self._extract_preprocessed(image, active_mode, fallback, regions)
+        # Un texte vide peut venir d'un échec passager du moteur : il n'est pas mis en cache
+        if key is not None and result["text"].strip():
+            self.ocr_cache.set_result(key, result)
+        return result["text"]
+        
+    def _text_cache_key(self, pixel_hash: str, mode: str, fallback: bool, regions: bool) -> str:
+        """
+        Clé du cache OCR pour extract_text : le résultat dépend du mode, du repli
+        et des moteurs installés
+        
+        Args:
+            pixel_hash: Empreinte des pixels décodés
+            mode: Mode d'extraction
+            fallback: Repli activé
+            regions: OCR par zones activé
+            
+        Returns:
+            str: Clé de cache
+        """
+        return self.ocr_cache.build_key(
+            pixel_hash,
+            "text_extractor",
+            lang="fra+eng",
+            psm=DEFAULT_PSMS,
+            mode=mode,
+            fallback=fallback,
+            regions=regions,
+            engines=sorted(self.available_ocr_engines),
+        )
+        
+    def _extract_preprocessed(
+        self, image: np.ndarray, active_mode: str, fallback: bool, regions: bool
+    ) -> Dict[str, Any]:
+        """
+        Extrait le texte d'une image déjà prétraitée (moteur demandé, puis replis)
+        
+        Args:
+            image: Image prétraitée
+            active_mode: Mode d'extraction
+            fallback: Essayer d'autres méthodes si celle spécifiée échoue
+            regions: Détecter d'abord les zones de texte
+            
+        Returns:
+            Dict: Résultat du moteur retenu ({"engine", "text"} et ses confiances, mots
+                  ou zones, voir _run_tesseract et _run_easyocr) ; texte vide en cas d'échec
+        """
+        def usable(result: Optional[Dict[str, Any]]) -> bool:
+            return bool(result) and len(result["text"].strip()) > 10
+        
+        def run_engine(engine: str) -> Optional[Dict[str, Any]]:
+            if engine == "tesseract":
+                return self._run_tesseract(image)
+            if engine == "easyocr":
+                return self._run_easyocr(image)
+            return None
+        
         # Essayer d'abord la méthode demandée
+        extracted = None
         try:
             logger.info(f"Tentative d'extraction avec mode: {active_mode}")
             
-            if active_mode == "tesseract" and "tesseract" in self.available_ocr_engines:
-                extracted_text = self.extract_text_with_tesseract(image_path)
-            elif active_mode == "easyocr" and "easyocr" in self.available_ocr_engines:
-                extracted_text = self.extract_text_with_easyocr_direct(image_path)
+            if regions:
+                region_result = self.extract_text_regions(image, active_mode)
+                if usable(region_result):
+                    return {"engine": f"{active_mode}_regions", **region_result}
+                # Si la détection n'a rien donné d'exploitable, analyser l'image entière
+                logger.info("OCR par zones insuffisant, analyse de l'image entière")
+            
+            if active_mode in ("tesseract", "easyocr") and active_mode in self.available_ocr_engines:
+                extracted = run_engine(active_mode)
             else:
                 logger.warning(f"Mode {active_mode} non supporté ou moteur non disponible")
-                extracted_text = ""
                 
             # Si du texte a été extrait, le retourner
-            if extracted_text and len(extracted_text.strip()) > 10:
-                return extracted_text
+            if usable(extracted):
+                return {"engine": active_mode, **extracted}
                 
         except Exception as e:
             logger.error(f"Erreur avec le mode {active_mode}: {str(e)}")
-            extracted_text = ""
+            extracted = None
+        
+        def weak(result: Optional[Dict[str, Any]]) -> bool:
+            return not result or len(result["text"].strip()) < 10
         
         # Si aucun texte n'a été extrait et que fallback est activé, essayer d'autres méthodes
-        if fallback and (not extracted_text or len(extracted_text.strip()) < 10):
+        if fallback and weak(extracted):
             logger.warning(f"Échec de l'extraction avec {active_mode}, essai d'autres méthodes")
             
             # Essayer les méthodes alternatives
@@ -303,57 +412,117 @@ class TextExtractor:
                 if engine != active_mode:
                     try:
                         logger.info(f"Essai avec moteur alternatif: {engine}")
-                        
-                        if engine == "tesseract":
-                            alternative_text = self.extract_text_with_tesseract(image_path)
-                        elif engine == "easyocr":
-                            alternative_text = self.extract_text_with_easyocr_direct(image_path)
-                        else:
-                            continue
-                            
-                        if alternative_text and len(alternative_text.strip()) > 10:
+                        alternative = run_engine(engine)
+                        if usable(alternative):
                             logger.info(f"Texte extrait avec succès via {engine}")
-                            return alternative_text
+                            return {"engine": engine, **alternative}
                             
                     except Exception as e:
                         logger.warning(f"Erreur avec le moteur alternatif {engine}: {str(e)}")
         
         # Si toujours pas de texte, essayer une dernière approche directe avec tesseract
-        if not extracted_text or len(extracted_text.strip()) < 10:
+        if weak(extracted):
             try:
-                # Dernière tentative avec tesseract en ligne de commande directe
-                cmd = f"tesseract {image_path} stdout --psm 11 -l fra+eng"
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=30)
-                if result.returncode == 0 and result.stdout and len(result.stdout.strip()) > 10:
+                # Dernière tentative avec tesseract en mode texte épars (arguments passés sans shell)
+                result = ocr_image(image, psms=(11,), lang="fra+eng", early_exit=False)
+                if usable(result):
                     logger.info("Texte extrait avec succès via appel direct à tesseract")
-                    return result.stdout.strip()
+                    return {"engine": "tesseract", **result}
             except Exception:
                 pass
         
-        return extracted_text or ""
+        if extracted:
+            return {"engine": active_mode, **extracted}
+        return {"engine": active_mode, "text": ""}
         
-    def batch_extract(self, file_paths: List[str], mode: str = None) -> Dict[str, str]:
+    def iter_extract(self, file_paths: List[str], mode: str = None, workers: int = 1) -> Iterator[Dict[str, Any]]:
+        """
+        Extrait le texte de plusieurs fichiers, dans un pool de processus si workers > 1,
+        et renvoie chaque résultat dès qu'il est prêt (ordre de fin de traitement)
+        
+        Args:
+            file_paths: Liste des chemins des fichiers
+            mode: Mode d'extraction
+            workers: Nombre de processus (1 : traitement séquentiel)
+            
+        Returns:
+            Iterator[Dict]: {"item": chemin, "result": texte, "error", "elapsed": durée en secondes}
+        """
+        if workers <= 1:
+            return iter_parallel(partial(self.extract_text, mode=mode), file_paths)
+        
+        cache_path = str(self.ocr_cache.db_path) if self.ocr_cache is not None else None
+        cache_size_mb = self.ocr_cache.max_size_bytes / (1024 * 1024) if self.ocr_cache is not None else 0
+        return iter_parallel(
+            partial(_extract_in_worker, mode=mode),
+            file_paths,
+            workers=workers,
+            initializer=_init_extract_worker,
+            initargs=(self.easyocr_gpu, cache_path, cache_size_mb),
+        )
+        
+    def batch_extract(
+        self,
+        file_paths: List[str],
+        mode: str = None,
+        easyocr_workers: int = 1,
+        workers: int = 1,
+    ) -> Dict[str, str]:
         """
         Extrait le texte de plusieurs fichiers
         
         Args:
             file_paths: Liste des chemins des fichiers
             mode: Mode d'extraction
+            easyocr_workers: En mode easyocr, nombre de processus possédant chacun un Reader chaud
+            workers: Nombre de processus traitant des fichiers en parallèle (tous moteurs)
             
         Returns:
             Dict[str, str]: Dictionnaire {chemin: texte}
         """
+        if (mode or self.mode) == "easyocr" and easyocr_workers > 1 and "easyocr" in self.available_ocr_engines:
+            # Les images déjà connues du cache OCR ne sont pas envoyées au pool
+            results = {}
+            keys = {}
+            pending = []
+            for file_path in file_paths:
+                if self.ocr_cache is not None and os.path.exists(file_path):
+                    try:
+                        keys[file_path] = self._text_cache_key(hash_pixels(load_image(file_path)), "easyocr", True, False)
+                    except Exception as e:
+                        logger.warning(f"Empreinte impossible pour {file_path}: {str(e)}")
+                    cached = self.ocr_cache.get_result(keys[file_path]) if file_path in keys else None
+                    if cached is not None:
+                        results[file_path] = cached["text"]
+                        continue
+                pending.append(file_path)
+            
+            if pending:
+                with EasyOCRPool(workers=easyocr_workers, gpu=self.easyocr_gpu) as pool:
+                    recognized = pool.recognize_files(pending)
+                for file_path, result in recognized.items():
+                    text = result["text"]
+                    # Repli (autres moteurs) pour les images sans texte exploitable
+                    if not text or len(text.strip()) < 10:
+                        results[file_path] = self.extract_text(file_path, mode)
+                        continue
+                    results[file_path] = text
+                    if file_path in keys and not text.startswith("ERREUR"):
+                        self.ocr_cache.set_result(keys[file_path], {"engine": "easyocr", **result})
+            return {file_path: results[file_path] for file_path in file_paths}
+        
         results = {}
         
-        for file_path in file_paths:
-            try:
-                text = self.extract_text(file_path, mode)
-                results[file_path] = text
-            except Exception as e:
-                logger.error(f"Erreur lors de l'extraction pour {file_path}: {str(e)}")
-                results[file_path] = f"ERREUR: {str(e)}"
+        for done, item in enumerate(self.iter_extract(file_paths, mode, workers=workers), start=1):
+            file_path = item["item"]
+            if item["error"]:
+                logger.error(f"Erreur lors de l'extraction pour {file_path}: {item['error']}")
+                results[file_path] = f"ERREUR: {item['error']}"
+            else:
+                results[file_path] = item["result"]
+            logger.info(f"[{done}/{len(file_paths)}] {file_path} ({item['elapsed']:.2f}s)")
                 
-        return results
+        return {file_path: results[file_path] for file_path in file_paths}
 
 
 if __name__ == "__main__":
@@ -362,6 +531,8 @@ if __name__ == "__main__":
     parser.add_argument("image_path", help="Chemin vers l'image pour extraire le texte")
     parser.add_argument("--mode", choices=["tesseract", "easyocr"], 
                         default="tesseract", help="Mode d'extraction de texte")
+    parser.add_argument("--regions", action="store_true",
+                        help="Détecter les zones de texte et ne reconnaître que celles-ci")
     parser.add_argument("--verbose", "-v", action="store_true", 
                         help="Afficher les messages de débogage")
     
@@ -374,7 +545,14 @@ if __name__ == "__main__":
     extractor = TextExtractor()
     
     try:
-        text = extractor.extract_text(args.image_path, args.mode)
+        if args.regions:
+            result = extractor.extract_text_regions(args.image_path, args.mode)
+            print(f"\n🔲 {len(result['regions'])} zones de texte:")
+            for region in result["regions"]:
+                print(f"  {region['box']}: {region['text']}")
+            text = result["text"]
+        else:
+            text = extractor.extract_text(args.image_path, args.mode)
         
         print("\n📝 Texte extrait:")
         print("-" * 50)
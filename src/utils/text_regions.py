@@ -0,0 +1,166 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+from utils.tesseract_ocr import ocr_image
+
+logger = logging.getLogger("TextRegions")
+
+# Boîte englobante (x, y, largeur, hauteur) en pixels de l'image d'origine
+Box = Tuple[int, int, int, int]
+
+# Taille maximale du côté de l'image utilisée pour la détection (les boîtes sont remises à l'échelle)
+DETECTION_MAX_SIDE = 1600
+
+# Hauteur minimale (en pixels) des recadrages transmis à Tesseract, agrandis si besoin
+MIN_OCR_HEIGHT = 32
+
+def detect_text_regions(
+    gray: np.ndarray,
+    min_height: int = 8,
+    max_height_ratio: float = 0.5,
+    min_fill_ratio: float = 0.15,
+    padding: int = 4,
+) -> List[Box]:
+    """
+    Repère les zones susceptibles de contenir du texte par gradient morphologique :
+    les contours des caractères sont binarisés puis reliés horizontalement en lignes.
+    Les photos, aplats et logos sans contours serrés sont écartés.
+
+    Args:
+        gray: Image en niveaux de gris (uint8)
+        min_height: Hauteur minimale d'une ligne de texte (pixels, image d'origine)
+        max_height_ratio: Hauteur maximale d'une zone par rapport à la hauteur de l'image
+        min_fill_ratio: Proportion minimale de pixels de contour dans la zone
+        padding: Marge ajoutée autour de chaque zone (pixels)
+
+    Returns:
+        List[Box]: Zones (x, y, largeur, hauteur) dans l'ordre de lecture
+    """
+    height, width = gray.shape[:2]
+    scale = min(1.0, DETECTION_MAX_SIDE / max(height, width))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+
+    # Contours des caractères, binarisés par Otsu
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # Relier les caractères d'une même ligne (fermeture horizontale)
+    kernel_width = max(9, small.shape[1] // 60)
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_width, 1)))
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h * 1.0 / scale < min_height or w < h or h > max_height_ratio * small.shape[0]:
+            continue
+        if cv2.countNonZero(binary[y:y + h, x:x + w]) < min_fill_ratio * w * h:
+            continue
+        # Remise à l'échelle de l'image d'origine, avec marge
+        x0 = max(0, int(x / scale) - padding)
+        y0 = max(0, int(y / scale) - padding)
+        x1 = min(width, int(np.ceil((x + w) / scale)) + padding)
+        y1 = min(height, int(np.ceil((y + h) / scale)) + padding)
+        boxes.append((x0, y0, x1 - x0, y1 - y0))
+
+    return sort_reading_order(boxes)
+
+def sort_reading_order(boxes: Sequence[Box]) -> List[Box]:
+    """
+    Trie les zones de haut en bas puis de gauche à droite, en regroupant sur une même
+    ligne les zones dont les centres verticaux sont proches
+
+    Args:
+        boxes: Zones (x, y, largeur, hauteur)
+
+    Returns:
+        List[Box]: Zones triées
+    """
+    if not boxes:
+        return []
+    median_height = float(np.median([box[3] for box in boxes]))
+    return sorted(boxes, key=lambda box: (int((box[1] + box[3] / 2) // max(median_height, 1.0)), box[0]))
+
+def region_psm(box: Box, median_height: float) -> int:
+    """Mode de segmentation adapté : ligne unique (7) ou bloc de texte (6)"""
+    return 7 if box[3] <= 1.8 * median_height else 6
+
+def crop_for_ocr(gray: np.ndarray, box: Box) -> np.ndarray:
+    """Découpe une zone (vue sans copie) et l'agrandit si le texte est trop petit pour Tesseract"""
+    x, y, w, h = box
+    crop = gray[y:y + h, x:x + w]
+    if h < MIN_OCR_HEIGHT:
+        factor = MIN_OCR_HEIGHT / h
+        crop = cv2.resize(crop, None, fx=factor, fy=factor, interpolation=cv2.INTER_CUBIC)
+    return np.ascontiguousarray(crop)
+
+def ocr_regions(
+    gray: np.ndarray,
+    boxes: Sequence[Box],
+    lang: str = "fra+eng",
+    workers: Optional[int] = None,
+    timeout: float = 30,
+) -> List[Dict[str, Any]]:
+    """
+    Reconnaît le texte de chaque zone en parallèle avec Tesseract
+
+    Args:
+        gray: Image prétraitée en niveaux de gris
+        boxes: Zones à reconnaître (ordre de lecture)
+        lang: Langues Tesseract
+        workers: Nombre de zones traitées simultanément (défaut : nombre de cœurs, 8 au plus)
+        timeout: Durée maximale par zone (en secondes)
+
+    Returns:
+        List[Dict]: Zones non vides, dans l'ordre de lecture :
+                    {"box", "psm", "text", "words", "mean_conf"}
+    """
+    if not boxes:
+        return []
+    median_height = float(np.median([box[3] for box in boxes]))
+
+    def recognize(box: Box) -> Optional[Dict[str, Any]]:
+        psm = region_psm(box, median_height)
+        try:
+            result = ocr_image(crop_for_ocr(gray, box), psms=(psm,), lang=lang, timeout=timeout, early_exit=False)
+        except Exception as e:
+            logger.warning(f"Erreur OCR pour la zone {box}: {str(e)}")
+            return None
+        if not result or not result["text"].strip():
+            return None
+        return {"box": tuple(int(v) for v in box), **result}
+
+    max_workers = workers or min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr-region") as executor:
+        results = list(executor.map(recognize, boxes))
+
+    return [result for result in results if result]
+
+def ocr_regions_easyocr(gray: np.ndarray, boxes: Sequence[Box], reader: Any) -> List[Dict[str, Any]]:
+    """
+    Reconnaît les zones avec EasyOCR en sautant sa propre étape de détection
+
+    Args:
+        gray: Image prétraitée en niveaux de gris
+        boxes: Zones à reconnaître (ordre de lecture)
+        reader: Reader EasyOCR déjà chargé
+
+    Returns:
+        List[Dict]: Zones non vides, dans l'ordre de lecture : {"box", "text", "mean_conf"}
+    """
+    results = []
+    for box in boxes:
+        x, y, w, h = box
+        lines = reader.recognize(gray, horizontal_list=[[x, x + w, y, y + h]], free_list=[], detail=1)
+        text = " ".join(line[1] for line in lines).strip()
+        if text:
+            confidence = float(np.mean([line[2] for line in lines])) * 100
+            results.append({"box": tuple(int(v) for v in box), "text": text, "mean_conf": confidence})
+    return results
+
+def join_regions(regions: Sequence[Dict[str, Any]]) -> str:
+    """Assemble le texte des zones dans l'ordre de lecture, une zone par ligne"""
+    return "\n".join(region["text"] for region in regions)
@@ -68,6 +68,9 @@ class TokenCounter(LlamaIndexTokenCounter):
         
         # Compteur d'embedding précédent pour calculer la différence
         self.previous_embedding_count = 0
+        
+        # Succès/échecs du cache des réponses LLM (appels évités)
+        self.llm_cache_stats = {"hits": 0, "misses": 0}
     
     def on_event_end(
         self,
@@ -164,6 +167,18 @@ class TokenCounter(LlamaIndexTokenCounter):
                     print(f"   Total étape: {self.steps_token_usage[self.current_step]['total']} tokens")
                     print(f"   Coût étape: ${self.steps_token_usage[self.current_step]['cost']:.5f}")
     
+    def record_llm_cache_lookup(self, hit: bool) -> None:
+        """
+        Enregistrer une consultation du cache des réponses LLM.
+        
+        Args:
+            hit: True si la réponse a été servie depuis le cache (aucun appel au modèle)
+        """
+        self.llm_cache_stats["hits" if hit else "misses"] += 1
+        
+        if self.verbose and hit:
+            print(f"♻️ Appel LLM évité pour l'étape {self.current_step} (cache)")
+    
     def set_current_step(self, step_name: str) -> None:
         """
         Définir l'étape actuelle pour le suivi des tokens.
@@ -309,6 +324,13 @@ class TokenCounter(LlamaIndexTokenCounter):
         print(f"  Tokens totaux:     {self.total_llm_token_count + self.total_embedding_token_count:,}")
         print(f"  Coût total estimé: ${self.total_cost:.4f}")
         
+        lookups = self.llm_cache_stats["hits"] + self.llm_cache_stats["misses"]
+        if lookups > 0:
+            print("\n♻️ CACHE DES RÉPONSES LLM:")
+            print(f"  Succès (appels évités): {self.llm_cache_stats['hits']:,}")
+            print(f"  Échecs (appels faits):  {self.llm_cache_stats['misses']:,}")
+            print(f"  Taux de succès:         {self.llm_cache_stats['hits'] / lookups:.1%}")
+        
         print("\n" + "="*60)
     
     def get_stats(self) -> Dict[str, Any]:
@@ -348,6 +370,7 @@ class TokenCounter(LlamaIndexTokenCounter):
             "total_tokens": self.total_llm_token_count + self.total_embedding_token_count,
             "estimated_cost_usd": self.total_cost,
             "steps": self.steps_token_usage,
+            "llm_cache": dict(self.llm_cache_stats),
             "timestamp": datetime.now().isoformat()
         }
     